@@ -112,6 +112,8 @@ class VennDiagramApp {
         this.diagram = null;
         this.diagramIndex = 0;
         this.bufferLoader = new BufferLoader();
+        const renderer = new URLSearchParams(window.location.search).get("renderer");
+        this.rendererClass = renderer === "canvas" ? CanvasVennDiagram : VennDiagram;
 
         this.loadDiagram();
 
@@ -147,7 +149,41 @@ class VennDiagramApp {
         document.querySelector("#diagram-name").innerText = diagram.name;
         const colorScheme = COLOR_SCHEMES[name] || COLOR_SCHEMES.default;
         this.applyColorScheme(colorScheme);
-        this.diagram = new VennDiagram(diagram, colorScheme, this.bufferLoader);
+        const renderer = new this.rendererClass(diagram, colorScheme, this.bufferLoader);
+        this.diagram = renderer;
+        renderer.audioLoaded
+            .catch((error) => {
+                // A broken cache entry or storage that throws shouldn't leave the
+                // diagram silent, so try once more straight from the network.
+                console.warn("Failed to load sounds, retrying without the cache", error);
+                this.bufferLoader.disableCache();
+                if (this.diagram === renderer) {
+                    return renderer.loadAudio();
+                }
+            })
+            .then(() => {
+                this.prefetchAdjacentDiagrams();
+            })
+            .catch((error) => {
+                console.error("Failed to load sounds", error);
+            });
+    }
+
+    // Load the sounds of the previous and next diagrams in the background, so
+    // that switching to them is instant.
+    prefetchAdjacentDiagrams() {
+        for (let offset of [1, -1]) {
+            const index = (
+                this.diagramIndex + offset + this.numberOfDiagrams
+            ) % this.numberOfDiagrams;
+            const name = this.vennDiagrams.diagrams_list[index];
+            const colorScheme = COLOR_SCHEMES[name] || COLOR_SCHEMES.default;
+            VennPlayer.loadNotes(
+                this.bufferLoader, this.vennDiagrams[name].n, `sounds/${colorScheme.sound}`
+            ).catch((error) => {
+                console.warn("Failed to prefetch sounds", error);
+            });
+        }
     }
 
     applyColorScheme(colorScheme) {
@@ -172,11 +208,114 @@ function get_venn_sets(region_index, n) {
     return result;
 }
 
+function decodeBase64(string) {
+    const binary = atob(string);
+    const bytes = new Uint8Array(binary.length);
+    for (let i = 0; i < binary.length; i++) {
+        bytes[i] = binary.charCodeAt(i);
+    }
+    return bytes.buffer;
+}
+
+// Decode paths exported in the "binary" format (see src/venn7/binary.py) into
+// SVG.js path arrays. The typed arrays assume a little-endian platform, which
+// is what all browsers run on in practice.
+function decodePaths(encoded) {
+    const coordinates = new Int16Array(decodeBase64(encoded.coordinates));
+    const structure = new Uint16Array(decodeBase64(encoded.structure));
+    const scale = encoded.scale;
+    const paths = [];
+    let c = 0;
+    let s = 0;
+    while (s < structure.length) {
+        const path = [];
+        const numberOfSubpaths = structure[s++];
+        // Points are delta-encoded, starting over for each path.
+        let x = 0;
+        let y = 0;
+        for (let i = 0; i < numberOfSubpaths; i++) {
+            const numberOfSegments = structure[s++];
+            x += coordinates[c++];
+            y += coordinates[c++];
+            path.push(["M", x / scale, y / scale]);
+            for (let j = 0; j < numberOfSegments; j++) {
+                const segment = ["C"];
+                for (let k = 0; k < 3; k++) {
+                    x += coordinates[c++];
+                    y += coordinates[c++];
+                    segment.push(x / scale, y / scale);
+                }
+                path.push(segment);
+            }
+            path.push(["Z"]);
+        }
+        paths.push(path);
+    }
+    return paths;
+}
+
+// The scanline index exported by src/venn7/hittest.py. Along the center line
+// of each row, it holds the sorted x coordinates where curves cross the row,
+// and the mask of the region to the right of each crossing.
+class HitTestIndex {
+    constructor(data) {
+        this.y0 = data.y0;
+        this.rowHeight = data.row_height;
+        this.scale = data.scale;
+        // Rows are stored as their lengths and crossings as differences within
+        // each row. Undo both once, so that lookups don't have to.
+        const rowLengths = new Uint16Array(decodeBase64(data.row_lengths));
+        this.rowStarts = new Uint32Array(rowLengths.length + 1);
+        this.crossings = new Int16Array(decodeBase64(data.crossings));
+        for (let row = 0; row < rowLengths.length; row++) {
+            const start = this.rowStarts[row];
+            const end = start + rowLengths[row];
+            for (let i = start + 1; i < end; i++) {
+                this.crossings[i] += this.crossings[i - 1];
+            }
+            this.rowStarts[row + 1] = end;
+        }
+        const masks = decodeBase64(data.masks);
+        this.masks = data.mask_size === 1 ? new Uint8Array(masks) : new Uint16Array(masks);
+    }
+
+    lookup(x, y) {
+        const row = Math.round((y - this.y0) / this.rowHeight);
+        if (!(row >= 0 && row < this.rowStarts.length - 1)) {
+            return 0;
+        }
+        // Find the first crossing to the right of x.
+        const start = this.rowStarts[row];
+        let low = start;
+        let high = this.rowStarts[row + 1];
+        const scaledX = x * this.scale;
+        while (low < high) {
+            const middle = (low + high) >> 1;
+            if (this.crossings[middle] <= scaledX) {
+                low = middle + 1;
+            } else {
+                high = middle;
+            }
+        }
+        return low === start ? 0 : this.masks[low - 1];
+    }
+}
+
 
 class VennDiagram {
     constructor(venn_diagram, colorScheme, bufferLoader) {
         this.venn_diagram = venn_diagram;
         this.n = venn_diagram.n;
+        if (venn_diagram.format === "binary") {
+            const paths = decodePaths(venn_diagram);
+            this.curvePath = paths[0];
+            this.regionPaths = paths.slice(1);
+        } else {
+            this.curvePath = venn_diagram.curve;
+            this.regionPaths = venn_diagram.regions;
+        }
+        this.hitTestIndex = venn_diagram.hit_test ?
+            new HitTestIndex(venn_diagram.hit_test) : null;
         this.colorScheme = colorScheme;
         this.bufferLoader = bufferLoader;
 
@@ -192,22 +331,20 @@ class VennDiagram {
         const canvas_size = 800;
         this.canvas_size = canvas_size;
 
-        this.draw = SVG().addTo("#canvas-container").size(canvas_size, canvas_size);
-        this.draw.node.classList.add("hidden");
         this.scale = 350 / 50;
+        this.createCanvas();
+        this.node.classList.add("hidden");
 
         this.player = new VennPlayer(
             this.n, `sounds/${colorScheme.sound}`, this.bufferLoader
         );
-        this.player.load().then(() => {
-            this.loadStatus.audio = true;
-            this.onUpdateLoadStatus();
-        });
+        this.audioLoaded = this.loadAudio();
 
         this.updateSize();
-        this.resizeListener = window.addEventListener("resize", () => {
+        this.resizeListener = () => {
             this.updateSize();
-        });
+        };
+        window.addEventListener("resize", this.resizeListener);
 
         this.midiCallbacks = {}; 
   
@@ -233,7 +370,7 @@ class VennDiagram {
 
     onUpdateLoadStatus() {
         if (this.loadStatus.graphics) {
-            this.draw.node.classList.remove("hidden");
+            this.node.classList.remove("hidden");
         }
         if (this.loadStatus.audio && this.loadStatus.graphics) {
             this.loadingText.innerText = "";
@@ -246,6 +383,11 @@ class VennDiagram {
         }
     }
 
+    createCanvas() {
+        this.draw = SVG().addTo("#canvas-container").size(this.canvas_size, this.canvas_size);
+        this.node = this.draw.node;
+    }
+
     render() {
         this.curves = [];
         let i;
@@ -258,24 +400,30 @@ class VennDiagram {
         });
 
         this.regions = [];
-        this.region_outlines = [];
         for (i = 1; i < Math.pow(2, this.venn_diagram.n); i++) {
             this.renderRegion(i);
         }
+        this.renderHighlight();
+        this.addMidiCallbacks();
+        this.addPointerListeners();
     }
 
-    updateSize() {
-        const size = Math.min(
+    getSize() {
+        return Math.min(
             window.innerWidth,
             window.innerHeight - document.getElementById("header").clientHeight
         );
-        this.draw.node.setAttribute("width", size);
-        this.draw.node.setAttribute("height", size);
-        this.draw.node.setAttribute("viewBox", `0 0 ${this.canvas_size} ${this.canvas_size}`);
+    }
+
+    updateSize() {
+        const size = this.getSize();
+        this.node.setAttribute("width", size);
+        this.node.setAttribute("height", size);
+        this.node.setAttribute("viewBox", `0 0 ${this.canvas_size} ${this.canvas_size}`);
     }
 
     makeVennCurve(i) {
-        return this.draw.path(this.venn_diagram.curve)
+        return this.draw.path(this.curvePath)
             .attr({ "pointer-events": "none" })
             .fill({ color: "black", opacity: 0 })
             .stroke({ opacity: 0, color: this.colorScheme.center, width: 1.5 / this.scale })
@@ -286,7 +434,7 @@ class VennDiagram {
 
 
     makeRegionShape(regionIndex) {
-        const path = this.draw.path(this.venn_diagram.regions[regionIndex])
+        const path = this.draw.path(this.regionPaths[regionIndex])
             .stroke({ linejoin: "round", linecap: "round" })
             .scale(this.scale, 0, 0)
             .translate(this.canvas_size / 2, this.canvas_size / 2)
@@ -294,10 +442,10 @@ class VennDiagram {
     }
 
     renderRegion(regionIndex) {
-        const sets = get_venn_sets(regionIndex, this.n);
         const order = get_venn_sets(regionIndex, this.n).reduce((a, b) => a + b);
 
         let region = this.makeRegionShape(regionIndex);
+        region.attr({ "pointer-events": "none" });
         region.fill({
             color: this.colorScheme.regionColors[order]
         });
@@ -307,51 +455,107 @@ class VennDiagram {
         });
         this.regions.push(region);
         region.back();
+    }
 
-        let region_outline = this.makeRegionShape(regionIndex);
-        this.region_outlines.push(region_outline);
-        region_outline
+    addMidiCallbacks() {
+        for (let i = 1; i < Math.pow(2, this.n); i++) {
+            this.midiCallbacks[i] = {
+                'noteOn': () => {
+                    this.showHighlight(i);
+                    this.clickRegion(i);
+                },
+                'noteOff': () => {
+                    this.hideHighlight();
+                }
+            };
+        }
+    }
+
+    // A single outline is moved to whichever region is highlighted, instead of
+    // keeping a hidden outline for every region.
+    renderHighlight() {
+        this.highlight = this.makeRegionShape(1)
+            .attr({ "pointer-events": "none" })
             .fill({ color: "black", opacity: 0 })
             .stroke({
                 opacity: 0,
                 color: this.colorScheme.foreground,
                 width: 3 / this.scale
             });
+        this.highlightedRegion = 0;
+    }
 
-        const noteOnAnimation = () => {
-            region_outline.stroke({ opacity: 1 });
-            let i;
-            for (i = 0; i < this.n; i++) {
-                this.curves[i].stroke({ opacity: sets[i] * 0.9 });
-            }
-        } 
+    showHighlight(regionIndex) {
+        if (regionIndex !== this.highlightedRegion) {
+            this.highlightedRegion = regionIndex;
+            this.drawHighlight();
+        }
+    }
 
-        const noteOffAnimation = () => {
-            region_outline.stroke({ opacity: 0 });
-            let i;
-            for (i = 0; i < this.n; i++) {
-                this.curves[i].stroke({ opacity: 0 });
-            }
+    hideHighlight() {
+        this.showHighlight(0);
+    }
+
+    drawHighlight() {
+        const regionIndex = this.highlightedRegion;
+        if (regionIndex !== 0) {
+            this.highlight.plot(this.regionPaths[regionIndex]);
         }
-        
-        this.midiCallbacks[regionIndex] = {
-            'noteOn': () => {
-                noteOnAnimation();
-                this.clickRegion(regionIndex);
-            },
-            'noteOff': () => {
-                noteOffAnimation();
+        this.highlight.stroke({ opacity: regionIndex === 0 ? 0 : 1 });
+        const sets = get_venn_sets(regionIndex, this.n);
+        for (let i = 0; i < this.n; i++) {
+            this.curves[i].stroke({ opacity: sets[i] * 0.9 });
+        }
+    }
+
+    // Find the region under a pointer event. Nothing but the SVG element
+    // itself receives pointer events, so the browser never has to hit test
+    // the paths.
+    getRegionAt(event) {
+        const rect = this.node.getBoundingClientRect();
+        const x = (event.clientX - rect.left) / rect.width * this.canvas_size;
+        const y = (event.clientY - rect.top) / rect.height * this.canvas_size;
+        if (this.hitTestIndex !== null) {
+            return this.hitTestIndex.lookup(
+                (x - this.canvas_size / 2) / this.scale,
+                (y - this.canvas_size / 2) / this.scale
+            );
+        }
+        return this.findRegionAt(event);
+    }
+
+    // Exports without a hit-test index, the default, test each curve instead.
+    findRegionAt(event) {
+        let regionIndex = 0;
+        for (let i = 0; i < this.n; i++) {
+            const matrix = this.curves[i].node.getScreenCTM().inverse();
+            const point = new DOMPoint(event.clientX, event.clientY).matrixTransform(matrix);
+            if (this.curves[i].node.isPointInFill(point)) {
+                regionIndex += 1 << i;
             }
-        };
+        }
+        return regionIndex;
+    }
 
-        region_outline
-            .mouseover(noteOnAnimation)
-            .mouseout(() => {
-                region_outline.stroke({ opacity: 0 });
-            })
-            .mousedown(() => {
+    addPointerListeners() {
+        this.node.addEventListener("pointermove", (event) => {
+            const regionIndex = this.getRegionAt(event);
+            if (regionIndex === 0) {
+                this.hideHighlight();
+            } else {
+                this.showHighlight(regionIndex);
+            }
+        });
+        this.node.addEventListener("pointerleave", () => {
+            this.hideHighlight();
+        });
+        this.node.addEventListener("pointerdown", (event) => {
+            const regionIndex = this.getRegionAt(event);
+            if (regionIndex !== 0) {
+                this.showHighlight(regionIndex);
                 this.clickRegion(regionIndex);
-            });
+            }
+        });
     }
 
     clickRegion(regionIndex) {
@@ -359,10 +563,20 @@ class VennDiagram {
         this.player.playChord(sets);
     }
 
-    cleanUp() {
+    removeCanvas() {
         this.draw.clear();
-        const node = this.draw.node;
-        node.parentElement.removeChild(node);
+        this.node.parentElement.removeChild(this.node);
+    }
+
+    loadAudio() {
+        return this.player.load().then(() => {
+            this.loadStatus.audio = true;
+            this.onUpdateLoadStatus();
+        });
+    }
+
+    cleanUp() {
+        this.removeCanvas();
 
         this.player.cleanUp();
 
@@ -370,34 +584,244 @@ class VennDiagram {
     }
 }
 
+// Build a Path2D from an SVG path string or a path array from decodePaths.
+function makePath2D(path) {
+    if (typeof path === "string") {
+        return new Path2D(path);
+    }
+    const result = new Path2D();
+    for (let segment of path) {
+        if (segment[0] === "M") {
+            result.moveTo(segment[1], segment[2]);
+        } else if (segment[0] === "C") {
+            result.bezierCurveTo(...segment.slice(1));
+        } else {
+            result.closePath();
+        }
+    }
+    return result;
+}
+
+// Renders to two stacked canvases instead of hundreds of SVG elements. The
+// regions are rasterized into the base layer only when the size changes, and
+// hovering only redraws the highlight layer above it. Selected with
+// ?renderer=canvas.
+class CanvasVennDiagram extends VennDiagram {
+    createCanvas() {
+        this.node = document.createElement("div");
+        this.node.style.position = "relative";
+        this.baseLayer = document.createElement("canvas");
+        this.baseLayer.style.display = "block";
+        this.highlightLayer = document.createElement("canvas");
+        this.highlightLayer.style.position = "absolute";
+        this.highlightLayer.style.left = "0";
+        this.highlightLayer.style.top = "0";
+        this.node.appendChild(this.baseLayer);
+        this.node.appendChild(this.highlightLayer);
+        document.getElementById("canvas-container").appendChild(this.node);
+        this.highlightedRegion = 0;
+    }
+
+    render() {
+        this.curvePath2D = makePath2D(this.curvePath);
+        this.regionPath2Ds = this.regionPaths.map(makePath2D);
+        this.rasterize();
+        this.addMidiCallbacks();
+        this.addPointerListeners();
+    }
+
+    updateSize() {
+        const size = this.getSize();
+        this.node.style.width = `${size}px`;
+        this.node.style.height = `${size}px`;
+        const pixels = Math.round(size * (window.devicePixelRatio || 1));
+        for (let layer of [this.baseLayer, this.highlightLayer]) {
+            layer.style.width = `${size}px`;
+            layer.style.height = `${size}px`;
+            layer.width = pixels;
+            layer.height = pixels;
+        }
+        if (this.regionPath2Ds !== undefined) {
+            this.rasterize();
+        }
+    }
+
+    // Set up a context so that it draws in the coordinates of the exported
+    // paths.
+    getContext(layer) {
+        const context = layer.getContext("2d");
+        const pixelsPerUnit = layer.width / this.canvas_size * this.scale;
+        context.setTransform(pixelsPerUnit, 0, 0, pixelsPerUnit, layer.width / 2, layer.height / 2);
+        return context;
+    }
+
+    rasterize() {
+        const context = this.getContext(this.baseLayer);
+        context.clearRect(-this.canvas_size, -this.canvas_size, 2 * this.canvas_size, 2 * this.canvas_size);
+        context.lineWidth = 0.1;
+        for (let i = 1; i < this.regionPath2Ds.length; i++) {
+            const order = get_venn_sets(i, this.n).reduce((a, b) => a + b);
+            context.fillStyle = this.colorScheme.regionColors[order];
+            context.strokeStyle = this.colorScheme.regionColors[order];
+            context.fill(this.regionPath2Ds[i]);
+            context.stroke(this.regionPath2Ds[i]);
+        }
+        this.drawHighlight();
+    }
+
+    drawHighlight() {
+        const context = this.getContext(this.highlightLayer);
+        context.clearRect(-this.canvas_size, -this.canvas_size, 2 * this.canvas_size, 2 * this.canvas_size);
+        const regionIndex = this.highlightedRegion;
+        if (regionIndex === 0) {
+            return;
+        }
+
+        const sets = get_venn_sets(regionIndex, this.n);
+        context.globalAlpha = 0.9;
+        context.strokeStyle = this.colorScheme.center;
+        context.lineWidth = 1.5 / this.scale;
+        for (let i = 0; i < this.n; i++) {
+            if (sets[i]) {
+                context.save();
+                context.rotate(2 * Math.PI * i / this.n);
+                context.stroke(this.curvePath2D);
+                context.restore();
+            }
+        }
+
+        context.globalAlpha = 1;
+        context.strokeStyle = this.colorScheme.foreground;
+        context.lineWidth = 3 / this.scale;
+        context.lineJoin = "round";
+        context.lineCap = "round";
+        context.stroke(this.regionPath2Ds[regionIndex]);
+    }
+
+    findRegionAt(event) {
+        const rect = this.node.getBoundingClientRect();
+        const context = this.highlightLayer.getContext("2d");
+        const pixels = this.highlightLayer.width / rect.width;
+        const x = (event.clientX - rect.left) * pixels - this.highlightLayer.width / 2;
+        const y = (event.clientY - rect.top) * pixels - this.highlightLayer.height / 2;
+        const pixelsPerUnit = this.highlightLayer.width / this.canvas_size * this.scale;
+        let regionIndex = 0;
+        for (let i = 0; i < this.n; i++) {
+            // Rotate the point back instead of rotating curve i.
+            const angle = -2 * Math.PI * i / this.n;
+            context.setTransform(pixelsPerUnit, 0, 0, pixelsPerUnit, 0, 0);
+            if (context.isPointInPath(
+                this.curvePath2D,
+                x * Math.cos(angle) - y * Math.sin(angle),
+                x * Math.sin(angle) + y * Math.cos(angle)
+            )) {
+                regionIndex += 1 << i;
+            }
+        }
+        return regionIndex;
+    }
+
+    removeCanvas() {
+        this.node.parentElement.removeChild(this.node);
+    }
+}
+
+// Loads and decodes audio files, all at once. Decoded buffers are kept for the
+// lifetime of the page, and the fetched bytes are kept in the Cache API so that
+// reloading the page doesn't go to the network. Bump the cache name when the
+// sounds change.
 class BufferLoader {
-    constructor() {
+    constructor(cacheName = "venn7-sounds-v1") {
         this.buffers = {};
+        this.pending = {};
+        this.manifests = {};
+        this.cacheName = cacheName;
+        this.useCache = true;
+    }
+
+    // Fetch everything from the network from now on, including manifests that
+    // have already been loaded, or failed to load, through the cache.
+    disableCache() {
+        this.useCache = false;
+        this.manifests = {};
+    }
+
+    // Load a JSON file, or resolve to null if it doesn't exist.
+    loadManifest(file) {
+        if (!(file in this.manifests)) {
+            this.manifests[file] = this.fetchBytes(file)
+                .then((bytes) => JSON.parse(new TextDecoder().decode(bytes)))
+                .catch(() => null);
+        }
+        return this.manifests[file];
     }
 
     async loadAudioBuffers(audioContext, files) {
-        for (let file of files) {
-            if (this.buffers[file]) {
-                continue;
+        await Promise.all(files.map((file) => this.loadAudioBuffer(audioContext, file)));
+    }
+
+    loadAudioBuffer(audioContext, file) {
+        if (this.buffers[file]) {
+            return Promise.resolve(this.buffers[file]);
+        }
+        // If the file is already loading, for example by a prefetch, share
+        // the request instead of making another one.
+        if (!this.pending[file]) {
+            this.pending[file] = this.fetchBytes(file)
+                .then((bytes) => audioContext.decodeAudioData(bytes))
+                .then((audioBuffer) => {
+                    this.buffers[file] = audioBuffer;
+                    return audioBuffer;
+                })
+                .finally(() => {
+                    delete this.pending[file];
+                });
+        }
+        return this.pending[file];
+    }
+
+    async fetchBytes(file) {
+        let cache = null;
+        // The Cache API is only available in secure contexts.
+        if (this.useCache && window.caches) {
+            try {
+                cache = await caches.open(this.cacheName);
+                const cached = await cache.match(file);
+                if (cached) {
+                    return await cached.arrayBuffer();
+                }
+            } catch (error) {
+                cache = null;
             }
-            const audioBuffer = await new Tone.Buffer().load(file);
-            this.buffers[file] = audioBuffer;
         }
+        const response = await fetch(file);
+        if (!response.ok) {
+            throw new Error(`Failed to load ${file}: ${response.status}`);
+        }
+        if (cache !== null) {
+            try {
+                await cache.put(file, response.clone());
+            } catch (error) {
+                // Running out of quota only means the next load is slower.
+            }
+        }
+        return await response.arrayBuffer();
     }
 }
 
+// Seconds to fade out a note when it is stopped or ends. Keep in sync with
+// FADE_OUT in src/venn7/sprites.py.
+const NOTE_FADE_OUT = 1;
+
 class VennPlayer {
     constructor(n, directory, bufferLoader) {
         this.directory = directory;
         this.n = n;
         this.bufferLoader = bufferLoader;
 
-        this.scale = n === 5 ? [0, 3, 5, 7, 10] : [0, 2, 3, 5, 7, 8, 10];
+        this.scale = VennPlayer.getScale(n);
 
-        this.files = [];
-        for (let i = 0; i < this.n; i++) {
-            this.files.push(`${directory}/note_${this.scale[i]}.mp3`);
-        }
+        this.notes = null;
 
         this.polyphony = 3;
         this.synths = [];
@@ -405,17 +829,63 @@ class VennPlayer {
         this.state = "not loading";
     }
 
+    static getScale(n) {
+        return n === 5 ? [0, 3, 5, 7, 10] : [0, 2, 3, 5, 7, 8, 10];
+    }
+
+    // Load the sounds of a set, and return where to find each note: the file,
+    // the offset and duration of the note in it, and how long to fade it out.
+    // If the set has been packed into a sprite with src/venn7/sprites.py, all
+    // notes come from one file. Otherwise, each note has its own.
+    static async loadNotes(bufferLoader, n, directory) {
+        const scale = VennPlayer.getScale(n).slice(0, n);
+        const manifest = await bufferLoader.loadManifest(`${directory}/sprite.json`);
+        let notes;
+        if (manifest !== null && scale.every((note) => manifest.notes[`note_${note}`])) {
+            const file = `${directory}/${manifest.file}`;
+            const starts = Object.values(manifest.notes).map((entry) => entry.start);
+            notes = scale.map((note) => {
+                const entry = manifest.notes[`note_${note}`];
+                // A player keeps playing while it fades out, so keep the fade
+                // within the silence after the note, or the start of the next
+                // note in the sprite would be heard.
+                const end = entry.start + entry.duration;
+                const nextStart = Math.min(
+                    ...starts.filter((start) => start > entry.start), Infinity
+                );
+                return {
+                    file: file,
+                    offset: entry.start,
+                    duration: entry.duration,
+                    fadeOut: Math.min(NOTE_FADE_OUT, nextStart - end)
+                };
+            });
+        } else {
+            notes = scale.map((note) => ({
+                file: `${directory}/note_${note}.mp3`,
+                offset: 0,
+                duration: undefined,
+                fadeOut: NOTE_FADE_OUT
+            }));
+        }
+        const files = [...new Set(notes.map((note) => note.file))];
+        await bufferLoader.loadAudioBuffers(Tone.context, files);
+        return notes;
+    }
+
     async load() {
         this.state = "loading";
-        const buffers = await this.bufferLoader.loadAudioBuffers(Tone.context, this.files);
+        this.synths = [];
+        this.notes = await VennPlayer.loadNotes(this.bufferLoader, this.n, this.directory);
         for (let i = 0; i < this.n; i++) {
             let note = [];
             this.synths.push(note);
             for (let j = 0; j < this.polyphony; j++) {
+                // With a sprite, all players share the same decoded buffer.
                 const synth = new Tone.Player(
-                    this.bufferLoader.buffers[this.files[i]]
+                    this.bufferLoader.buffers[this.notes[i].file]
                 ).toDestination();
-                synth.fadeOut = 1;
+                synth.fadeOut = this.notes[i].fadeOut;
                 synth.volume.value = -10;
                 note.push(synth);
             }
@@ -443,7 +913,7 @@ class VennPlayer {
             if (chord[i]) {
                 let synth = this.synths[i].pop();
                 this.synths[i].unshift(synth);
-                synth.start();
+                synth.start(undefined, this.notes[i].offset, this.notes[i].duration);
             }
         }
     }
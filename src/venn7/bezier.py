@@ -16,6 +16,154 @@ def get_rotation_matrix(theta):
     return matrix
 
 
+def points_in_polygon(points, polygon):
+    """Even-odd test of which points lie inside a polygon, vectorized over all
+    points and edges at once.
+
+    points is an array of shape (P, 2) and polygon an array of vertices of
+    shape (V, 2). Returns a boolean array of shape (P,).
+    """
+    points = np.asarray(points, dtype=float)
+    polygon = np.asarray(polygon, dtype=float)
+    x = points[:, 0, np.newaxis]
+    y = points[:, 1, np.newaxis]
+    x_1, y_1 = polygon[:, 0], polygon[:, 1]
+    x_2, y_2 = np.roll(x_1, -1), np.roll(y_1, -1)
+    straddles = (y_1 > y) != (y_2 > y)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x_crossing = x_1 + (y - y_1) * (x_2 - x_1) / (y_2 - y_1)
+    crossings = straddles & (x < x_crossing)
+    return np.count_nonzero(crossings, axis=1) % 2 == 1
+
+
+def get_polynomial_coefficients(control_points):
+    """Convert control points of shape (..., 4, 2) to the coefficients of the
+    equivalent cubic polynomials in t, in order of increasing degree. The result
+    has the same shape as the input."""
+    p0, p1, p2, p3 = [control_points[..., i, :] for i in range(4)]
+    return np.stack(
+        [p0, 3 * (p1 - p0), 3 * (p0 - 2 * p1 + p2), p3 - 3 * p2 + 3 * p1 - p0],
+        axis=-2,
+    )
+
+
+def get_polynomial_roots(coefficients):
+    """Find the roots of many polynomials of the same degree at once.
+
+    coefficients is an array of shape (N, d + 1) in order of increasing degree.
+    The roots are the eigenvalues of the companion matrices, which are stacked
+    and solved in a single call. Polynomials whose leading coefficient vanishes
+    are of lower degree and are handed to np.roots individually.
+
+    Returns a complex array of shape (N, d), padded with NaN where a polynomial
+    has fewer than d roots.
+    """
+    coefficients = np.asarray(coefficients, dtype=float)
+    count, degree = coefficients.shape[0], coefficients.shape[1] - 1
+    roots = np.full((count, degree), np.nan, dtype=complex)
+
+    leading = coefficients[:, -1]
+    scale = np.max(np.abs(coefficients), axis=1)
+    regular = np.abs(leading) > 1e-12 * scale
+
+    companion = np.zeros((np.count_nonzero(regular), degree, degree))
+    companion[:, np.arange(1, degree), np.arange(degree - 1)] = 1
+    companion[:, :, -1] = -coefficients[regular, :-1] / leading[regular, np.newaxis]
+    roots[regular] = np.linalg.eigvals(companion)
+
+    for i in np.flatnonzero(~regular):
+        row_roots = np.roots(coefficients[i, ::-1])
+        roots[i, : len(row_roots)] = row_roots
+    return roots
+
+
+def split_control_points(control_points, t):
+    """Split cubic Bezier segments in two with de Casteljau's algorithm.
+
+    control_points is an array of shape (..., 4, 2) and t is a parameter or an
+    array of parameters broadcastable to shape (...). Returns the control
+    points of the parts before and after t, each of the same shape as
+    control_points.
+    """
+    t = np.asarray(t, dtype=float)[..., np.newaxis]
+    p0, p1, p2, p3 = [control_points[..., i, :] for i in range(4)]
+    p01 = p0 + t * (p1 - p0)
+    p12 = p1 + t * (p2 - p1)
+    p23 = p2 + t * (p3 - p2)
+    p012 = p01 + t * (p12 - p01)
+    p123 = p12 + t * (p23 - p12)
+    p0123 = p012 + t * (p123 - p012)
+    before = np.stack([p0, p01, p012, p0123], axis=-2)
+    after = np.stack([p0123, p123, p23, p3], axis=-2)
+    return before, after
+
+
+def get_subsegment(control_points, t_start, t_end):
+    """Get the control points of the part of a cubic Bezier segment between
+    the parameters t_start and t_end. Vectorized like split_control_points."""
+    t_start = np.asarray(t_start, dtype=float)
+    t_end = np.asarray(t_end, dtype=float)
+    before, __ = split_control_points(control_points, t_end)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        relative_start = np.where(t_end > 0, t_start / t_end, 0.0)
+    __, result = split_control_points(before, relative_start)
+    return result
+
+
+def _get_critical_points(control_points, point):
+    """For each of N cubic Bezier segments, find the points where the distance
+    to the given point is stationary, along with the endpoints.
+
+    The degree-5 optimizer polynomials for all segments are built as a single
+    (N, 6) array and their roots are found in one stacked eigenvalue problem.
+    Returns the offsets of the candidate points from the given point, of shape
+    (N, 7, 2), and their squared distances, of shape (N, 7), set to NaN where
+    there is no candidate.
+    """
+    coefficients = get_polynomial_coefficients(control_points).copy()
+    coefficients[:, 0, :] -= np.asarray(point, dtype=float)
+    derivative = coefficients[:, 1:, :] * np.arange(1, 4)[np.newaxis, :, np.newaxis]
+
+    optimizer = np.zeros((coefficients.shape[0], 6))
+    for i in range(3):
+        for j in range(4):
+            products = derivative[:, i, :] * coefficients[:, j, :]
+            optimizer[:, i + j] += np.sum(products, axis=1)
+
+    roots = get_polynomial_roots(optimizer)
+    is_candidate = (np.abs(roots.imag) < 1e-9) & (0 < roots.real) & (roots.real < 1)
+    candidates = np.where(is_candidate, roots.real, np.nan)
+    endpoints = np.broadcast_to([0.0, 1.0], (candidates.shape[0], 2))
+    candidates = np.concatenate([candidates, endpoints], axis=1)
+
+    powers = np.nan_to_num(candidates)[:, :, np.newaxis] ** np.arange(4)
+    offsets = np.einsum("ntk,nkd->ntd", powers, coefficients)
+    distances = np.sum(np.square(offsets), axis=2)
+    distances[np.isnan(candidates)] = np.nan
+    return offsets, distances
+
+
+def get_furthest_point(control_points, point):
+    """Given control points of shape (N, 4, 2) for N cubic Bezier segments and a
+    point, find the point on any of the segments that is furthest from the given
+    point.
+
+    This is the batched form of CubicBezier.get_furthest_point_from.
+    """
+    offsets, distances = _get_critical_points(control_points, point)
+    index = np.unravel_index(np.nanargmax(distances), distances.shape)
+    x, y = offsets[index] + np.asarray(point, dtype=float)
+    return (x, y)
+
+
+def get_nearest_point(control_points, point):
+    """Like get_furthest_point, but find the nearest point instead."""
+    offsets, distances = _get_critical_points(control_points, point)
+    index = np.unravel_index(np.nanargmin(distances), distances.shape)
+    x, y = offsets[index] + np.asarray(point, dtype=float)
+    return (x, y)
+
+
 class CubicBezier:
     def __init__(self, control_points):
         self.control_points = np.array(control_points)
@@ -139,122 +287,271 @@ class MetafontBezier(CubicBezier):
         return (x, y)
 
 
-RE_FLOAT = re.compile(r"-?\d+(\.\d+)?")
-RE_IGNORE = re.compile(r"[,\s]*")
+RE_PATH_TOKEN = re.compile(
+    r"[\s,]*(?:([MmLlHhVvCcSsQqTtZz])"
+    r"|([-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)|(\S))"
+)
+
+SVG_PATH_ARITIES = {"M": 2, "L": 2, "H": 1, "V": 1, "C": 6, "S": 4, "Q": 4, "T": 2}
 
 
-class ParsingDone(Exception):
-    pass
+def parse_svg_path(text):
+    """Parse SVG path data into cubic Bezier segments.
+
+    Supports the M, L, H, V, C, S, Q, T and Z commands, absolute and relative,
+    with repeated arguments and any number of subpaths. Lines and quadratic
+    segments are converted to cubics, and Z closes the subpath with a line if
+    it doesn't already end where it started. Arcs are not supported.
+
+    The whole string is split into tokens with a single regular expression.
+    Returns control points of shape (N, 4, 2) and the indices of the segments
+    that start each subpath.
+    """
+    commands = []
+    for command, number, other in RE_PATH_TOKEN.findall(text):
+        if command:
+            commands.append((command, []))
+        elif number and commands:
+            commands[-1][1].append(float(number))
+        else:
+            raise ValueError(f"Unexpected {other or number!r} in SVG path")
+
+    segments = []
+    subpath_starts = []
+    x = y = start_x = start_y = 0.0
+    starting_subpath = True
+    # The control points that S and T reflect, if the last segment had one.
+    cubic_control = quadratic_control = None
+
+    def add_segment(x1, y1, x2, y2, x3, y3):
+        nonlocal x, y, starting_subpath
+        if starting_subpath:
+            subpath_starts.append(len(segments))
+            starting_subpath = False
+        segments.append((x, y, x1, y1, x2, y2, x3, y3))
+        x, y = x3, y3
+
+    for command, numbers in commands:
+        kind = command.upper()
+        relative = command != kind
+        if kind == "Z":
+            if numbers:
+                raise ValueError("Z takes no arguments")
+            if math.hypot(x - start_x, y - start_y) > 1e-9:
+                add_segment(x, y, start_x, start_y, start_x, start_y)
+            x, y = start_x, start_y
+            starting_subpath = True
+            cubic_control = quadratic_control = None
+            continue
+        arity = SVG_PATH_ARITIES[kind]
+        if not numbers or len(numbers) % arity != 0:
+            raise ValueError(f"Wrong number of arguments for {command}")
+
+        for k in range(0, len(numbers), arity):
+            args = numbers[k : k + arity]
+            if relative:
+                if kind == "H":
+                    args = [args[0] + x]
+                elif kind == "V":
+                    args = [args[0] + y]
+                else:
+                    args = [
+                        value + (y if i % 2 else x) for i, value in enumerate(args)
+                    ]
+            next_cubic_control = next_quadratic_control = None
+            if kind == "M" and k == 0:
+                x, y = start_x, start_y = args
+                starting_subpath = True
+            elif kind in "MLHV":
+                # Extra coordinate pairs after M are lines.
+                if kind == "H":
+                    end = (args[0], y)
+                elif kind == "V":
+                    end = (x, args[0])
+                else:
+                    end = tuple(args)
+                add_segment(x, y, *end, *end)
+            elif kind in "CS":
+                if kind == "C":
+                    x1, y1 = args[:2]
+                elif cubic_control is None:
+                    x1, y1 = x, y
+                else:
+                    x1, y1 = 2 * x - cubic_control[0], 2 * y - cubic_control[1]
+                x2, y2, x3, y3 = args[-4:]
+                add_segment(x1, y1, x2, y2, x3, y3)
+                next_cubic_control = (x2, y2)
+            else:
+                if kind == "Q":
+                    qx, qy = args[:2]
+                elif quadratic_control is None:
+                    qx, qy = x, y
+                else:
+                    qx, qy = 2 * x - quadratic_control[0], 2 * y - quadratic_control[1]
+                x3, y3 = args[-2:]
+                # Degree elevation of a quadratic to a cubic.
+                add_segment(
+                    x + 2 * (qx - x) / 3,
+                    y + 2 * (qy - y) / 3,
+                    x3 + 2 * (qx - x3) / 3,
+                    y3 + 2 * (qy - y3) / 3,
+                    x3,
+                    y3,
+                )
+                next_quadratic_control = (qx, qy)
+            cubic_control = next_cubic_control
+            quadratic_control = next_quadratic_control
+
+    control_points = np.array(segments, dtype=float).reshape((-1, 4, 2))
+    return control_points, np.array(subpath_starts, dtype=int)
 
 
 class SVGPathParser:
-    """A parser that can process a very small subset of SVG paths -- just
-    enough to get info out of Paper.js."""
+    """Parses SVG path data into a list of CubicBeziers. See parse_svg_path."""
 
     def __init__(self, text):
         self.text = text
-        self.text_position = 0
-        self.position = np.array([0.0, 0.0])
-        self.beziers = []
-
-    def start_token(self):
-        match = RE_IGNORE.match(self.text, pos=self.text_position)
-        self.text_position = match.end()
-        if self.done():
-            raise ParsingDone()
-
-    def floats(self, n):
-        result = []
-        for i in range(n):
-            self.start_token()
-            match = RE_FLOAT.match(self.text, pos=self.text_position)
-            if match is None:
-                raise ParsingDone()
-            self.text_position = match.end()
-            result.append(float(match.group(0)))
-        return result
-
-    def done(self):
-        return self.text_position >= len(self.text)
-
-    def step(self):
-        try:
-            self.start_token()
-        except ParsingDone:
-            return
-        code = self.text[self.text_position]
-        self.text_position += 1
-        if code == "M":
-            self.position = np.array(self.floats(2))
-        elif code == "c":
-            flattened_relative_control_points = np.concatenate([
-                [0.0, 0.0],
-                self.floats(6)
-            ])
-            relative_control_points = np.reshape(
-                flattened_relative_control_points, (2, 4), "F"
-            )
-            control_points = self.position[:, np.newaxis] + relative_control_points
-            bezier = CubicBezier(control_points.T)
-            self.position = control_points[:, 3]
-            self.beziers.append(bezier)
-        elif code == "l":
-            destination = self.position + np.array(self.floats(2))
-            control_points = np.array([
-                self.position,
-                self.position,
-                destination,
-                destination
-            ])
-            bezier = CubicBezier(control_points)
-            self.position = destination
-            self.beziers.append(bezier)
-        elif code == "z":
-            pass
-        else:
-            raise ValueError(f"Unexpected '{code}'")
 
     def parse(self):
-        while not self.done():
-            self.step()
-        return self.beziers
+        control_points, __ = parse_svg_path(self.text)
+        return [CubicBezier(segment) for segment in control_points]
 
 
 class BezierPath:
-    """A closed path consisting of cubic Bezier curves."""
+    """A closed path consisting of cubic Bezier curves.
+
+    The path is stored as a single packed array of control points of shape
+    (N, 4, 2), where N is the number of segments. Transformations and
+    evaluation operate on the whole array at once, and indexing or slicing the
+    path only builds CubicBezier objects when a single segment is requested.
+
+    A path may consist of several closed subpaths, such as the loops of a
+    region with a hole. Their segments are stored one after the other.
+
+    Parameters
+    ----------
+
+    beziers : list of CubicBezier or array_like
+        Either a list of CubicBezier segments or an array of control points of
+        shape (N, 4, 2).
+
+    subpath_starts : array_like, optional
+        The index of the first segment of each subpath, in increasing order.
+        Defaults to a single subpath.
+    """
 
-    def __init__(self, beziers):
-        self.beziers = beziers
+    def __init__(self, beziers, subpath_starts=None):
+        if isinstance(beziers, np.ndarray):
+            control_points = beziers
+        else:
+            control_points = [bezier.control_points for bezier in beziers]
+        self.control_points = np.asarray(control_points, dtype=float).reshape(
+            (-1, 4, 2)
+        )
+        if subpath_starts is None:
+            subpath_starts = [0] if len(self.control_points) > 0 else []
+        self.subpath_starts = np.asarray(subpath_starts, dtype=int)
+        self._bvh = None
 
     @classmethod
     def from_svg_path(cls, svg_path):
-        parser = SVGPathParser(svg_path)
-        beziers = parser.parse()
-        return cls(beziers)
+        control_points, subpath_starts = parse_svg_path(svg_path)
+        return cls(control_points, subpath_starts)
+
+    def get_subpaths(self):
+        """Split this path into one BezierPath per subpath."""
+        ends = list(self.subpath_starts[1:]) + [len(self)]
+        return [
+            BezierPath(self.control_points[start:end])
+            for start, end in zip(self.subpath_starts, ends)
+        ]
+
+    @property
+    def beziers(self):
+        """The segments of this path as a list of CubicBezier objects."""
+        return list(self)
+
+    def __len__(self):
+        return self.control_points.shape[0]
+
+    def __iter__(self):
+        for control_points in self.control_points:
+            yield CubicBezier(control_points)
+
+    def __getitem__(self, key):
+        """Get a single segment as a CubicBezier, or a slice of segments as a
+        BezierPath sharing memory with this one."""
+        if isinstance(key, slice):
+            return BezierPath(self.control_points[key])
+        return CubicBezier(self.control_points[key])
 
     def transform(self, matrix):
-        new_beziers = []
-        for bezier in self.beziers:
-            new_bezier = bezier.transform(matrix)
-            new_beziers.append(new_bezier)
-        return BezierPath(new_beziers)
+        return BezierPath(self.control_points @ matrix.T, self.subpath_starts)
 
     def translate(self, displacement):
-        new_beziers = []
-        for bezier in self.beziers:
-            new_bezier = bezier.translate(displacement)
-            new_beziers.append(new_bezier)
-        return BezierPath(new_beziers)
+        return BezierPath(
+            self.control_points + displacement[np.newaxis, np.newaxis, :],
+            self.subpath_starts,
+        )
+
+    def evaluate(self, t):
+        """Evaluate every segment of this path at each of the parameters t.
+
+        Returns an array of shape (N, len(t), 2).
+        """
+        t = np.atleast_1d(np.asarray(t, dtype=float))
+        s = 1 - t
+        basis = np.stack([s * s * s, 3 * t * s * s, 3 * t * t * s, t * t * t], axis=1)
+        return np.einsum("tk,nkd->ntd", basis, self.control_points)
+
+    def flatten(self, tolerance=0.01, max_steps=1024):
+        """Approximate this path with a polygon that stays within tolerance of
+        it.
+
+        Each segment is cut into equal steps in t, as few as Wang's formula
+        allows: a cubic whose control points have second differences of length
+        at most L is within tolerance of its chords with
+        ceil(sqrt(3 L / (4 tolerance))) steps. Flat segments get one chord and
+        tight ones as many as they need, up to max_steps. All segments are
+        evaluated at once.
+
+        Returns the vertices as an array of shape (M, 2). The end of each
+        segment is left out, since it's the start of the next, except at the
+        end of a path that isn't closed. A path with several subpaths would
+        become one self-intersecting polygon, so it raises ValueError; flatten
+        each of get_subpaths() instead.
+        """
+        if len(self.subpath_starts) > 1:
+            raise ValueError(
+                "Can't flatten a path with several subpaths into one polygon"
+            )
+        control_points = self.control_points
+        second_differences = (
+            control_points[:, :-2] - 2 * control_points[:, 1:-1] + control_points[:, 2:]
+        )
+        lengths = np.max(np.hypot(*np.moveaxis(second_differences, -1, 0)), axis=1)
+        steps = np.ceil(np.sqrt(0.75 * lengths / tolerance)).astype(int)
+        steps = np.clip(steps, 1, max_steps)
+
+        segments = np.repeat(np.arange(len(steps)), steps)
+        starts = np.cumsum(steps) - steps
+        t = (np.arange(len(segments)) - starts[segments]) / steps[segments]
+        s = 1 - t
+        basis = np.stack([s * s * s, 3 * t * s * s, 3 * t * t * s, t * t * t], axis=1)
+        polygon = np.einsum("mk,mkd->md", basis, control_points[segments])
+        end = control_points[-1, 3]
+        if len(polygon) > 0 and np.max(np.abs(end - control_points[0, 0])) > 1e-9:
+            polygon = np.concatenate([polygon, end[np.newaxis]])
+        return polygon
 
     def plot(self):
         import matplotlib.pyplot as plt
 
-        for bezier in self.beziers:
-            t = np.linspace(0, 1, 20, endpoint=False)
-            points = bezier(t)
-            x = points[:, 0]
-            y = points[:, 1]
-            plt.scatter(x, y)
+        t = np.linspace(0, 1, 20, endpoint=False)
+        points = self.evaluate(t)
+        segment_indices = np.repeat(np.arange(len(self)), len(t))
+        points = points.reshape((-1, 2))
+        plt.scatter(points[:, 0], points[:, 1], c=segment_indices)
         plt.show()
 
     def as_json(self):
@@ -265,35 +562,158 @@ class BezierPath:
 
     def as_svg_path(self):
         parts = []
-        parts.append("M")
-        parts.extend(self.beziers[0].control_points[0, :])
-        for bezier in self.beziers:
-            parts.append("C")
-            for i in range(1, 4):
-                parts.append(round(bezier.control_points[i, 0], 3))
-                parts.append(round(bezier.control_points[i, 1], 3))
-        parts.append("Z")
+        for subpath in self.get_subpaths():
+            parts.append("M")
+            parts.extend(subpath.control_points[0, 0, :].tolist())
+            segments = np.round(subpath.control_points[:, 1:, :], 3).reshape((-1, 6))
+            for segment in segments.tolist():
+                parts.append("C")
+                parts.extend(segment)
+            parts.append("Z")
         return " ".join([str(x) for x in parts])
 
     def get_furthest_point_from(self, point):
-        best = None
-        best_distance = 0
-        for bezier in self.beziers:
-            candidate = bezier.get_furthest_point_from(point)
-            distance = (
-                (candidate[0] - point[0]) ** 2
-                + (candidate[1] - point[1]) ** 2
-            )
-            if distance > best_distance:
-                best = candidate
-                best_distance = distance
-        return best
+        return get_furthest_point(self.control_points, point)
+
+    def get_bvh(self):
+        """Get a bounding volume hierarchy over the segments of this path for
+        fast intersection, proximity and containment queries. It is built on
+        the first call and reused afterwards."""
+        if self._bvh is None:
+            import venn7.bvh
+
+            self._bvh = venn7.bvh.BoundingVolumeHierarchy(self.control_points)
+        return self._bvh
+
+    def get_signed_area(self):
+        """Get the area enclosed by this path, positive if the path runs
+        counterclockwise.
+
+        The area is half the integral of x dy - y dx. On a cubic segment that
+        integrand is a polynomial of degree 5 in t, so three-point
+        Gauss-Legendre quadrature computes it exactly.
+        """
+        nodes, weights = np.polynomial.legendre.leggauss(3)
+        t = (nodes + 1) / 2
+        coefficients = get_polynomial_coefficients(self.control_points)
+        powers = t[:, np.newaxis] ** np.arange(4)
+        derivative_powers = np.zeros_like(powers)
+        derivative_powers[:, 1:] = powers[:, :-1] * np.arange(1, 4)
+        points = np.einsum("tk,nkd->ntd", powers, coefficients)
+        tangents = np.einsum("tk,nkd->ntd", derivative_powers, coefficients)
+        integrand = (
+            points[:, :, 0] * tangents[:, :, 1] - points[:, :, 1] * tangents[:, :, 0]
+        )
+        return float(np.sum(integrand * weights) / 4)
 
     def remove_tiny_segments(self, threshold):
-        filtered_beziers = [
-            x for x in self.beziers if not x.is_tiny(threshold)
-        ]
-        return BezierPath(filtered_beziers)
+        chords = self.control_points[:, 3, :] - self.control_points[:, 0, :]
+        distances = np.hypot(chords[:, 0], chords[:, 1])
+        keep = distances >= threshold
+        # Subpaths move back by the number of segments removed before them, and
+        # subpaths with no segments left disappear.
+        kept_before = np.concatenate([[0], np.cumsum(keep)])
+        ends = np.append(self.subpath_starts[1:], len(self))
+        nonempty = kept_before[ends] > kept_before[self.subpath_starts]
+        subpath_starts = kept_before[self.subpath_starts[nonempty]]
+        return BezierPath(self.control_points[keep], subpath_starts)
+
+
+def get_metafont_control_points(start, end, theta, phi, tension_1, tension_2):
+    """Vectorized form of MetafontBezier for many segments at once.
+
+    start and end are arrays of shape (N, 2) and the remaining arguments are
+    arrays of shape (N,). The angles are relative to the line connecting the
+    endpoints, as with relative_angles=True in MetafontBezier. Returns control
+    points of shape (N, 4, 2).
+    """
+    start = np.asarray(start, dtype=float)
+    end = np.asarray(end, dtype=float)
+    st1 = np.sin(theta)
+    st2 = np.sin(phi)
+    ct1 = np.cos(theta)
+    ct2 = np.cos(phi)
+
+    a = math.sqrt(2)
+    b = 1 / 16
+    c = (3 - math.sqrt(5)) / 2
+    alpha = a * (st1 - b * st2) * (st2 - b * st1) * (ct1 - ct2)
+    rho = (2 + alpha) / (1 + (1 - c) * ct1 + c * ct2)
+    sigma = (2 - alpha) / (1 + (1 - c) * ct2 + c * ct1)
+
+    tmp_1 = rho / (3 * np.asarray(tension_1))
+    tmp_2 = sigma / (3 * np.asarray(tension_2))
+    zeros = np.zeros_like(tmp_1)
+    ones = np.ones_like(tmp_1)
+    x_hat = np.stack([zeros, tmp_1 * ct1, 1 - tmp_2 * ct2, ones], axis=1)
+    y_hat = np.stack([zeros, tmp_1 * st1, tmp_2 * st2, zeros], axis=1)
+    x_hat = x_hat[:, :, np.newaxis]
+    y_hat = y_hat[:, :, np.newaxis]
+
+    delta = end - start
+    perpendicular = np.stack([-delta[:, 1], delta[:, 0]], axis=1)
+    return (
+        start[:, np.newaxis, :]
+        + x_hat * delta[:, np.newaxis, :]
+        + y_hat * perpendicular[:, np.newaxis, :]
+    )
+
+
+def solve_cyclic_tridiagonal(lower, diagonal, upper, rhs):
+    """Solve a cyclic tridiagonal system of equations in O(n) time.
+
+    Row i of the system reads
+
+        lower[i] * x[i - 1] + diagonal[i] * x[i] + upper[i] * x[i + 1] = rhs[i]
+
+    with indices taken modulo n. The two corner entries are removed with the
+    Sherman-Morrison formula, leaving two ordinary tridiagonal systems that are
+    solved together with the Thomas algorithm.
+    """
+    lower = np.asarray(lower, dtype=float)
+    diagonal = np.asarray(diagonal, dtype=float)
+    upper = np.asarray(upper, dtype=float)
+    rhs = np.asarray(rhs, dtype=float)
+    n = diagonal.shape[0]
+
+    if n < 3:
+        A = np.diag(diagonal)
+        for i in range(n):
+            A[i, (i - 1) % n] += lower[i]
+            A[i, (i + 1) % n] += upper[i]
+        return np.linalg.solve(A, rhs)
+
+    # A[0, n - 1] and A[n - 1, 0] respectively.
+    beta = lower[0]
+    alpha = upper[n - 1]
+    gamma = -diagonal[0]
+
+    modified_diagonal = diagonal.copy()
+    modified_diagonal[0] -= gamma
+    modified_diagonal[n - 1] -= alpha * beta / gamma
+
+    u = np.zeros(n)
+    u[0] = gamma
+    u[n - 1] = alpha
+    columns = np.stack([rhs, u], axis=1)
+
+    # Thomas algorithm on both right-hand sides at once.
+    c_prime = np.zeros(n)
+    d_prime = np.zeros((n, 2))
+    c_prime[0] = upper[0] / modified_diagonal[0]
+    d_prime[0] = columns[0] / modified_diagonal[0]
+    for i in range(1, n):
+        denominator = modified_diagonal[i] - lower[i] * c_prime[i - 1]
+        c_prime[i] = upper[i] / denominator
+        d_prime[i] = (columns[i] - lower[i] * d_prime[i - 1]) / denominator
+    solution = np.zeros((n, 2))
+    solution[n - 1] = d_prime[n - 1]
+    for i in range(n - 2, -1, -1):
+        solution[i] = d_prime[i] - c_prime[i] * solution[i + 1]
+
+    y, z = solution[:, 0], solution[:, 1]
+    factor = (y[0] + beta * y[n - 1] / gamma) / (1 + z[0] + beta * z[n - 1] / gamma)
+    return y - factor * z
 
 
 class MetafontSpline(BezierPath):
@@ -312,8 +732,8 @@ class MetafontSpline(BezierPath):
             self.tension_after = np.ones(n)
             self.tension_before = np.ones(n)
         else:
-            self.tension_after = tensions
-            self.tension_before = np.roll(tensions, 1)
+            self.tension_after = np.asarray(tensions, dtype=float)
+            self.tension_before = np.roll(self.tension_after, 1)
 
         # system of equations:
         # mock_curvature(phi[i], theta[i - 1], tension_before[i], tension_before[i - 1]) / distances[i - 1]
@@ -325,69 +745,37 @@ class MetafontSpline(BezierPath):
         # = tension_after^2 * (2 / tension_before - 6) theta
         # + tension_after^2 * (2 / tension_before) * phi
 
-        def theta(i):
-            return i % n
-
-        def phi(i):
-            return n + i % n
-
-        def d(i):
-            return distances[i % n]
-
-        A = np.zeros((n * 2, n * 2))
-        b = np.zeros((n * 2,))
-        row = 0
-
-        def stamp_mock_curvature(theta, phi, tension_before, tension_after, scale):
-            tmp = tension_after * tension_after
-            A[row, theta] = tmp * (2 / tension_before - 6) * scale
-            A[row, phi] = tmp * 2 / tension_before * scale
-
-        for i in range(n):
-            stamp_mock_curvature(
-                phi(i),
-                theta(i - 1),
-                self.tension_before[i],
-                self.tension_after[(i - 1) % n],
-                scale=1 / d(i - 1),
-            )
-            stamp_mock_curvature(
-                theta(i),
-                phi(i + 1),
-                self.tension_after[i],
-                self.tension_before[(i + 1) % n],
-                scale=-1 / d(i),
-            )
-            b[row] = 0
-            row += 1
-        for i in range(n):
-            A[row, phi(i)] = 1
-            A[row, theta(i)] = 1
-            b[row] = -psi[i]
-            row += 1
-
-        x = np.linalg.solve(A, b)
-        self.theta = x[:n]
-        self.phi = x[n:]
-
-        beziers = []
-        for i in range(n):
-            point_1 = self.points[i]
-            point_2 = self.points[(i + 1) % n]
-            bezier = MetafontBezier(
-                point_1[0],
-                point_1[1],
-                point_2[0],
-                point_2[1],
-                self.theta[i],
-                self.phi[(i + 1) % n],
-                tension_1=self.tension_after[i],
-                tension_2=self.tension_before[(i + 1) % n],
-                relative_angles=True,
-            )
-            beziers.append(bezier)
-
-        super().__init__(beziers)
+        # Substituting phi[i] = -psi[i] - theta[i] leaves a cyclic tridiagonal
+        # system in theta alone:
+        # lower[i] * theta[i - 1] + diagonal[i] * theta[i] + upper[i] * theta[i + 1]
+        # = rhs[i]
+        tension_after_previous = np.roll(self.tension_after, 1)
+        tension_before_next = np.roll(self.tension_before, -1)
+        scale_before = tension_after_previous ** 2 / np.roll(distances, 1)
+        scale_after = self.tension_after ** 2 / distances
+
+        # Coefficients of phi[i] and theta[i - 1] in the first term.
+        phi_coefficient = scale_before * (2 / self.tension_before - 6)
+        lower = scale_before * 2 / self.tension_before
+        # Coefficients of theta[i] and phi[i + 1] in the second term.
+        theta_coefficient = scale_after * (2 / tension_before_next - 6)
+        upper = scale_after * 2 / tension_before_next
+
+        diagonal = -phi_coefficient - theta_coefficient
+        rhs = phi_coefficient * psi - upper * np.roll(psi, -1)
+
+        self.theta = solve_cyclic_tridiagonal(lower, diagonal, upper, rhs)
+        self.phi = -psi - self.theta
+
+        control_points = get_metafont_control_points(
+            self.points,
+            np.roll(self.points, -1, axis=0),
+            self.theta,
+            np.roll(self.phi, -1),
+            self.tension_after,
+            tension_before_next,
+        )
+        super().__init__(control_points)
 
 
 class AngleSpline(BezierPath):
@@ -0,0 +1,95 @@
+"""A compact binary encoding of Bezier paths for the web app.
+
+Coordinates are multiplied by a scale and rounded to integers. Within each path,
+every point is stored as its difference from the previous one, which keeps the
+numbers small, and the differences are packed as little-endian 16-bit integers.
+As in SVG paths, each subpath stores its start point followed by the last three
+control points of each segment, since every segment starts where the previous
+one ended.
+
+The layout of the paths is stored separately as 16-bit unsigned integers: for
+each path, the number of subpaths, followed by the number of segments in each
+subpath. Both arrays are base64 encoded so they can be embedded in JSON.
+"""
+import base64
+
+import numpy as np
+
+import venn7.bezier
+
+# The default number of steps per unit of length. Diagrams span about 100
+# units, so this keeps coordinates well within 16 bits.
+SCALE = 256
+
+COORDINATE_DTYPE = np.dtype("<i2")
+STRUCTURE_DTYPE = np.dtype("<u2")
+
+
+def encode_array(array, dtype):
+    """Convert an array of integers to dtype and encode it in base64."""
+    array = np.asarray(array)
+    info = np.iinfo(dtype)
+    if array.size > 0 and (array.min() < info.min or array.max() > info.max):
+        raise ValueError(f"Values don't fit in {dtype}, try a smaller scale")
+    return base64.b64encode(array.astype(dtype).tobytes()).decode("ascii")
+
+
+def decode_array(encoded, dtype):
+    """The inverse of encode_array."""
+    return np.frombuffer(base64.b64decode(encoded), dtype=dtype)
+
+
+def encode_paths(paths, scale=SCALE):
+    """Encode a list of BezierPaths.
+
+    Returns a dict with the scale and the base64 encoded "coordinates" and
+    "structure" arrays.
+    """
+    coordinates = []
+    structure = []
+    for path in paths:
+        subpaths = path.get_subpaths()
+        structure.append(len(subpaths))
+        points = []
+        for subpath in subpaths:
+            structure.append(len(subpath))
+            points.append(subpath.control_points[:1, 0])
+            points.append(subpath.control_points[:, 1:].reshape((-1, 2)))
+        if points:
+            quantized = np.round(np.concatenate(points) * scale).astype(np.int64)
+            coordinates.append(np.diff(quantized, axis=0, prepend=0).ravel())
+    coordinates = np.concatenate(coordinates) if coordinates else np.zeros(0)
+    return {
+        "scale": scale,
+        "coordinates": encode_array(coordinates, COORDINATE_DTYPE),
+        "structure": encode_array(structure, STRUCTURE_DTYPE),
+    }
+
+
+def decode_paths(encoded):
+    """The inverse of encode_paths. Returns a list of BezierPaths."""
+    deltas = decode_array(encoded["coordinates"], COORDINATE_DTYPE).reshape((-1, 2))
+    structure = decode_array(encoded["structure"], STRUCTURE_DTYPE).tolist()
+    paths = []
+    position = 0
+    i = 0
+    while i < len(structure):
+        segment_counts = structure[i + 1 : i + 1 + structure[i]]
+        i += 1 + len(segment_counts)
+        size = sum(1 + 3 * count for count in segment_counts)
+        points = np.cumsum(deltas[position : position + size], axis=0)
+        points = points / encoded["scale"]
+        position += size
+
+        control_points = []
+        subpath_starts = []
+        start = 0
+        for count in segment_counts:
+            subpath_starts.append(len(control_points))
+            for j in range(count):
+                control_points.append(points[start + 3 * j : start + 3 * j + 4])
+            start += 1 + 3 * count
+        paths.append(
+            venn7.bezier.BezierPath(np.array(control_points), subpath_starts)
+        )
+    return paths
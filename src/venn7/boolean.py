@@ -0,0 +1,418 @@
+"""Boolean operations on closed BezierPaths, in pure Python and NumPy.
+
+Rather than computing each region of a diagram with its own chain of
+intersections and differences, all curves are overlaid at once. Every curve
+is split at its intersections with the others into edges, every edge is
+labelled with the curves on either side of it, and the edges bounding each
+region are chained into closed loops.
+"""
+import numpy as np
+
+import venn7.bezier
+
+
+def get_bounding_boxes(control_points):
+    """Get the bounding boxes of the control polygons of cubic Bezier segments
+    of shape (..., 4, 2). By the convex hull property each box contains its
+    segment. Returns the minima and maxima, each of shape (..., 2)."""
+    return np.min(control_points, axis=-2), np.max(control_points, axis=-2)
+
+
+def boxes_overlap(minima_a, maxima_a, minima_b, maxima_b, tolerance=0.0):
+    return np.all(
+        (minima_a <= maxima_b + tolerance) & (minima_b <= maxima_a + tolerance),
+        axis=-1,
+    )
+
+
+def get_candidate_pairs(control_points_a, control_points_b):
+    """Find all pairs of segments whose control polygon bounding boxes overlap.
+    Returns two arrays of segment indices."""
+    minima_a, maxima_a = get_bounding_boxes(control_points_a)
+    minima_b, maxima_b = get_bounding_boxes(control_points_b)
+    overlap = boxes_overlap(
+        minima_a[:, np.newaxis], maxima_a[:, np.newaxis], minima_b, maxima_b
+    )
+    return np.nonzero(overlap)
+
+
+def _evaluate(coefficients, t):
+    powers = t[:, np.newaxis] ** np.arange(4)
+    derivative_powers = np.zeros_like(powers)
+    derivative_powers[:, 1:] = powers[:, :-1] * np.arange(1, 4)
+    points = np.einsum("kp,kpd->kd", powers, coefficients)
+    tangents = np.einsum("kp,kpd->kd", derivative_powers, coefficients)
+    return points, tangents
+
+
+def _refine_intersections(control_points_a, control_points_b, t_a, t_b):
+    """Polish approximate intersection parameters with Newton's method on
+    A(t_a) - B(t_b) = 0."""
+    coefficients_a = venn7.bezier.get_polynomial_coefficients(control_points_a)
+    coefficients_b = venn7.bezier.get_polynomial_coefficients(control_points_b)
+    for __ in range(4):
+        points_a, tangents_a = _evaluate(coefficients_a, t_a)
+        points_b, tangents_b = _evaluate(coefficients_b, t_b)
+        residual = points_a - points_b
+        jacobian = np.stack([tangents_a, -tangents_b], axis=-1)
+        determinant = np.linalg.det(jacobian)
+        solvable = np.abs(determinant) > 1e-12
+        step = np.zeros_like(residual)
+        step[solvable] = np.linalg.solve(
+            jacobian[solvable], residual[solvable][:, :, np.newaxis]
+        )[:, :, 0]
+        t_a = np.clip(t_a - step[:, 0], 0, 1)
+        t_b = np.clip(t_b - step[:, 1], 0, 1)
+    return t_a, t_b
+
+
+def find_intersections(
+    control_points_a,
+    control_points_b,
+    candidate_pairs=None,
+    tolerance=1e-7,
+    max_candidates=1000000,
+):
+    """Find the intersections of two sets of cubic Bezier segments.
+
+    All candidate pairs of segments are subdivided in lockstep: at every step
+    each surviving pair is split in half on both sides and pairs of halves whose
+    bounding boxes no longer overlap are discarded. Pairs that shrink below the
+    tolerance are polished with Newton's method.
+
+    Parameters
+    ----------
+
+    control_points_a, control_points_b : array
+        Control points of shape (N_a, 4, 2) and (N_b, 4, 2).
+
+    candidate_pairs : tuple of arrays, optional
+        Pairs of segment indices that may intersect. Defaults to all pairs with
+        overlapping bounding boxes.
+
+    Returns
+    -------
+
+    Four arrays: the segment indices and parameters of each intersection on a,
+    then the same on b. Intersections that lie on a shared endpoint of two
+    segments may be reported once per segment.
+    """
+    if candidate_pairs is None:
+        candidate_pairs = get_candidate_pairs(control_points_a, control_points_b)
+    index_a, index_b = [np.asarray(x, dtype=int) for x in candidate_pairs]
+    a = control_points_a[index_a]
+    b = control_points_b[index_b]
+    # Parameter interval [start, start + width] of each subdivided piece.
+    start_a = np.zeros(len(index_a))
+    start_b = np.zeros(len(index_b))
+    width = 1.0
+
+    found_a, found_b, found_t_a, found_t_b = [], [], [], []
+    while len(index_a) > 0:
+        minima_a, maxima_a = get_bounding_boxes(a)
+        minima_b, maxima_b = get_bounding_boxes(b)
+        keep = boxes_overlap(minima_a, maxima_a, minima_b, maxima_b, tolerance)
+        size = np.maximum(
+            np.max(maxima_a - minima_a, axis=-1), np.max(maxima_b - minima_b, axis=-1)
+        )
+        converged = keep & (size < tolerance)
+        found_a.append(index_a[converged])
+        found_b.append(index_b[converged])
+        found_t_a.append(start_a[converged] + width / 2)
+        found_t_b.append(start_b[converged] + width / 2)
+
+        keep &= ~converged
+        index_a, index_b = index_a[keep], index_b[keep]
+        start_a, start_b = start_a[keep], start_b[keep]
+        a, b = a[keep], b[keep]
+        if len(index_a) * 4 > max_candidates:
+            raise RuntimeError(
+                "Too many intersection candidates; do the curves overlap?"
+            )
+
+        width /= 2
+        halves_a = venn7.bezier.split_control_points(a, 0.5)
+        halves_b = venn7.bezier.split_control_points(b, 0.5)
+        a = np.concatenate([halves_a[0], halves_a[0], halves_a[1], halves_a[1]])
+        b = np.concatenate([halves_b[0], halves_b[1], halves_b[0], halves_b[1]])
+        index_a = np.tile(index_a, 4)
+        index_b = np.tile(index_b, 4)
+        start_a = np.concatenate(
+            [start_a, start_a, start_a + width, start_a + width]
+        )
+        start_b = np.concatenate(
+            [start_b, start_b + width, start_b, start_b + width]
+        )
+
+    index_a = np.concatenate(found_a)
+    index_b = np.concatenate(found_b)
+    t_a, t_b = _refine_intersections(
+        control_points_a[index_a],
+        control_points_b[index_b],
+        np.concatenate(found_t_a),
+        np.concatenate(found_t_b),
+    )
+    return index_a, t_a, index_b, t_b
+
+
+def _merge_nearby_points(points, merge_distance):
+    """Return the indices of a subset of points such that every point is within
+    merge_distance of a kept point in both coordinates. Points are swept in
+    order of x so that each is only compared with its neighbors."""
+    keep = []
+    for i in np.argsort(points[:, 0], kind="stable").tolist():
+        duplicate = False
+        for j in reversed(keep):
+            if points[i, 0] - points[j, 0] > merge_distance:
+                break
+            if abs(points[i, 1] - points[j, 1]) <= merge_distance:
+                duplicate = True
+                break
+        if not duplicate:
+            keep.append(i)
+    return np.sort(np.array(keep, dtype=int))
+
+
+def find_crossings(curves, tolerance=1e-7):
+    """Find the points where any two of a list of closed BezierPaths cross.
+
+    Candidate segment pairs for every pair of curves come from their bounding
+    volume hierarchies, and all of them are subdivided together in a single
+    call to find_intersections.
+
+    Returns five arrays with one entry per crossing: the index of the first
+    curve, the position of the crossing along it as a "global parameter"
+    u = segment index + t in [0, len(curve)), the same for the second curve,
+    and the crossing points. Each crossing is reported once.
+    """
+    control_points = np.concatenate([curve.control_points for curve in curves])
+    offsets = np.cumsum([0] + [len(curve) for curve in curves])
+    curve_of_segment = np.repeat(np.arange(len(curves)), [len(c) for c in curves])
+
+    candidates_a, candidates_b = [], []
+    for i in range(len(curves)):
+        for j in range(i + 1, len(curves)):
+            pairs = curves[i].get_bvh().get_intersection_candidates(curves[j].get_bvh())
+            candidates_a.append(pairs[0] + offsets[i])
+            candidates_b.append(pairs[1] + offsets[j])
+    if not candidates_a:
+        empty = np.zeros(0)
+        return empty.astype(int), empty, empty.astype(int), empty, np.zeros((0, 2))
+
+    index_a, t_a, index_b, t_b = find_intersections(
+        control_points,
+        control_points,
+        candidate_pairs=(np.concatenate(candidates_a), np.concatenate(candidates_b)),
+        tolerance=tolerance,
+    )
+    coefficients = venn7.bezier.get_polynomial_coefficients(control_points[index_a])
+    points, __ = _evaluate(coefficients, t_a)
+
+    # Merge duplicates: the same crossing found through several candidate
+    # pairs, or on both sides of a segment boundary. The curves of a simple
+    # arrangement never cross three at a time, so nearby points are the same
+    # crossing.
+    keep = _merge_nearby_points(points, tolerance * 100)
+    index_a, t_a, index_b, t_b = index_a[keep], t_a[keep], index_b[keep], t_b[keep]
+    curve_a = curve_of_segment[index_a]
+    curve_b = curve_of_segment[index_b]
+    lengths = offsets[1:] - offsets[:-1]
+    u_a = (index_a - offsets[curve_a] + t_a) % lengths[curve_a]
+    u_b = (index_b - offsets[curve_b] + t_b) % lengths[curve_b]
+    return curve_a, u_a, curve_b, u_b, points[keep]
+
+
+def find_path_intersections(path_a, path_b, tolerance=1e-7):
+    """Find the points where two closed BezierPaths cross.
+
+    Returns the positions of the intersections along each path as arrays of
+    "global parameters" u = segment index + t in [0, len(path)), along with the
+    intersection points. Each intersection is reported once.
+    """
+    __, u_a, __, u_b, points = find_crossings([path_a, path_b], tolerance)
+    return u_a, u_b, points
+
+
+def get_subpath(path, u_start, u_end):
+    """Get the part of a closed path between two global parameters as an array
+    of control points. If u_end <= u_start, the part wraps around the end of
+    the path."""
+    length = len(path)
+    if u_end <= u_start:
+        u_end += length
+    pieces = []
+    segment = int(np.floor(u_start))
+    while segment < u_end:
+        t_start = max(u_start - segment, 0.0)
+        t_end = min(u_end - segment, 1.0)
+        if t_end - t_start > 1e-12:
+            pieces.append(
+                venn7.bezier.get_subsegment(
+                    path.control_points[segment % length], t_start, t_end
+                )
+            )
+        segment += 1
+    return np.array(pieces).reshape((-1, 4, 2))
+
+
+def _remove_duplicate_vertices(curves, vertices_on_curve, vertex_curves, gap=1e-9):
+    """Drop vertices that are too close to the previous one along a curve to
+    leave an edge between them.
+
+    vertices_on_curve holds a list of (global parameter, vertex) pairs for each
+    curve, and vertex_curves the set of the two curves that cross at each
+    vertex. Two such vertices where the same curves cross are one crossing
+    found twice, and only the first is kept. If different curves cross there,
+    three curves meet at a point, and a ValueError is raised.
+    """
+    duplicates = set()
+    for i, curve in enumerate(curves):
+        vertices = sorted(vertices_on_curve[i])
+        if len(vertices) < 2:
+            continue
+        for (u, vertex), (u_next, next_vertex) in zip(
+            vertices, vertices[1:] + vertices[:1]
+        ):
+            if (u_next - u) % len(curve) >= gap:
+                continue
+            if vertex in duplicates or next_vertex in duplicates:
+                continue
+            if vertex_curves[vertex] != vertex_curves[next_vertex]:
+                meeting = sorted(vertex_curves[vertex] | vertex_curves[next_vertex])
+                raise ValueError(
+                    f"Curves {meeting} meet at a point, so the arrangement "
+                    "isn't simple"
+                )
+            duplicates.add(next_vertex)
+    return [
+        [(u, vertex) for u, vertex in vertices if vertex not in duplicates]
+        for vertices in vertices_on_curve
+    ]
+
+
+def compute_regions(curves, masks=None, flattening_tolerance=0.01):
+    """Compute the regions of an arrangement of closed, simple curves that
+    cross each other transversally, such as the curves of a simple Venn
+    diagram.
+
+    Parameters
+    ----------
+
+    curves : list of BezierPath
+        The curves. Bit i of a region mask stands for curve i.
+
+    masks : iterable of int, optional
+        The region masks to compute. Defaults to every nonempty mask that has a
+        region.
+
+    flattening_tolerance : float
+        How far the polygons used to decide which curves contain each edge may
+        stray from the curves. The midpoint of each edge is tested against
+        them with the even-odd rule, which agrees with the winding number
+        since the curves are simple.
+
+    Returns
+    -------
+
+    A dict mapping region masks to BezierPaths. Each region is traced
+    counterclockwise. A region made of several loops has one subpath per
+    loop.
+    """
+    n = len(curves)
+    polygons = [curve.flatten(flattening_tolerance) for curve in curves]
+    counterclockwise = [curve.get_signed_area() > 0 for curve in curves]
+
+    # Every crossing is a vertex of the arrangement. For each curve, collect the
+    # global parameters of the vertices on it.
+    vertices_on_curve = [[] for __ in range(n)]
+    vertex_curves = []
+    curve_a, u_a, curve_b, u_b, __ = find_crossings(curves)
+    for vertex, (i, u_i, j, u_j) in enumerate(
+        zip(curve_a.tolist(), u_a.tolist(), curve_b.tolist(), u_b.tolist())
+    ):
+        vertices_on_curve[i].append((u_i, vertex))
+        vertices_on_curve[j].append((u_j, vertex))
+        vertex_curves.append(frozenset((i, j)))
+    # Every edge between two vertices must have a midpoint to label it by.
+    vertices_on_curve = _remove_duplicate_vertices(
+        curves, vertices_on_curve, vertex_curves
+    )
+
+    # Split every curve into edges between consecutive vertices. Each edge is
+    # (start vertex, end vertex, control points), directed along the curve.
+    # edges_by_region maps a mask to the edges bounding that region, directed
+    # so that the region is on their left.
+    edges_by_region = {}
+    for i, curve in enumerate(curves):
+        vertices = sorted(vertices_on_curve[i])
+        if not vertices:
+            # A curve that crosses nothing is a single closed edge.
+            vertices = [(0.0, -1 - i)]
+        edges = []
+        midpoints = []
+        for k, (u_start, start_vertex) in enumerate(vertices):
+            u_end, end_vertex = vertices[(k + 1) % len(vertices)]
+            control_points = get_subpath(curve, u_start, u_end)
+            edges.append((start_vertex, end_vertex, control_points))
+            midpoint_segment = control_points[len(control_points) // 2]
+            midpoints.append(venn7.bezier.CubicBezier(midpoint_segment)(0.5))
+        midpoints = np.array(midpoints).reshape((-1, 2))
+
+        outside_masks = np.zeros(len(edges), dtype=int)
+        for j, polygon in enumerate(polygons):
+            if j != i:
+                inside = venn7.bezier.points_in_polygon(midpoints, polygon)
+                outside_masks[inside] |= 1 << j
+
+        for (start_vertex, end_vertex, control_points), outside_mask in zip(
+            edges, outside_masks.tolist()
+        ):
+            forward = (start_vertex, end_vertex, control_points)
+            backward = (end_vertex, start_vertex, control_points[::-1, ::-1, :])
+            inside_mask = outside_mask | (1 << i)
+            if counterclockwise[i]:
+                sides = [(inside_mask, forward), (outside_mask, backward)]
+            else:
+                sides = [(inside_mask, backward), (outside_mask, forward)]
+            for mask, edge in sides:
+                if mask != 0:
+                    edges_by_region.setdefault(mask, []).append(edge)
+
+    if masks is None:
+        masks = sorted(edges_by_region.keys())
+    regions = {}
+    for mask in masks:
+        if mask not in edges_by_region:
+            raise ValueError(f"Region {mask} is empty")
+        loops = [
+            np.concatenate(loop) for loop in _chain_edges(edges_by_region[mask])
+        ]
+        subpath_starts = np.cumsum([0] + [len(loop) for loop in loops[:-1]])
+        regions[mask] = venn7.bezier.BezierPath(np.concatenate(loops), subpath_starts)
+    return regions
+
+
+def _chain_edges(edges):
+    """Chain directed edges into closed loops, matching the end vertex of each
+    edge to the start vertex of the next. Returns one list per loop of the
+    control point arrays of its edges in order."""
+    by_start = {}
+    for edge in edges:
+        if edge[0] in by_start:
+            raise ValueError(f"Two edges of one region leave vertex {edge[0]}")
+        by_start[edge[0]] = edge
+    loops = []
+    while by_start:
+        first_vertex = next(iter(by_start))
+        vertex = first_vertex
+        loop = []
+        while True:
+            edge = by_start.pop(vertex, None)
+            if edge is None:
+                raise ValueError(f"Region boundary is not closed at vertex {vertex}")
+            loop.append(edge[2])
+            vertex = edge[1]
+            if vertex == first_vertex:
+                break
+        loops.append(loop)
+    return loops
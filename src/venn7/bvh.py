@@ -0,0 +1,250 @@
+"""A bounding volume hierarchy over the segments of a BezierPath.
+
+Each leaf is the bounding box of one segment's control polygon, which contains
+the segment by the convex hull property. Internal nodes are built top-down by
+splitting their segments at the median along the longer axis, so the tree is
+balanced and queries visit O(log N) nodes on well-behaved paths. Exact answers
+are computed only on the segments that survive pruning.
+"""
+import heapq
+
+import numpy as np
+
+import venn7.bezier
+
+
+class BoundingVolumeHierarchy:
+    """A bounding volume hierarchy over cubic Bezier segments.
+
+    Parameters
+    ----------
+
+    control_points : array
+        Control points of shape (N, 4, 2).
+
+    Attributes
+    ----------
+
+    minima, maxima : array
+        The corners of each node's bounding box, of shape (M, 2).
+
+    children : array
+        The indices of each node's two children, of shape (M, 2). Leaves have
+        -1 here.
+
+    segments : array
+        The segment index of each leaf, or -1 for internal nodes.
+
+    Node 0 is the root.
+    """
+
+    def __init__(self, control_points):
+        self.control_points = np.asarray(control_points, dtype=float)
+        segment_minima = np.min(self.control_points, axis=1)
+        segment_maxima = np.max(self.control_points, axis=1)
+        centroids = (segment_minima + segment_maxima) / 2
+
+        minima, maxima, children, segments = [], [], [], []
+
+        def add_node(indices):
+            node = len(minima)
+            minima.append(np.min(segment_minima[indices], axis=0))
+            maxima.append(np.max(segment_maxima[indices], axis=0))
+            children.append([-1, -1])
+            segments.append(indices[0] if len(indices) == 1 else -1)
+            return node
+
+        stack = []
+        if len(self.control_points) > 0:
+            root_indices = np.arange(len(self.control_points))
+            stack.append((add_node(root_indices), root_indices))
+        while stack:
+            node, indices = stack.pop()
+            if len(indices) == 1:
+                continue
+            extent = maxima[node] - minima[node]
+            axis = int(np.argmax(extent))
+            order = indices[np.argsort(centroids[indices, axis], kind="stable")]
+            half = len(order) // 2
+            for k, part in enumerate([order[:half], order[half:]]):
+                child = add_node(part)
+                children[node][k] = child
+                stack.append((child, part))
+
+        self.minima = np.array(minima).reshape((-1, 2))
+        self.maxima = np.array(maxima).reshape((-1, 2))
+        self.children = np.array(children, dtype=int).reshape((-1, 2))
+        self.segments = np.array(segments, dtype=int)
+
+    def __len__(self):
+        return len(self.control_points)
+
+    def is_leaf(self, nodes):
+        return self.segments[nodes] >= 0
+
+    def get_intersection_candidates(self, other):
+        """Find all pairs of segments, one from this hierarchy and one from
+        other, whose bounding boxes overlap. Both trees are descended together
+        one level at a time. Returns two arrays of segment indices."""
+        if len(self) == 0 or len(other) == 0:
+            return np.zeros(0, dtype=int), np.zeros(0, dtype=int)
+        nodes_a = np.zeros(1, dtype=int)
+        nodes_b = np.zeros(1, dtype=int)
+        result_a, result_b = [], []
+        while len(nodes_a) > 0:
+            overlap = np.all(
+                (self.minima[nodes_a] <= other.maxima[nodes_b])
+                & (other.minima[nodes_b] <= self.maxima[nodes_a]),
+                axis=1,
+            )
+            nodes_a, nodes_b = nodes_a[overlap], nodes_b[overlap]
+            leaf_a = self.is_leaf(nodes_a)
+            leaf_b = other.is_leaf(nodes_b)
+            done = leaf_a & leaf_b
+            result_a.append(self.segments[nodes_a[done]])
+            result_b.append(other.segments[nodes_b[done]])
+
+            # Descend into the larger of two internal nodes, or the only one.
+            size_a = np.max(self.maxima[nodes_a] - self.minima[nodes_a], axis=1)
+            size_b = np.max(other.maxima[nodes_b] - other.minima[nodes_b], axis=1)
+            split_a = ~done & ~leaf_a & (leaf_b | (size_a >= size_b))
+            split_b = ~done & ~split_a
+            nodes_a = np.concatenate(
+                [
+                    self.children[nodes_a[split_a]].ravel(),
+                    np.repeat(nodes_a[split_b], 2),
+                ]
+            )
+            nodes_b = np.concatenate(
+                [
+                    np.repeat(nodes_b[split_a], 2),
+                    other.children[nodes_b[split_b]].ravel(),
+                ]
+            )
+        return np.concatenate(result_a), np.concatenate(result_b)
+
+    def _best_first_search(self, point, furthest):
+        """Find the nearest or furthest point on the segments from a point.
+
+        Nodes are visited in order of the best distance any point in their box
+        could reach, and the search stops once no remaining box can beat the
+        best exact answer found on a leaf so far.
+        """
+        point = np.asarray(point, dtype=float)
+        if furthest:
+            find_point = venn7.bezier.get_furthest_point
+        else:
+            find_point = venn7.bezier.get_nearest_point
+
+        def bound(node):
+            # Priority for the heap, which pops the smallest first.
+            if furthest:
+                corner = np.maximum(
+                    np.abs(self.minima[node] - point), np.abs(self.maxima[node] - point)
+                )
+                return -np.sum(np.square(corner))
+            gap = np.maximum(
+                0, np.maximum(self.minima[node] - point, point - self.maxima[node])
+            )
+            return np.sum(np.square(gap))
+
+        best = None
+        best_priority = np.inf
+        heap = [(bound(0), 0)] if len(self) > 0 else []
+        while heap:
+            priority, node = heapq.heappop(heap)
+            if priority >= best_priority:
+                break
+            if self.is_leaf(node):
+                segment = self.segments[node]
+                control_points = self.control_points[segment : segment + 1]
+                candidate = find_point(control_points, point)
+                distance = np.sum(np.square(np.array(candidate) - point))
+                candidate_priority = -distance if furthest else distance
+                if candidate_priority < best_priority:
+                    best, best_priority = candidate, candidate_priority
+            else:
+                for child in self.children[node]:
+                    child_priority = bound(child)
+                    if child_priority < best_priority:
+                        heapq.heappush(heap, (child_priority, child))
+        return best
+
+    def get_furthest_point(self, point):
+        """Find the point on the segments that is furthest from a point."""
+        return self._best_first_search(point, furthest=True)
+
+    def get_nearest_point(self, point):
+        """Find the point on the segments that is nearest to a point."""
+        return self._best_first_search(point, furthest=False)
+
+    def get_winding_number(self, point):
+        """Get the winding number of the segments, taken as a closed path,
+        around a point.
+
+        A ray is cast from the point in the +x direction. Only segments whose
+        boxes meet the ray are considered, and their crossings with the ray are
+        found by solving y(t) = y on each of them at once.
+
+        Crossings are counted with the half-open rule: a point of the path is
+        above the ray if its y is greater than the ray's, and every change from
+        below to above or back is a crossing. Each segment is checked at both
+        ends, which are read from the control points, and between consecutive
+        roots. The ray is raised by a small tolerance, so the ends of adjacent
+        segments are on the same side even if they differ by rounding. A
+        crossing at a vertex is then counted exactly once, and a path that
+        only touches the ray isn't counted at all.
+        """
+        x, y = point
+        y += 1e-9 * (1 + abs(y))
+        if len(self) == 0:
+            return 0
+        nodes = np.zeros(1, dtype=int)
+        candidates = []
+        while len(nodes) > 0:
+            hit = (
+                (self.minima[nodes, 1] <= y)
+                & (y <= self.maxima[nodes, 1])
+                & (self.maxima[nodes, 0] >= x)
+            )
+            nodes = nodes[hit]
+            leaves = self.is_leaf(nodes)
+            candidates.append(self.segments[nodes[leaves]])
+            nodes = self.children[nodes[~leaves]].ravel()
+        candidates = np.concatenate(candidates)
+        if len(candidates) == 0:
+            return 0
+
+        control_points = self.control_points[candidates]
+        coefficients = venn7.bezier.get_polynomial_coefficients(control_points)
+        y_coefficients = coefficients[:, :, 1].copy()
+        y_coefficients[:, 0] -= y
+        roots = venn7.bezier.get_polynomial_roots(y_coefficients)
+        # Roots that are not real, or missing (NaN), are moved to t = 1, where
+        # they make no difference.
+        is_real = (np.abs(roots.imag) < 1e-9) & np.isfinite(roots.real)
+        roots = np.where(is_real, np.clip(roots.real, 0, 1), 1.0)
+        roots = np.sort(roots, axis=1)
+
+        # Check the side of the ray at t = 0, between each pair of consecutive
+        # breakpoints 0, roots..., 1, and at t = 1. A change of side between two
+        # checks is a crossing at the breakpoint between them.
+        zeros = np.zeros((len(candidates), 1))
+        breakpoints = np.concatenate([zeros, roots, zeros + 1], axis=1)
+        checks = np.concatenate(
+            [zeros, (breakpoints[:, :-1] + breakpoints[:, 1:]) / 2, zeros + 1], axis=1
+        )
+        powers = checks[:, :, np.newaxis] ** np.arange(4)
+        check_y = np.einsum("nck,nk->nc", powers, coefficients[:, :, 1])
+        check_y = np.where(checks == 0, control_points[:, np.newaxis, 0, 1], check_y)
+        check_y = np.where(checks == 1, control_points[:, np.newaxis, 3, 1], check_y)
+        above = (check_y > y).astype(int)
+        crossings = np.diff(above, axis=1)
+
+        powers = breakpoints[:, :, np.newaxis] ** np.arange(4)
+        crossing_x = np.einsum("nbk,nk->nb", powers, coefficients[:, :, 0])
+        return int(np.sum(crossings[crossing_x > x]))
+
+    def contains(self, point):
+        """Whether a point is inside the closed path, by the nonzero rule."""
+        return self.get_winding_number(point) != 0
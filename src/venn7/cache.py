@@ -0,0 +1,139 @@
+"""An on-disk cache of exported diagrams.
+
+Every entry is a JSON file named after a hash of everything that goes into the
+export: the encoding, n, name and renderer args of the diagram, the Boolean
+backend, the output format, and the source of the code that computes the
+geometry. Changing any of them gives a new key, so stale entries are never read
+and simply age out.
+"""
+import functools
+import hashlib
+import json
+import os
+import pathlib
+import tempfile
+
+ROOT = pathlib.Path(os.path.realpath(__file__)).parent
+
+# Changes to these files can change the output of export_json.
+SOURCE_FILES = [
+    "bezier.py",
+    "binary.py",
+    "boolean.py",
+    "bvh.py",
+    "hittest.py",
+    "venn.py",
+    "venn_boolean.js",
+]
+
+
+def get_default_cache_directory():
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join("~", ".cache")
+    return os.path.join(os.path.expanduser(base), "venn7")
+
+
+@functools.lru_cache(maxsize=None)
+def get_source_hash():
+    """Hash the source files that the exported geometry depends on."""
+    digest = hashlib.sha256()
+    for file_name in SOURCE_FILES:
+        digest.update(file_name.encode("utf-8") + b"\0")
+        digest.update((ROOT / file_name).read_bytes())
+    return digest.hexdigest()
+
+
+def get_export_key(diagram, backend, format="svg", hit_test=False):
+    """Return the cache key for the output of
+    diagram.export_json(backend, format=format, hit_test=hit_test)."""
+    description = {
+        "n": diagram.n,
+        "row_swaps": diagram.row_swaps,
+        "name": diagram.name,
+        "renderer_args": diagram.renderer_args,
+        "backend": backend,
+        "format": format,
+        "hit_test": hit_test,
+        "source": get_source_hash(),
+    }
+    encoded = json.dumps(description, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class BuildCache:
+    """A directory of cached export_json results.
+
+    Parameters
+    ----------
+
+    directory : str, optional
+        Where to keep the entries. Defaults to venn7 in the user's cache
+        directory, which is usually ~/.cache/venn7.
+
+    max_size : int, optional
+        The total size in bytes that the entries may take up. When it is
+        exceeded, the least recently used entries are deleted.
+    """
+
+    def __init__(self, directory=None, max_size=100 * 2 ** 20):
+        if directory is None:
+            directory = get_default_cache_directory()
+        self.directory = pathlib.Path(directory)
+        self.max_size = max_size
+
+    def _get_path(self, key):
+        return self.directory / f"{key}.json"
+
+    def get(self, key):
+        """Return the cached value for key, or None if there isn't one."""
+        path = self._get_path(key)
+        try:
+            with open(path) as f:
+                value = json.load(f)
+        except (OSError, ValueError):
+            return None
+        # Mark the entry as recently used for eviction.
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return value
+
+    def put(self, key, value):
+        """Store a value that can be serialized as JSON, then evict old entries
+        if the cache is too big."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # Write to a temporary file and rename it, so that concurrent builds
+        # never see a partial entry.
+        fd, temporary = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(value, f)
+            os.replace(temporary, self._get_path(key))
+        except BaseException:
+            os.unlink(temporary)
+            raise
+        self.evict()
+
+    def evict(self):
+        """Delete the least recently used entries until the total size is at most
+        max_size."""
+        entries = []
+        for path in self.directory.glob("*.json"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total_size = sum(size for __, size, __ in entries)
+        for __, size, path in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                pass
+            total_size -= size
+
+    def clear(self):
+        for path in self.directory.glob("*.json"):
+            path.unlink()
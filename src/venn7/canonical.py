@@ -0,0 +1,150 @@
+"""Canonical forms of matrix encodings.
+
+Many matrix encodings describe the same diagram. The flattened row swaps can be
+rotated, since they are repeated n times around the diagram, and two adjacent
+swaps in rows that are not neighbors can be exchanged, since they don't
+interact. That covers both rotating the columns of the matrix and moving
+between compact and expanded columns. The matrix can also be reflected: reversing
+the row swaps gives the mirror image of the diagram, and turning the rows upside
+down gives the diagram turned inside out. Counted up to all of these, there are
+23 simple symmetric monotone 7-Venn diagrams, as found by Cao et al.
+
+To pick one encoding out of all of these, repeat the row swaps enough times and
+think of each swap as depending on the swaps before it in the same or adjacent
+rows. Row 1 is swapped exactly once per repetition. Starting from one of its
+swaps, take every swap that depends on it, directly or indirectly, but not on
+the next swap in row 1. That is exactly one repetition's worth of swaps, and
+the same ones however the encoding was rotated or rearranged. Grouped into
+columns as early as possible, they give the canonical form. The canonical form
+of an encoding and its reflections is the smallest of the four.
+"""
+import hashlib
+
+import venn7.venn
+
+
+def _get_dependent_positions(sequence, start):
+    """Find the positions in sequence, from start on, that depend on the swap at
+    start."""
+    tainted = set()
+    positions = []
+    for position in range(start, len(sequence)):
+        row = sequence[position]
+        if position == start or tainted & {row - 1, row, row + 1}:
+            tainted.add(row)
+            positions.append(position)
+    return positions
+
+
+def _get_canonical_sequence(n, flattened_row_swaps):
+    length = len(flattened_row_swaps)
+    start = flattened_row_swaps.index(1)
+    # Each repetition spreads the dependencies of a swap to at least the
+    # neighboring rows, so everything after n - 1 more repetitions depends on
+    # both starting swaps and n + 2 repetitions are plenty.
+    sequence = list(flattened_row_swaps) * (n + 2)
+    first = _get_dependent_positions(sequence, start)
+    second = set(_get_dependent_positions(sequence, start + length))
+    positions = [position for position in first if position not in second]
+    if len(positions) != length:
+        raise ValueError("Row swaps do not form a connected diagram")
+    row_swaps = venn7.venn.compact_row_swaps([sequence[i] for i in positions])
+    return [row for column in row_swaps for row in column]
+
+
+def get_canonical_row_swaps(n, row_swaps):
+    """Return the canonical form of row swaps, given as one list of rows per
+    column, as a new list in the same format."""
+    flattened_row_swaps = [row for column in row_swaps for row in column]
+    if flattened_row_swaps.count(1) != 1:
+        raise ValueError("Expected exactly one swap in row 1")
+    upside_down = [n - row for row in flattened_row_swaps]
+    canonical = min(
+        _get_canonical_sequence(n, sequence)
+        for sequence in [
+            flattened_row_swaps,
+            flattened_row_swaps[::-1],
+            upside_down,
+            upside_down[::-1],
+        ]
+    )
+    return venn7.venn.compact_row_swaps(canonical)
+
+
+def canonicalize(n, matrix_encoding_string):
+    """Return the canonical matrix encoding of the same diagram as
+    matrix_encoding_string, up to rotation and reflection."""
+    row_swaps = venn7.venn.parse_matrix_encoding_string(matrix_encoding_string)
+    canonical_row_swaps = get_canonical_row_swaps(n, row_swaps)
+    return venn7.venn.format_matrix_encoding_string(n, canonical_row_swaps)
+
+
+def get_canonical_key(n, matrix_encoding_string):
+    """Return a short hash of the canonical form of a matrix encoding. Equivalent
+    encodings have the same key, and the key is the same across runs and
+    machines."""
+    canonical = canonicalize(n, matrix_encoding_string)
+    return hashlib.sha256(f"{n}\n{canonical}".encode("ascii")).hexdigest()[:32]
+
+
+class EncodingIndex:
+    """A collection of matrix encodings of n-Venn diagrams, holding one encoding
+    per diagram.
+
+    Encodings are looked up by their canonical key, so adding and checking for
+    an encoding take time proportional to the length of the encoding regardless
+    of how many are already in the index.
+
+    Parameters
+    ----------
+
+    n : int
+        The order of the Venn diagrams.
+
+    matrix_encoding_strings : iterable, optional
+        Encodings to add right away.
+    """
+
+    def __init__(self, n, matrix_encoding_strings=()):
+        self.n = n
+        self.encodings = {}
+        self.counts = {}
+        for matrix_encoding_string in matrix_encoding_strings:
+            self.add(matrix_encoding_string)
+
+    def get_key(self, matrix_encoding_string):
+        return get_canonical_key(self.n, matrix_encoding_string)
+
+    def add(self, matrix_encoding_string):
+        """Add an encoding. Returns True if it is new, or False if an
+        equivalent encoding was already in the index, in which case the earlier
+        encoding is kept."""
+        key = self.get_key(matrix_encoding_string)
+        self.counts[key] = self.counts.get(key, 0) + 1
+        if key in self.encodings:
+            return False
+        self.encodings[key] = matrix_encoding_string
+        return True
+
+    def get(self, matrix_encoding_string, default=None):
+        """Return the encoding in the index that is equivalent to
+        matrix_encoding_string."""
+        return self.encodings.get(self.get_key(matrix_encoding_string), default)
+
+    def __contains__(self, matrix_encoding_string):
+        return self.get_key(matrix_encoding_string) in self.encodings
+
+    def __len__(self):
+        return len(self.encodings)
+
+    def __iter__(self):
+        return iter(self.encodings.values())
+
+
+def dedupe(n, matrix_encoding_strings):
+    """Yield the first of every set of equivalent encodings in an iterable of
+    matrix encodings, lazily and in order."""
+    index = EncodingIndex(n)
+    for matrix_encoding_string in matrix_encoding_strings:
+        if index.add(matrix_encoding_string):
+            yield matrix_encoding_string
@@ -0,0 +1,338 @@
+"""A compact on-disk catalog of Venn diagrams.
+
+A catalog file has three parts:
+
+* A fixed-width header: the magic bytes b"VENNCAT\\0", the format version, the
+  number of entries and the offsets of the other two parts.
+* A data section holding, for every entry, its matrix encoding with one bit per
+  cell, packed row by row, followed by its name, renderer args and any other
+  metadata as UTF-8 JSON.
+* An offset table with one fixed-width record per entry (see INDEX_DTYPE). It
+  holds the fields that queries filter on, the order n, the number of columns,
+  the number of swaps in each row and a hash of the name, next to the offsets
+  of the entry's data.
+
+A Catalog memory-maps the file. Queries only read the offset table, a few
+dozen bytes per entry, and the data of an entry is only read and unpacked when
+the entry is accessed.
+"""
+import hashlib
+import json
+import mmap
+import struct
+
+import numpy as np
+
+import venn7.venn
+
+MAGIC = b"VENNCAT\0"
+VERSION = 1
+HEADER = struct.Struct("<8sIIQQQ")
+
+# Row counts are stored for up to this many rows, which allows n up to 17.
+MAX_ROWS = 16
+
+INDEX_DTYPE = np.dtype(
+    [
+        ("n", "<u1"),
+        ("columns", "<u2"),
+        ("row_counts", "<u2", (MAX_ROWS,)),
+        ("name_hash", "<u8"),
+        ("matrix_offset", "<u8"),
+        ("matrix_size", "<u4"),
+        ("metadata_offset", "<u8"),
+        ("metadata_size", "<u4"),
+    ]
+)
+
+
+def get_name_hash(name):
+    """A 64-bit hash of a name, stable across runs and machines."""
+    if name is None:
+        return 0
+    digest = hashlib.sha256(name.encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "little")
+
+
+def pack_row_swaps(n, row_swaps):
+    """Pack row swaps, one list of rows per column, into bytes with one bit per
+    cell of the matrix encoding."""
+    matrix = np.zeros((n - 1, len(row_swaps)), dtype=bool)
+    for column, rows in enumerate(row_swaps):
+        for row in rows:
+            matrix[row - 1, column] = True
+    return np.packbits(matrix, axis=None).tobytes()
+
+
+def unpack_row_swaps(n, columns, data):
+    """The inverse of pack_row_swaps."""
+    bits = np.unpackbits(np.frombuffer(data, dtype=np.uint8), count=(n - 1) * columns)
+    matrix = bits.reshape((n - 1, columns))
+    return [(np.flatnonzero(rows) + 1).tolist() for rows in matrix.T]
+
+
+class CatalogEntry:
+    """A Venn diagram as stored in a catalog.
+
+    Parameters
+    ----------
+
+    n : int
+        The order of the Venn diagram.
+
+    row_swaps : list
+        One list of 1-indexed rows per column of the matrix encoding.
+
+    name : str, optional
+
+    renderer_args : dict, optional
+        Keyword arguments for VennDiagramRenderer.
+
+    metadata : dict, optional
+        Anything else worth keeping with the diagram. Must be serializable as
+        JSON.
+    """
+
+    def __init__(self, n, row_swaps, name=None, renderer_args=None, metadata=None):
+        self.n = n
+        self.row_swaps = row_swaps
+        self.name = name
+        self.renderer_args = renderer_args or {}
+        self.metadata = metadata or {}
+
+    @classmethod
+    def from_diagram(cls, diagram, metadata=None):
+        return cls(
+            diagram.n,
+            diagram.row_swaps,
+            name=diagram.name,
+            renderer_args=diagram.renderer_args,
+            metadata=metadata,
+        )
+
+    @property
+    def matrix_encoding_string(self):
+        return venn7.venn.format_matrix_encoding_string(self.n, self.row_swaps)
+
+    def get_diagram(self):
+        """Construct the VennDiagram for this entry, which validates it."""
+        return venn7.venn.VennDiagram(
+            self.n,
+            self.matrix_encoding_string,
+            self.name,
+            renderer_args=self.renderer_args,
+        )
+
+    def __repr__(self):
+        return f"CatalogEntry({self.n}, name={self.name!r})"
+
+
+def write_catalog(path, entries):
+    """Write an iterable of CatalogEntry objects to a catalog file. Entries are
+    written out as they come, so only their index records are kept in memory.
+    Returns the number of entries."""
+    records = []
+    with open(path, "wb") as f:
+        f.write(b"\0" * HEADER.size)
+        for entry in entries:
+            if not 2 <= entry.n <= MAX_ROWS + 1:
+                raise ValueError(f"Catalogs only hold n from 2 to {MAX_ROWS + 1}")
+            record = np.zeros((), dtype=INDEX_DTYPE)
+            record["n"] = entry.n
+            record["columns"] = len(entry.row_swaps)
+            for rows in entry.row_swaps:
+                for row in rows:
+                    record["row_counts"][row - 1] += 1
+            record["name_hash"] = get_name_hash(entry.name)
+
+            matrix = pack_row_swaps(entry.n, entry.row_swaps)
+            record["matrix_offset"] = f.tell()
+            record["matrix_size"] = len(matrix)
+            f.write(matrix)
+
+            metadata = json.dumps(
+                {
+                    "name": entry.name,
+                    "renderer_args": entry.renderer_args,
+                    "metadata": entry.metadata,
+                }
+            ).encode("utf-8")
+            record["metadata_offset"] = f.tell()
+            record["metadata_size"] = len(metadata)
+            f.write(metadata)
+            records.append(record)
+
+        # Keep the offset table aligned so it can be memory-mapped as an array.
+        f.write(b"\0" * (-f.tell() % 8))
+        index_offset = f.tell()
+        f.write(np.array(records, dtype=INDEX_DTYPE).tobytes())
+
+        f.seek(0)
+        header = HEADER.pack(
+            MAGIC, VERSION, 0, len(records), index_offset, HEADER.size
+        )
+        f.write(header)
+    return len(records)
+
+
+class Catalog:
+    """A catalog file, opened for reading.
+
+    Parameters
+    ----------
+
+    path : str
+        The catalog file, as written by write_catalog.
+
+    Attributes
+    ----------
+
+    index : array
+        The memory-mapped offset table, a structured array with dtype
+        INDEX_DTYPE and one record per entry.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            header = self._mmap[: HEADER.size]
+            if len(header) < HEADER.size:
+                raise ValueError(f"{path} is too short to be a catalog")
+            magic, version, __, count, index_offset, __ = HEADER.unpack(header)
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a catalog")
+            if version != VERSION:
+                raise ValueError(f"Unsupported catalog version {version}")
+            self.index = np.frombuffer(
+                self._mmap, dtype=INDEX_DTYPE, count=count, offset=index_offset
+            )
+        except Exception:
+            self._mmap.close()
+            raise
+
+    def close(self):
+        # Drop the array first, since a buffer can't be closed while exported.
+        self.index = None
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self):
+        return len(self.index)
+
+    def __getitem__(self, i):
+        record = self.index[i]
+        matrix_offset = int(record["matrix_offset"])
+        metadata_offset = int(record["metadata_offset"])
+        matrix_end = matrix_offset + int(record["matrix_size"])
+        metadata_end = metadata_offset + int(record["metadata_size"])
+        matrix = self._mmap[matrix_offset:matrix_end]
+        metadata = json.loads(self._mmap[metadata_offset:metadata_end])
+        n = int(record["n"])
+        return CatalogEntry(
+            n,
+            unpack_row_swaps(n, int(record["columns"]), matrix),
+            name=metadata["name"],
+            renderer_args=metadata["renderer_args"],
+            metadata=metadata["metadata"],
+        )
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def find(self, n=None, columns=None, row_counts=None, name=None):
+        """Return the indices of the entries matching all the given criteria, as
+        an array. Only the offset table is read, except to rule out entries
+        whose names merely have the same hash as name.
+
+        Parameters
+        ----------
+
+        n : int, optional
+
+        columns : int or (int, int), optional
+            The number of columns, or a range of them, with both ends included.
+
+        row_counts : list, optional
+            The number of swaps in each row, starting from row 1.
+
+        name : str, optional
+        """
+        index = self.index
+        selected = np.ones(len(index), dtype=bool)
+        if n is not None:
+            selected &= index["n"] == n
+        if columns is not None:
+            if np.ndim(columns) == 0:
+                selected &= index["columns"] == columns
+            else:
+                low, high = columns
+                selected &= (low <= index["columns"]) & (index["columns"] <= high)
+        if row_counts is not None:
+            padded = np.zeros(MAX_ROWS, dtype=int)
+            padded[: len(row_counts)] = row_counts
+            selected &= np.all(index["row_counts"] == padded, axis=1)
+        if name is not None:
+            selected &= index["name_hash"] == np.uint64(get_name_hash(name))
+        indices = np.flatnonzero(selected)
+        if name is not None:
+            indices = np.array([i for i in indices if self[i].name == name], dtype=int)
+        return indices
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Write or query a catalog file.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    pack_parser = subparsers.add_parser(
+        "pack",
+        help="Write a catalog of the built-in diagrams, or of matrix encodings "
+        "separated by blank lines read from stdin.",
+    )
+    pack_parser.add_argument("catalog", help="Catalog file to write.")
+    pack_parser.add_argument(
+        "--n", type=int, default=None, help="Read encodings of this order from stdin."
+    )
+
+    find_parser = subparsers.add_parser(
+        "find", help="Print the matrix encodings of matching entries."
+    )
+    find_parser.add_argument("catalog", help="Catalog file to read.")
+    find_parser.add_argument("--n", type=int, default=None)
+    find_parser.add_argument("--columns", type=int, default=None)
+    find_parser.add_argument("--name", default=None)
+    args = parser.parse_args()
+
+    if args.command == "pack":
+        if args.n is None:
+            entries = (
+                CatalogEntry.from_diagram(diagram)
+                for diagram in venn7.venn.DIAGRAMS.values()
+            )
+        else:
+            entries = (
+                CatalogEntry(
+                    args.n, venn7.venn.parse_matrix_encoding_string(encoding)
+                )
+                for encoding in venn7.venn.read_matrix_encodings(sys.stdin)
+            )
+        count = write_catalog(args.catalog, entries)
+        print(f"Wrote {count} diagrams to {args.catalog}")
+    else:
+        with Catalog(args.catalog) as catalog:
+            for i in catalog.find(n=args.n, columns=args.columns, name=args.name):
+                entry = catalog[i]
+                if entry.name is not None:
+                    print(f"# {entry.name}")
+                print(entry.matrix_encoding_string)
+                print()
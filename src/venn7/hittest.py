@@ -0,0 +1,134 @@
+"""An index for finding which region of a Venn diagram contains a point.
+
+The plane is cut into horizontal rows. Along the center line of each row, the
+curves cross the row at a sorted list of x coordinates, and between two
+consecutive crossings the mask of curves containing the line is constant. The
+index stores these crossings, quantized to integers, and the mask to the right
+of each one. Finding the region under a point is then a binary search in one
+row, with no geometry at all.
+
+As in venn7.binary, the exported index is kept small by storing differences.
+Each row stores its first crossing, then the difference of each crossing from
+the one before it, and the layout of the rows is stored as the number of
+crossings in each row.
+"""
+import numpy as np
+
+import venn7.binary
+
+
+class HitTestIndex:
+    """A scanline index over the regions of a Venn diagram.
+
+    Parameters
+    ----------
+
+    y0 : float
+        The y coordinate of the center line of the first row.
+
+    row_height : float
+
+    scale : float
+        Crossings are stored as x * scale, rounded.
+
+    row_starts : array
+        Row i has the crossings row_starts[i] to row_starts[i + 1].
+
+    crossings : array
+        The quantized x coordinates of the crossings, sorted within each row.
+
+    masks : array
+        The mask of the curves containing the part of the row right after each
+        crossing.
+    """
+
+    def __init__(self, y0, row_height, scale, row_starts, crossings, masks):
+        self.y0 = y0
+        self.row_height = row_height
+        self.scale = scale
+        self.row_starts = np.asarray(row_starts)
+        self.crossings = np.asarray(crossings)
+        self.masks = np.asarray(masks)
+
+    @classmethod
+    def from_polygons(cls, polygons, row_height=0.25, scale=16):
+        """Build the index for a list of polygons, each an array of shape (M, 2)
+        approximating a simple closed curve. Bit i of a mask is set inside
+        polygon i."""
+        points = np.concatenate(polygons)
+        y0 = float(np.min(points[:, 1]))
+        rows = int(np.ceil((np.max(points[:, 1]) - y0) / row_height)) + 1
+        y = y0 + np.arange(rows) * row_height
+
+        all_rows = []
+        all_x = []
+        all_bits = []
+        for i, polygon in enumerate(polygons):
+            start = polygon
+            end = np.roll(polygon, -1, axis=0)
+            # Count edges as half open, so that a line through a vertex
+            # crosses the polygon once, not twice or not at all.
+            crosses = (start[:, 1] <= y[:, None]) != (end[:, 1] <= y[:, None])
+            row, edge = np.nonzero(crosses)
+            t = (y[row] - start[edge, 1]) / (end[edge, 1] - start[edge, 1])
+            all_rows.append(row)
+            all_x.append(start[edge, 0] + t * (end[edge, 0] - start[edge, 0]))
+            all_bits.append(np.full(len(row), 1 << i))
+        all_rows = np.concatenate(all_rows)
+        all_x = np.concatenate(all_x)
+        order = np.lexsort((all_x, all_rows))
+
+        # A row crosses every closed curve an even number of times, so every
+        # row starts outside all curves and a running XOR over all rows at once
+        # gives the right masks.
+        masks = np.bitwise_xor.accumulate(np.concatenate(all_bits)[order])
+        row_starts = np.searchsorted(all_rows[order], np.arange(rows + 1))
+        crossings = np.round(all_x[order] * scale).astype(int)
+        return cls(y0, row_height, scale, row_starts, crossings, masks)
+
+    def lookup(self, x, y):
+        """Return the mask of the region at (x, y), which is 0 outside all
+        curves."""
+        row = int(np.round((y - self.y0) / self.row_height))
+        if not 0 <= row < len(self.row_starts) - 1:
+            return 0
+        start = self.row_starts[row]
+        end = self.row_starts[row + 1]
+        i = np.searchsorted(self.crossings[start:end], x * self.scale, side="right")
+        return 0 if i == 0 else int(self.masks[start + i - 1])
+
+    def to_json(self):
+        """Encode the index for the web app, with the arrays in base64."""
+        mask_dtype = "<u1" if self.masks.max(initial=0) < 2 ** 8 else "<u2"
+        row_lengths = np.diff(self.row_starts)
+        deltas = np.diff(self.crossings, prepend=0)
+        firsts = self.row_starts[:-1][row_lengths > 0]
+        deltas[firsts] = self.crossings[firsts]
+        return {
+            "y0": self.y0,
+            "row_height": self.row_height,
+            "scale": self.scale,
+            "row_lengths": venn7.binary.encode_array(row_lengths, "<u2"),
+            "crossings": venn7.binary.encode_array(deltas, "<i2"),
+            "masks": venn7.binary.encode_array(self.masks, mask_dtype),
+            "mask_size": np.dtype(mask_dtype).itemsize,
+        }
+
+    @classmethod
+    def from_json(cls, data):
+        """The inverse of to_json."""
+        mask_dtype = {1: "<u1", 2: "<u2"}[data["mask_size"]]
+        row_lengths = venn7.binary.decode_array(data["row_lengths"], "<u2")
+        row_starts = np.concatenate([[0], np.cumsum(row_lengths)]).astype(int)
+        # Sum the differences, starting over at each row.
+        totals = np.cumsum(venn7.binary.decode_array(data["crossings"], "<i2"))
+        before_rows = np.concatenate([[0], totals]).astype(int)[row_starts[:-1]]
+        crossings = totals - np.repeat(before_rows, row_lengths)
+        return cls(
+            data["y0"],
+            data["row_height"],
+            data["scale"],
+            row_starts,
+            crossings,
+            venn7.binary.decode_array(data["masks"], mask_dtype),
+        )
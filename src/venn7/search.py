@@ -0,0 +1,271 @@
+"""Exhaustive search for simple symmetric monotone Venn diagrams.
+
+A diagram is determined by its flattened row swaps, so the search enumerates
+sequences of rows depth first and prunes a partial sequence as soon as it can't
+be extended to one that passes validate_basic and validate_venn:
+
+* No row may be swapped twice in a row.
+* Row k is swapped exactly comb(n, k) / n times, so no row may go over its
+  count, and since equal swaps can't be adjacent, no row may need more than
+  half of the remaining positions.
+* Every swap starts a region whose rank must not repeat. The ranks of the first
+  of the n copies of the sequence are tracked incrementally, so a repeat is
+  caught at the swap that causes it.
+
+Rotating the sequence or exchanging adjacent swaps in rows that are not
+neighbors gives the same diagram, so the search only keeps sequences that
+start at their smallest rotation and where any two adjacent commuting swaps
+are in increasing order. Every diagram still has at least one such sequence.
+
+Work is split by the first few swaps into independent tasks for a process pool.
+With a checkpoint file, the completed tasks and their results are saved as they
+finish so an interrupted search can pick up where it left off.
+"""
+import json
+import math
+import multiprocessing
+import os
+
+import venn7.canonical
+import venn7.venn
+
+
+def get_row_counts(n):
+    """The number of swaps in each row of an n-Venn diagram, indexed by row.
+    Index 0 is unused."""
+    return [0] + [math.comb(n, k) // n for k in range(1, n)]
+
+
+class _SearchState:
+    """A partial sequence of row swaps with everything needed to extend it and
+    take back the last swap cheaply."""
+
+    def __init__(self, n):
+        self.n = n
+        self.length = (2 ** n - 2) // n
+        full_mask = (1 << n) - 1
+        self.remaining = get_row_counts(n)
+        self.seen = bytearray(1 << n)
+        self.seen[0] = self.seen[full_mask] = 1
+        self.p = list(range(n))
+        self.suffix_masks = [full_mask ^ ((1 << r) - 1) for r in range(n + 1)]
+        self.sequence = []
+        self.previous_masks = []
+
+    def can_push(self, row):
+        sequence = self.sequence
+        if self.remaining[row] == 0:
+            return False
+        if sequence:
+            previous = sequence[-1]
+            if previous == row:
+                return False
+            if abs(previous - row) >= 2 and previous > row:
+                return False
+        p = self.p
+        rank = self.suffix_masks[row] ^ (1 << p[row]) ^ (1 << p[row - 1])
+        return not self.seen[rank]
+
+    def push(self, row):
+        p = self.p
+        rank = self.suffix_masks[row] ^ (1 << p[row]) ^ (1 << p[row - 1])
+        self.previous_masks.append(self.suffix_masks[row])
+        self.suffix_masks[row] = rank
+        p[row], p[row - 1] = p[row - 1], p[row]
+        self.seen[rank] = 1
+        self.remaining[row] -= 1
+        self.sequence.append(row)
+
+    def pop(self):
+        row = self.sequence.pop()
+        self.remaining[row] += 1
+        self.seen[self.suffix_masks[row]] = 0
+        p = self.p
+        p[row], p[row - 1] = p[row - 1], p[row]
+        self.suffix_masks[row] = self.previous_masks.pop()
+
+    def is_feasible(self):
+        """Whether the remaining counts can still fit in the remaining positions
+        with no two equal swaps adjacent."""
+        free = self.length - len(self.sequence)
+        return max(self.remaining) <= (free + 1) // 2
+
+    def get_candidates(self):
+        if not self.sequence:
+            # The smallest rotation starts with a swap in row 1.
+            return [1] if self.remaining[1] > 0 else []
+        return [row for row in range(1, self.n) if self.can_push(row)]
+
+
+def _is_smallest_rotation(sequence):
+    return all(
+        sequence <= sequence[i:] + sequence[:i]
+        for i in range(1, len(sequence))
+        if sequence[i] == sequence[0]
+    )
+
+
+def _is_solution(n, sequence):
+    if sequence[-1] == sequence[0] or not _is_smallest_rotation(sequence):
+        return False
+    try:
+        venn7.venn.validate_venn(n, sequence)
+    except ValueError:
+        return False
+    return True
+
+
+def _replay(n, prefix):
+    state = _SearchState(n)
+    for row in prefix:
+        if row not in state.get_candidates():
+            return None
+        state.push(row)
+    return state
+
+
+def _extend(state, depth):
+    """Yield every pruned extension of the state to the given depth, as
+    tuples."""
+    if len(state.sequence) == depth:
+        yield tuple(state.sequence)
+        return
+    if not state.is_feasible():
+        return
+    for row in state.get_candidates():
+        state.push(row)
+        yield from _extend(state, depth)
+        state.pop()
+
+
+def get_prefixes(n, depth):
+    """List the prefixes of the given length that survive pruning. Each is an
+    independent unit of work for search_prefix."""
+    state = _SearchState(n)
+    return list(_extend(state, min(depth, state.length)))
+
+
+def search_prefix(n, prefix):
+    """Find all flattened row swaps of n-Venn diagrams that start with prefix.
+    Returns a list of lists."""
+    state = _replay(n, prefix)
+    if state is None:
+        return []
+    return [
+        list(sequence)
+        for sequence in _extend(state, state.length)
+        if _is_solution(n, sequence)
+    ]
+
+
+def _search_task(task):
+    n, prefix = task
+    return prefix, search_prefix(n, prefix)
+
+
+def _load_checkpoint(checkpoint, n, split_depth):
+    if checkpoint is None or not os.path.exists(checkpoint):
+        return {"n": n, "split_depth": split_depth, "done": [], "results": []}
+    with open(checkpoint) as f:
+        data = json.load(f)
+    if data["n"] != n or data["split_depth"] != split_depth:
+        raise ValueError(
+            f"Checkpoint {checkpoint} is for n = {data['n']} with split depth "
+            f"{data['split_depth']}"
+        )
+    return data
+
+
+def _save_checkpoint(checkpoint, data):
+    # Write to a temporary file and rename it, so that an interrupted write
+    # never leaves a corrupt checkpoint behind.
+    temporary = checkpoint + ".tmp"
+    with open(temporary, "w") as f:
+        json.dump(data, f)
+    os.replace(temporary, checkpoint)
+
+
+def search(n, split_depth=4, processes=None, checkpoint=None):
+    """Enumerate the flattened row swaps of simple symmetric monotone n-Venn
+    diagrams, yielding lists of rows.
+
+    The search is split into one task per surviving prefix of length
+    split_depth, run in a pool of processes. With processes=1, everything runs
+    in this process. If checkpoint is a file name, it records the completed
+    tasks and their results, and results found by an earlier run with the same
+    checkpoint are yielded first instead of being searched for again.
+
+    A diagram may be yielded more than once, as different sequences related by
+    commuting swaps.
+    """
+    data = _load_checkpoint(checkpoint, n, split_depth)
+    yield from data["results"]
+
+    done = set(tuple(prefix) for prefix in data["done"])
+    prefixes = [
+        prefix for prefix in get_prefixes(n, split_depth) if prefix not in done
+    ]
+
+    def record(prefix, results):
+        data["done"].append(list(prefix))
+        data["results"].extend(results)
+        if checkpoint is not None:
+            _save_checkpoint(checkpoint, data)
+
+    if processes == 1:
+        for prefix in prefixes:
+            __, results = _search_task((n, prefix))
+            record(prefix, results)
+            yield from results
+        return
+    with multiprocessing.Pool(processes) as pool:
+        tasks = [(n, prefix) for prefix in prefixes]
+        for prefix, results in pool.imap_unordered(_search_task, tasks):
+            record(prefix, results)
+            yield from results
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Search for simple symmetric monotone Venn diagrams and print "
+        "their matrix encodings."
+    )
+    parser.add_argument("n", type=int, help="Order of the diagrams. Must be prime.")
+    parser.add_argument(
+        "--split-depth",
+        type=int,
+        default=4,
+        help="Length of the prefixes that the search is split on (default: 4).",
+    )
+    parser.add_argument(
+        "--processes", type=int, default=None, help="Number of worker processes."
+    )
+    parser.add_argument(
+        "--checkpoint", default=None, help="File to save progress in and resume from."
+    )
+    parser.add_argument(
+        "--all",
+        action="store_true",
+        help="Print every encoding found instead of one per diagram up to rotation "
+        "and reflection.",
+    )
+    args = parser.parse_args()
+
+    encodings = (
+        venn7.venn.format_matrix_encoding_string(
+            args.n, venn7.venn.compact_row_swaps(flattened_row_swaps)
+        )
+        for flattened_row_swaps in search(
+            args.n,
+            split_depth=args.split_depth,
+            processes=args.processes,
+            checkpoint=args.checkpoint,
+        )
+    )
+    if not args.all:
+        encodings = venn7.canonical.dedupe(args.n, encodings)
+    for encoding in encodings:
+        print(encoding)
+        print(flush=True)
@@ -0,0 +1,361 @@
+"""Render Shepard-tone note samples for the web app.
+
+A Shepard tone is the same note played in every octave at once, with a gain
+that peaks at a center pitch and falls off on both sides, so it has no clear
+octave. The gain of the octave at MIDI note p is
+
+    exp(-((p - center) / (12 * spread)) ** 2)
+
+This replaces recording SuperCollider synths in real time (tools/venn.scd).
+Each voice is synthesized as one array per octave, with all octaves of a note
+computed at once, and the notes of a set are rendered in parallel.
+
+Rendering is split in two so that tuning center and spread is quick.
+render_octaves synthesizes the dry signal of each octave, which is the slow
+part. mix_octaves weights the octaves and adds reverb:
+
+    midi_notes, octaves = render_octaves(0, "additive")
+    for spread in [1, 1.5, 2, 3]:
+        samples = mix_octaves(midi_notes, octaves, spread=spread)
+"""
+import concurrent.futures
+import functools
+import pathlib
+
+import numpy as np
+
+import venn7.sprites
+
+# The scale used by the app for n = 7, in semitones above C.
+SCALE = [0, 2, 3, 5, 7, 8, 10]
+
+SAMPLE_RATE = 44100
+
+# Octaves relative to middle C.
+OCTAVES = range(-4, 5)
+
+
+def get_frequency(midi_note):
+    return 440.0 * 2 ** ((np.asarray(midi_note) - 69) / 12)
+
+
+def get_octave_gains(midi_notes, center=54.0, spread=2.0):
+    """The Gaussian gain of each octave of a Shepard tone."""
+    return np.exp(-np.square((np.asarray(midi_notes) - center) / (12 * spread)))
+
+
+def get_perc_envelope(t, attack, release, curve=-4.0):
+    """A percussive envelope, like SuperCollider's Env.perc: a rise over attack
+    seconds and a fall over release seconds, both bent by curve."""
+
+    def shape(x):
+        return (1 - np.exp(curve * x)) / (1 - np.exp(curve))
+
+    rise = shape(np.clip(t / attack, 0, 1))
+    fall = 1 - shape(np.clip((t - attack) / release, 0, 1))
+    return np.where(t < attack, rise, fall)
+
+
+def get_asr_envelope(t, attack, release, duration):
+    """A linear attack, a sustain until duration, and a linear release."""
+    rise = np.clip(t / attack, 0, 1)
+    fall = np.clip((duration - t) / release, 0, 1)
+    return np.minimum(rise, fall)
+
+
+def get_saw(frequencies, t, sample_rate, phases):
+    """Sawtooth waves of shape (octaves, samples), band limited with PolyBLEP to
+    cut down on aliasing in the high octaves."""
+    dt = (frequencies / sample_rate)[:, np.newaxis]
+    phase = (frequencies[:, np.newaxis] * t + phases[:, np.newaxis]) % 1
+    saw = 2 * phase - 1
+    x = phase / dt
+    saw -= np.where(x < 1, 2 * x - x * x - 1, 0)
+    x = (phase - 1) / dt
+    saw -= np.where(x > -1, x * x + 2 * x + 1, 0)
+    return saw
+
+
+def lowpass(signals, cutoffs, sample_rate, order=2):
+    """Low-pass each row of signals at its own cutoff, with the magnitude
+    response of a Butterworth filter, by filtering in the frequency domain."""
+    spectrum = np.fft.rfft(signals, axis=-1)
+    frequencies = np.fft.rfftfreq(signals.shape[-1], 1 / sample_rate)
+    ratio = frequencies / np.asarray(cutoffs)[:, np.newaxis]
+    spectrum /= np.sqrt(1 + ratio ** (2 * order))
+    return np.fft.irfft(spectrum, n=signals.shape[-1], axis=-1)
+
+
+def additive_voice(frequencies, t, sample_rate, rng, duration):
+    """A bell: slightly inharmonic partials, the higher ones decaying faster."""
+    nyquist = sample_rate / 2
+    log_frequencies = np.log(frequencies)
+    inharmonicity = np.interp(log_frequencies, np.log([100, 8000]), [1.5e-3, 0.5e-3])
+    result = np.zeros((len(frequencies), len(t)))
+    for k in range(1, 9):
+        partials = frequencies * k * np.sqrt(1 + k * k * inharmonicity)
+        attack = np.exp(rng.uniform(np.log(0.005), np.log(0.05)))
+        envelope = get_perc_envelope(t, attack, 8.0 * k ** -1.3)
+        # Skip partials that would alias.
+        amplitudes = np.where(partials < nyquist, 1.0, 0.0)[:, np.newaxis]
+        phase = 2 * np.pi * partials[:, np.newaxis] * t
+        result += amplitudes * np.sin(phase) * envelope
+    return result * get_perc_envelope(t, 0.001, duration)
+
+
+def fm_voice(frequencies, t, sample_rate, rng, duration):
+    """A two-operator FM tone whose brightness decays."""
+    ratio = 2.0
+    index = 3.0 * np.exp(-t / 0.3)
+    modulator = np.sin(2 * np.pi * ratio * frequencies[:, np.newaxis] * t)
+    carrier = np.sin(2 * np.pi * frequencies[:, np.newaxis] * t + index * modulator)
+    # The significant sidebands reach about index + 1 multiples of the
+    # modulator frequency above the carrier.
+    highest = frequencies * (1 + ratio * (3.0 + 1))
+    amplitudes = np.where(highest < sample_rate / 2, 1.0, 0.0)[:, np.newaxis]
+    return amplitudes * carrier * get_perc_envelope(t, 0.01, duration)
+
+
+def subtractive_voice(frequencies, t, sample_rate, rng, duration):
+    """A pad: detuned sawtooth waves through a low-pass filter."""
+    result = np.zeros((len(frequencies), len(t)))
+    for __ in range(4):
+        detune = 2 ** (rng.uniform(-0.15, 0.15) / 12)
+        phases = rng.uniform(0, 1, size=len(frequencies))
+        result += get_saw(frequencies * detune, t, sample_rate, phases)
+    result = lowpass(result, np.minimum(frequencies * 3, 16e3), sample_rate)
+    return result * get_asr_envelope(t, 0.5, 1.0, duration)
+
+
+VOICES = {
+    "additive": additive_voice,
+    "fm": fm_voice,
+    "subtractive": subtractive_voice,
+}
+
+
+def render_octaves(
+    note,
+    voice="additive",
+    octaves=OCTAVES,
+    duration=4.0,
+    sample_rate=SAMPLE_RATE,
+    seed=0,
+):
+    """Synthesize every octave of a note.
+
+    Parameters
+    ----------
+
+    note : int
+        Semitones above C.
+
+    voice : str
+        One of the keys of VOICES.
+
+    octaves : list
+        Octaves relative to middle C.
+
+    duration : float
+        Seconds until the note has faded out.
+
+    seed : int
+        Seed for the random parts of the voice. The same seed and note always
+        give the same result.
+
+    Returns the MIDI notes of the octaves, and an array of shape (octaves,
+    samples) with the dry signal of each one.
+    """
+    if voice not in VOICES:
+        raise ValueError(f"Unknown voice {voice!r}")
+    midi_notes = 60 + 12 * np.asarray(octaves) + note
+    t = np.arange(int(duration * sample_rate)) / sample_rate
+    rng = np.random.default_rng([seed, note])
+    signals = VOICES[voice](get_frequency(midi_notes), t, sample_rate, rng, duration)
+    return midi_notes, signals
+
+
+def mix_octaves(
+    midi_notes,
+    signals,
+    center=54.0,
+    spread=2.0,
+    reverb=0.3,
+    reverb_time=2.0,
+    sample_rate=SAMPLE_RATE,
+    seed=0,
+):
+    """Mix the octaves from render_octaves into a stereo Shepard tone.
+
+    Parameters
+    ----------
+
+    center, spread : float
+        The peak and width of the octave gains, see get_octave_gains.
+
+    reverb : float
+        How much reverb to mix in, from 0 to 1.
+
+    reverb_time : float
+        Seconds for the reverb to decay by 60 dB.
+
+    Returns an array of shape (samples, 2). The reverb tail makes it longer than
+    the octave signals.
+    """
+    mono = get_octave_gains(midi_notes, center, spread) @ signals
+    if reverb == 0:
+        return np.stack([mono, mono], axis=1)
+
+    # Convolve with exponentially decaying noise, different in each channel so
+    # that the reverb is wide.
+    rng = np.random.default_rng(seed)
+    length = int(reverb_time * sample_rate)
+    decay = np.exp(-np.log(1000) * np.arange(length) / length)
+    impulses = rng.normal(size=(2, length)) * decay
+    impulses /= np.sqrt(np.sum(np.square(impulses), axis=1, keepdims=True))
+    size = len(mono) + length - 1
+    fft_size = 1 << (size - 1).bit_length()
+    wet = np.fft.irfft(
+        np.fft.rfft(mono, fft_size) * np.fft.rfft(impulses, fft_size), fft_size
+    )[:, :size]
+    dry = np.zeros(size)
+    dry[: len(mono)] = mono
+    return ((1 - reverb) * dry + reverb * wet).T
+
+
+def render_note(
+    note,
+    voice="additive",
+    center=54.0,
+    spread=2.0,
+    octaves=OCTAVES,
+    duration=4.0,
+    reverb=0.3,
+    sample_rate=SAMPLE_RATE,
+    seed=0,
+):
+    """Render a Shepard tone as an array of shape (samples, 2). See
+    render_octaves and mix_octaves for the parameters."""
+    midi_notes, signals = render_octaves(
+        note,
+        voice=voice,
+        octaves=octaves,
+        duration=duration,
+        sample_rate=sample_rate,
+        seed=seed,
+    )
+    return mix_octaves(
+        midi_notes,
+        signals,
+        center=center,
+        spread=spread,
+        reverb=reverb,
+        sample_rate=sample_rate,
+        seed=seed,
+    )
+
+
+def render_sound_set(
+    directory,
+    notes=SCALE,
+    file_format="wav",
+    peak=-1.0,
+    processes=None,
+    sample_rate=SAMPLE_RATE,
+    **kwargs,
+):
+    """Render a note_<k> file for each note into a sound set directory, one
+    note per process. With processes=1, everything runs in this process.
+
+    Parameters
+    ----------
+
+    notes : list
+        Semitones above C.
+
+    file_format : str
+        The extension of the files. Anything but "wav" needs ffmpeg.
+
+    peak : float
+        The level of the loudest sample of all the notes, in dBFS. All notes are
+        scaled by the same gain, so their relative levels are kept.
+
+    kwargs
+        Passed on to render_note.
+
+    Returns the paths of the files.
+    """
+    render = functools.partial(render_note, sample_rate=sample_rate, **kwargs)
+    if processes == 1:
+        rendered = [render(note) for note in notes]
+    else:
+        with concurrent.futures.ProcessPoolExecutor(processes) as executor:
+            rendered = list(executor.map(render, notes))
+
+    gain = 10 ** (peak / 20) / max(np.max(np.abs(samples)) for samples in rendered)
+    directory = pathlib.Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for note, samples in zip(notes, rendered):
+        path = directory / f"note_{note}.{file_format}"
+        samples = np.round(samples * gain * 32767).astype("<i2")
+        venn7.sprites.write_audio(path, samples, sample_rate)
+        paths.append(path)
+    return paths
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Render a set of Shepard-tone notes for the web app."
+    )
+    parser.add_argument("directory", help="Sound set directory to write to.")
+    parser.add_argument(
+        "--voice",
+        choices=sorted(VOICES),
+        default="additive",
+        help="What the notes sound like (default: additive).",
+    )
+    parser.add_argument(
+        "--center",
+        type=float,
+        default=54.0,
+        help="MIDI note where the octave gains peak (default: 54).",
+    )
+    parser.add_argument(
+        "--spread",
+        type=float,
+        default=2.0,
+        help="Width of the octave gains in octaves (default: 2).",
+    )
+    parser.add_argument(
+        "--duration", type=float, default=4.0, help="Seconds per note (default: 4)."
+    )
+    parser.add_argument(
+        "--reverb", type=float, default=0.3, help="Reverb mix (default: 0.3)."
+    )
+    parser.add_argument(
+        "--format",
+        default="wav",
+        help="File extension. Anything but wav needs ffmpeg (default: wav).",
+    )
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=None,
+        help="Number of notes to render at once (default: one per core).",
+    )
+    args = parser.parse_args()
+
+    paths = render_sound_set(
+        args.directory,
+        file_format=args.format,
+        processes=args.processes,
+        voice=args.voice,
+        center=args.center,
+        spread=args.spread,
+        duration=args.duration,
+        reverb=args.reverb,
+    )
+    print(f"Wrote {len(paths)} notes to {args.directory}")
@@ -0,0 +1,207 @@
+"""Pack the notes of a sound set into a single audio sprite.
+
+A sound set is a directory of files named note_<k>, such as app/sounds/bell.
+The notes are decoded, joined one after another with a short silence between
+them, and written to one sprite file next to a sprite.json manifest:
+
+    {
+        "file": "sprite.mp3",
+        "notes": {"note_0": {"start": 0.0, "duration": 2.5}, ...}
+    }
+
+The app then loads and decodes one file per sound set instead of one per note,
+and plays each note by its offset in the sprite. A player keeps going for its
+fade-out after the end of a note, so the silence must be at least as long as
+the fade-out, with some room to spare for MP3 frame padding. Otherwise the
+start of the next note would be heard.
+
+WAV files are read and written directly. Other formats, including the MP3 files
+in the app, are decoded and encoded with ffmpeg, which must be on the PATH.
+"""
+import json
+import pathlib
+import re
+import subprocess
+import wave
+
+import numpy as np
+
+RE_NOTE = re.compile(r"^note_(\d+)$")
+
+MANIFEST_NAME = "sprite.json"
+
+# Seconds that a player in the app takes to fade out after a note ends. It keeps
+# playing the sprite for that long.
+FADE_OUT = 1.0
+
+# The parameters that files decoded with ffmpeg are converted to.
+SAMPLE_RATE = 44100
+CHANNELS = 2
+
+
+def read_audio(path):
+    """Read an audio file. Returns the 16-bit samples as an array of shape
+    (frames, channels), and the sample rate."""
+    path = pathlib.Path(path)
+    if path.suffix.lower() == ".wav":
+        with wave.open(str(path), "rb") as f:
+            if f.getsampwidth() != 2:
+                raise ValueError(f"{path} is not 16-bit PCM")
+            data = f.readframes(f.getnframes())
+            samples = np.frombuffer(data, dtype="<i2").reshape(
+                (-1, f.getnchannels())
+            )
+            return samples, f.getframerate()
+    output = subprocess.run(
+        [
+            "ffmpeg",
+            "-v",
+            "error",
+            "-i",
+            str(path),
+            "-f",
+            "s16le",
+            "-ac",
+            str(CHANNELS),
+            "-ar",
+            str(SAMPLE_RATE),
+            "-",
+        ],
+        stdout=subprocess.PIPE,
+        check=True,
+    ).stdout
+    return np.frombuffer(output, dtype="<i2").reshape((-1, CHANNELS)), SAMPLE_RATE
+
+
+def write_audio(path, samples, sample_rate):
+    """Write samples of shape (frames, channels) to an audio file."""
+    path = pathlib.Path(path)
+    samples = np.ascontiguousarray(samples, dtype="<i2")
+    if path.suffix.lower() == ".wav":
+        with wave.open(str(path), "wb") as f:
+            f.setnchannels(samples.shape[1])
+            f.setsampwidth(2)
+            f.setframerate(sample_rate)
+            f.writeframes(samples.tobytes())
+        return
+    subprocess.run(
+        [
+            "ffmpeg",
+            "-v",
+            "error",
+            "-y",
+            "-f",
+            "s16le",
+            "-ac",
+            str(samples.shape[1]),
+            "-ar",
+            str(sample_rate),
+            "-i",
+            "-",
+            str(path),
+        ],
+        input=samples.tobytes(),
+        check=True,
+    )
+
+
+def find_notes(directory):
+    """Return the note files in a sound set directory as a dict mapping names
+    such as "note_0" to paths, sorted by note number."""
+    notes = {}
+    for path in pathlib.Path(directory).iterdir():
+        match = RE_NOTE.match(path.stem)
+        if match is not None:
+            if path.stem in notes:
+                raise ValueError(f"More than one file for {path.stem} in {directory}")
+            notes[path.stem] = path
+    return dict(
+        sorted(notes.items(), key=lambda item: int(RE_NOTE.match(item[0]).group(1)))
+    )
+
+
+def pack_sprite(directory, file_name="sprite.mp3", gap=FADE_OUT + 0.25):
+    """Pack the notes in a sound set directory into a sprite and write it and
+    its manifest to the same directory.
+
+    Parameters
+    ----------
+
+    directory : str
+        The sound set directory.
+
+    file_name : str
+        The name of the sprite file. Its extension selects the format.
+
+    gap : float
+        Seconds of silence after each note. It must be at least FADE_OUT.
+
+    Returns the manifest.
+    """
+    if gap < FADE_OUT:
+        raise ValueError(
+            f"A gap of {gap} s is shorter than the fade-out of {FADE_OUT} s, so "
+            "notes would bleed into the next one"
+        )
+    directory = pathlib.Path(directory)
+    notes = find_notes(directory)
+    if not notes:
+        raise ValueError(f"No notes in {directory}")
+
+    parts = []
+    manifest_notes = {}
+    sample_rate = None
+    channels = None
+    position = 0
+    for name, path in notes.items():
+        samples, rate = read_audio(path)
+        if sample_rate is None:
+            sample_rate = rate
+            channels = samples.shape[1]
+        elif (rate, samples.shape[1]) != (sample_rate, channels):
+            raise ValueError(
+                f"{path} doesn't have the same sample rate and channels as the "
+                "other notes"
+            )
+        manifest_notes[name] = {
+            "start": position / sample_rate,
+            "duration": len(samples) / sample_rate,
+        }
+        silence = np.zeros((int(round(gap * sample_rate)), channels), dtype="<i2")
+        parts += [samples, silence]
+        position += len(samples) + len(silence)
+
+    write_audio(directory / file_name, np.concatenate(parts), sample_rate)
+    manifest = {"file": file_name, "notes": manifest_notes}
+    with open(directory / MANIFEST_NAME, "w") as f:
+        json.dump(manifest, f, indent=4)
+    return manifest
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Pack sound sets into audio sprites for the web app."
+    )
+    parser.add_argument(
+        "directories", nargs="+", help="Sound set directories, such as app/sounds/*."
+    )
+    parser.add_argument(
+        "--file-name",
+        default="sprite.mp3",
+        help="Name of the sprite file to write in each directory (default: "
+        "sprite.mp3).",
+    )
+    parser.add_argument(
+        "--gap",
+        type=float,
+        default=FADE_OUT + 0.25,
+        help="Seconds of silence between notes, at least the fade-out of "
+        f"{FADE_OUT} s (default: {FADE_OUT + 0.25}).",
+    )
+    args = parser.parse_args()
+
+    for directory in args.directories:
+        manifest = pack_sprite(directory, file_name=args.file_name, gap=args.gap)
+        print(f"Packed {len(manifest['notes'])} notes in {directory}")
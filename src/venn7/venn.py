@@ -1,19 +1,202 @@
+import collections
+import collections.abc
+import concurrent.futures
+import functools
 import json
 import logging
 import math
+import multiprocessing
+import multiprocessing.util
 import os
 import pathlib
 import subprocess
 
 import numpy as np
-import shapely.geometry
-import shapely.affinity
 
 import venn7.bezier
+import venn7.binary
+import venn7.boolean
+import venn7.cache
+import venn7.hittest
 
 ROOT = pathlib.Path(os.path.realpath(__file__)).parent
 
 
+def rotate_mask(mask, steps, n):
+    """Cyclically rotate an n-bit region mask so that bit i moves to bit
+    (i + steps) % n. Rotating a symmetric Venn diagram by 2 pi steps / n maps
+    the region for a mask to the region for the rotated mask."""
+    steps %= n
+    full_mask = (1 << n) - 1
+    return ((mask << steps) | (mask >> (n - steps))) & full_mask
+
+
+def get_region_orbit(mask, n):
+    """Return the distinct rotations of a region mask as a list of
+    (steps, rotated_mask) pairs, starting with (0, mask)."""
+    orbit = []
+    seen = set()
+    for steps in range(n):
+        rotated_mask = rotate_mask(mask, steps, n)
+        if rotated_mask in seen:
+            break
+        seen.add(rotated_mask)
+        orbit.append((steps, rotated_mask))
+    return orbit
+
+
+def get_necklace_representatives(n):
+    """Return one mask from every orbit of nonempty region masks under
+    rotation, namely the smallest. In a symmetric n-Venn diagram these are
+    the geometrically distinct regions."""
+    return [
+        mask
+        for mask in range(1, 2 ** n)
+        if all(mask <= rotated_mask for __, rotated_mask in get_region_orbit(mask, n))
+    ]
+
+
+def parse_matrix_encoding_string(matrix_encoding_string):
+    """Parse a matrix encoding into a list of row swaps, one list of 1-indexed
+    rows per column."""
+    rows = matrix_encoding_string.strip().splitlines()
+    matrix = [[int(c) for c in line.strip()] for line in rows]
+
+    row_swaps = []
+    for column in range(len(matrix[0])):
+        entry = []
+        for row in range(len(matrix)):
+            if matrix[row][column] == 1:
+                entry.append(row + 1)
+        row_swaps.append(entry)
+    return row_swaps
+
+
+def format_matrix_encoding_string(n, row_swaps):
+    """The inverse of parse_matrix_encoding_string: format row swaps as the n - 1
+    rows of a matrix encoding."""
+    rows = []
+    for row in range(1, n):
+        rows.append("".join("1" if row in column else "0" for column in row_swaps))
+    return "\n".join(rows)
+
+
+def compact_row_swaps(flattened_row_swaps):
+    """Group flattened row swaps into as few columns as possible. Each swap goes
+    in the column after the last one holding a swap it doesn't commute with,
+    that is, a swap in the same or an adjacent row. Flattening the result gives
+    a sequence equivalent to the input up to commuting swaps."""
+    row_swaps = []
+    last_column = collections.defaultdict(lambda: -1)
+    for row in flattened_row_swaps:
+        column = 1 + max(last_column[row - 1], last_column[row], last_column[row + 1])
+        if column == len(row_swaps):
+            row_swaps.append([])
+        row_swaps[column].append(row)
+        last_column[row] = column
+    for column in row_swaps:
+        column.sort()
+    return row_swaps
+
+
+def validate_basic(n, flattened_row_swaps):
+    """Check for basic errors in flattened_row_swaps: the length, immediate
+    repetitions and the number of swaps in each row. Raises ValueError."""
+    expected_length = (2 ** n - 2) // n
+    if len(flattened_row_swaps) != expected_length:
+        raise ValueError(
+            f"Wrong length: flattened_row_swaps should be of length {expected_length}"
+        )
+
+    last_x = flattened_row_swaps[-1]
+    for x in flattened_row_swaps:
+        if last_x == x:
+            raise ValueError(
+                "Immediate repetitions are not allowed in flattened_row_swaps"
+            )
+        last_x = x
+
+    counts = collections.Counter(flattened_row_swaps)
+    for k in range(1, n - 1):
+        expected = math.comb(n, k) // n
+        if counts[k] != expected:
+            raise ValueError(f"Expected {expected} instances of {k}")
+
+
+def validate_venn(n, flattened_row_swaps):
+    """Check that flattened_row_swaps, repeated n times, encode a Venn diagram:
+    every crossing must start a region with a different set of curves, and
+    every set of curves except the empty and full sets must appear. Raises
+    ValueError.
+
+    The set of curves above row r is kept as a bitmask for every r. A swap at
+    row r only changes the set above row r, so updating it is a single XOR, and
+    the ranks seen so far are kept in a bitset.
+    """
+    full_mask = (1 << n) - 1
+    # I am not sure if this validation code is correct, sorry
+    seen = bytearray(1 << n)
+    seen[0] = seen[full_mask] = 1
+    p = list(range(n))
+    # suffix_masks[r] is the bitmask of the curves in p[r:].
+    suffix_masks = [full_mask ^ ((1 << r) - 1) for r in range(n + 1)]
+    for __ in range(n):
+        for swap_row in flattened_row_swaps:
+            a = swap_row
+            b = swap_row - 1
+            rank = suffix_masks[a] ^ (1 << p[a]) ^ (1 << p[b])
+            suffix_masks[a] = rank
+            p[a], p[b] = p[b], p[a]
+            if seen[rank]:
+                raise ValueError(f"Duplicate rank {rank}")
+            seen[rank] = 1
+    if 0 in seen:
+        raise ValueError(f"Not all ranks represented")
+
+
+def _validate_matrix_encoding(n, matrix_encoding_string):
+    try:
+        row_swaps = parse_matrix_encoding_string(matrix_encoding_string)
+        flattened_row_swaps = [y for x in row_swaps for y in x]
+        validate_basic(n, flattened_row_swaps)
+        validate_venn(n, flattened_row_swaps)
+    except (ValueError, IndexError) as error:
+        return str(error)
+    return None
+
+
+def validate_matrix_encodings(n, matrix_encoding_strings, processes=None, chunksize=64):
+    """Validate many matrix encodings of n-Venn diagrams in a process pool.
+
+    matrix_encoding_strings may be any iterable, such as the output of
+    read_matrix_encodings on an open file, and is consumed lazily. Yields one
+    result per encoding in the same order: None if the encoding is valid,
+    otherwise a string describing the error. With processes=1, everything runs
+    in this process.
+    """
+    validate = functools.partial(_validate_matrix_encoding, n)
+    if processes == 1:
+        yield from map(validate, matrix_encoding_strings)
+        return
+    with multiprocessing.Pool(processes) as pool:
+        yield from pool.imap(validate, matrix_encoding_strings, chunksize)
+
+
+def read_matrix_encodings(lines):
+    """Read matrix encodings separated by blank lines from an iterable of lines
+    such as an open file, and yield them one at a time."""
+    rows = []
+    for line in lines:
+        line = line.strip()
+        if line:
+            rows.append(line)
+        elif rows:
+            yield "\n".join(rows)
+            rows = []
+    if rows:
+        yield "\n".join(rows)
+
+
 class VennDiagram:
     """A simple symmetric monotone Venn diagram. The diagram is encoded discretely
     using a set of "row swaps." Creation of path data is performed on the fly.
@@ -29,9 +212,29 @@ class VennDiagram:
     matrix_encoding_string : str
         A string containing whitespace-separated rows of the "matrix encoding."
         See README for example.
+
+    validate : bool
+        Whether to check the encoding right away. If False, call validate()
+        before relying on it.
     """
 
-    def __init__(self, n, matrix_encoding_string, name=None, renderer_args=None):
+    # The number of sets of renderer args whose geometry is kept at once.
+    geometry_cache_size = 4
+
+    # How far the polygons from get_polygon may stray from the curves.
+    polygon_tolerance = 0.05
+
+    # The height of the rows of the hit-test index in the exported JSON.
+    hit_test_row_height = 0.25
+
+    def __init__(
+        self,
+        n,
+        matrix_encoding_string,
+        name=None,
+        renderer_args=None,
+        validate=True,
+    ):
         self.name = name
         self.n = n
 
@@ -44,66 +247,27 @@ class VennDiagram:
         if self.renderer_args is None:
             self.renderer_args = {}
 
-        self.validate_basic()
-        self.validate_venn()
+        self._geometry_cache = collections.OrderedDict()
+
+        if validate:
+            self.validate()
 
     def parse_matrix_encoding_string(self, matrix_encoding_string):
-        rows = matrix_encoding_string.strip().splitlines()
-        matrix = [[int(c) for c in line.strip()] for line in rows]
-
-        row_swaps = []
-        for column in range(len(matrix[0])):
-            entry = []
-            for row in range(len(matrix)):
-                if matrix[row][column] == 1:
-                    entry.append(row + 1)
-            row_swaps.append(entry)
-        return row_swaps
+        return parse_matrix_encoding_string(matrix_encoding_string)
+
+    def validate(self):
+        """Check that the encoding is a valid Venn diagram. Raises
+        ValueError."""
+        self.validate_basic()
+        self.validate_venn()
 
     def validate_basic(self):
         """Check for basic errors in the matrix flattened_row_swaps."""
-        n = self.n
-        expected_length = (2 ** n - 2) // n
-        if len(self.flattened_row_swaps) != expected_length:
-            raise ValueError(
-                f"Wrong length: flattened_row_swaps should be of length {expected_length}"
-            )
-
-        last_x = self.flattened_row_swaps[-1]
-        for x in self.flattened_row_swaps:
-            if last_x == x:
-                raise ValueError(
-                    "Immediate repetitions are not allowed in flattened_row_swaps"
-                )
-            last_x = x
-
-        for k in range(1, n - 1):
-            expected = math.comb(n, k) // n
-            count = 0
-            for x in self.flattened_row_swaps:
-                if x == k:
-                    count += 1
-            if count != expected:
-                raise ValueError(f"Expected {expected} instances of {k}")
+        validate_basic(self.n, self.flattened_row_swaps)
 
     def validate_venn(self):
         """Check that this is in fact a Venn diagram."""
-        n = self.n
-
-        # I am not sure if this validation code is correct, sorry
-        ranks = [False] * (2 ** n)
-        ranks[0] = ranks[-1] = True
-        p = list(range(n))
-        for swap_row in self.full_flattened_row_swaps():
-            a = swap_row
-            b = swap_row - 1
-            p[a], p[b] = p[b], p[a]
-            rank = sum([2 ** x for x in p[swap_row:]])
-            if ranks[rank]:
-                raise ValueError(f"Duplicate rank {rank}")
-            ranks[rank] = True
-        if not all(ranks):
-            raise ValueError(f"Not all ranks represented")
+        validate_venn(self.n, self.flattened_row_swaps)
 
     def full_flattened_row_swaps(self):
         """Return the flattened_row_swaps duplicated n times."""
@@ -112,35 +276,142 @@ class VennDiagram:
             full_flattened_row_swaps += self.flattened_row_swaps
         return full_flattened_row_swaps
 
+    def _get_geometry(self):
+        """Return the cached geometry for the current renderer args, a dict of
+        lists that get filled in as curves are computed.
+
+        The cache is keyed by the renderer args, so changing them gives fresh
+        geometry, and it only keeps the geometry_cache_size most recently used
+        variants.
+        """
+        key = json.dumps(self.renderer_args, sort_keys=True)
+        cache = self._geometry_cache
+        if key in cache:
+            cache.move_to_end(key)
+        else:
+            cache[key] = {"splines": [None] * self.n, "polygons": [None] * self.n}
+            while len(cache) > self.geometry_cache_size:
+                cache.popitem(last=False)
+        return cache[key]
+
     def get_spline(self, index=0):
-        renderer = VennDiagramRenderer(self, **self.renderer_args)
-        return renderer.get_spline()
+        """Get the shape of curve number index as a BezierPath. Curve i is curve
+        0 rotated by 2 pi i / n. The result is cached and shared, so don't
+        modify it."""
+        index %= self.n
+        splines = self._get_geometry()["splines"]
+        if splines[index] is None:
+            if index == 0:
+                renderer = VennDiagramRenderer(self, **self.renderer_args)
+                spline = renderer.get_spline()
+            else:
+                matrix = venn7.bezier.get_rotation_matrix(2 * math.pi * index / self.n)
+                spline = self.get_spline(0).transform(matrix)
+            spline.control_points.flags.writeable = False
+            splines[index] = spline
+        return splines[index]
 
     def get_polygon(self, index=0):
-        """Get the shape of a single curve as a polygon."""
-        spline = self.get_spline(index)
-        resolution = 10
-        points = []
-        for bezier in spline.beziers:
-            for i in range(resolution):
-                points.append(bezier(i / resolution))
-        return points
+        """Get the shape of curve number index as a polygon, within
+        polygon_tolerance of the curve. The result is cached and read-only."""
+        index %= self.n
+        polygons = self._get_geometry()["polygons"]
+        if polygons[index] is None:
+            if index == 0:
+                polygon = self.get_spline(0).flatten(self.polygon_tolerance)
+            else:
+                matrix = venn7.bezier.get_rotation_matrix(2 * math.pi * index / self.n)
+                polygon = self.get_polygon(0) @ matrix.T
+            polygon.flags.writeable = False
+            polygons[index] = polygon
+        return polygons[index]
+
+    def get_hit_test_index(self):
+        """Get a venn7.hittest.HitTestIndex for looking up the region under a
+        point."""
+        return venn7.hittest.HitTestIndex.from_polygons(
+            [self.get_polygon(i) for i in range(self.n)],
+            row_height=self.hit_test_row_height,
+        )
 
-    def check_regions(self):
+    def clear_geometry_cache(self):
+        self._geometry_cache.clear()
+
+    def check_regions(self, method="overlay"):
         """Approximate this Venn diagram with polygons and use Shapely to check
-        that the diagram is valid."""
-        original_curve = shapely.geometry.Polygon(self.get_polygon())
-        curves = []
-        for i in range(self.n):
-            angle = 2 * math.pi * i / self.n
-            curve = shapely.affinity.rotate(
-                original_curve, angle, origin=(0, 0), use_radians=True
-            )
-            curves.append(curve)
+        that the diagram is valid.
+
+        Parameters
+        ----------
 
-        # Region at index 0 is an empty set.
-        regions = [[]]
-        for rank in range(1, 2 ** self.n):
+        method : str
+            "overlay" overlays the boundaries of all curves once, splits the
+            plane into faces, and labels every face with the mask of curves
+            containing it. Every nonempty mask must label exactly one face.
+            "boolean" instead builds each region with a chain of intersections
+            and differences and checks that it is not empty.
+        """
+        if method == "overlay":
+            self._check_regions_overlay()
+        elif method == "boolean":
+            self._check_regions_boolean()
+        else:
+            raise ValueError(f"Unknown method {method!r}")
+
+    def _get_curve_polygons(self):
+        """Get the vertices of all n curves as polygons."""
+        return [self.get_polygon(i) for i in range(self.n)]
+
+    def get_region_faces(self):
+        """Overlay the polygonal approximations of all curves and return the
+        resulting faces as a list of (mask, shapely.geometry.Polygon) pairs.
+
+        The curve boundaries are noded against each other with a single union
+        and polygonized. A point inside each face is then tested against every
+        curve at once.
+        """
+        import shapely.geometry
+        import shapely.ops
+
+        curve_polygons = self._get_curve_polygons()
+        rings = [
+            shapely.geometry.LinearRing(polygon) for polygon in curve_polygons
+        ]
+        faces = list(shapely.ops.polygonize(shapely.ops.unary_union(rings)))
+        points = np.array(
+            [face.representative_point().coords[0] for face in faces]
+        ).reshape((-1, 2))
+
+        masks = np.zeros(len(faces), dtype=int)
+        for i, polygon in enumerate(curve_polygons):
+            masks[venn7.bezier.points_in_polygon(points, polygon)] |= 1 << i
+        return list(zip(masks.tolist(), faces))
+
+    def _check_regions_overlay(self):
+        counts = collections.Counter(mask for mask, __ in self.get_region_faces())
+        problems = []
+        missing = [mask for mask in range(1, 2 ** self.n) if mask not in counts]
+        if missing:
+            problems.append(f"missing regions {missing}")
+        disconnected = [mask for mask, count in counts.items() if mask and count > 1]
+        if disconnected:
+            problems.append(f"disconnected regions {sorted(disconnected)}")
+        if counts[0]:
+            problems.append(f"{counts[0]} bounded faces outside all curves")
+        if problems:
+            raise ValueError(f"Invalid regions: {'; '.join(problems)}")
+
+    def _check_regions_boolean(self):
+        import shapely.geometry
+
+        curves = [
+            shapely.geometry.Polygon(polygon) for polygon in self._get_curve_polygons()
+        ]
+
+        # The curves are rotations of each other, so regions whose masks are
+        # rotations of each other are congruent and only one region per orbit
+        # needs to be checked.
+        for rank in get_necklace_representatives(self.n):
             curves_included = []
             curves_excluded = []
             tmp_rank = rank
@@ -157,31 +428,111 @@ class VennDiagram:
             for curve in curves_excluded:
                 region = region.difference(curve)
 
-            assert not region.is_empty
+            if region.is_empty:
+                raise ValueError(f"Region {rank} is empty")
+
+    def export_json(
+        self,
+        backend="python",
+        worker=None,
+        cache=None,
+        force=False,
+        format="svg",
+        hit_test=False,
+    ):
+        """Export the curve and region paths of this diagram.
+
+        Parameters
+        ----------
+
+        backend : str
+            "python" computes the regions in-process with venn7.boolean.
+            "paperjs" computes them with Paper.js in a Node worker.
+
+        worker : BooleanWorker, optional
+            A running worker for the "paperjs" backend. If not given, a worker
+            is started and shut down just for this diagram.
+
+        cache : venn7.cache.BuildCache, optional
+            If given, a result cached for the same diagram, renderer args,
+            backend and code is returned instead of being computed, and a newly
+            computed result is stored.
+
+        force : bool
+            Compute the result even if it is cached.
+
+        format : str
+            "svg" exports the curve and each region as an SVG path string.
+            "binary" exports them all together with venn7.binary.encode_paths,
+            the curve first and then the regions, under the "coordinates",
+            "structure" and "scale" keys.
+
+        hit_test : bool
+            Also export a hit-test index for finding the region under a point
+            (see venn7.hittest) under the "hit_test" key. It's larger than the
+            binary paths, so it's left out unless asked for, and the app then
+            finds regions from the paths.
+        """
+        if format not in ("svg", "binary"):
+            raise ValueError(f"Unknown format {format!r}")
+
+        if cache is not None:
+            key = venn7.cache.get_export_key(self, backend, format, hit_test)
+            result = None if force else cache.get(key)
+            if result is None:
+                result = self.export_json(
+                    backend=backend, worker=worker, format=format, hit_test=hit_test
+                )
+                cache.put(key, result)
+            return result
+
+        if backend == "paperjs" and worker is None:
+            with BooleanWorker() as worker:
+                return self.export_json(
+                    backend=backend, worker=worker, format=format, hit_test=hit_test
+                )
 
-    def export_json(self):
+        spline = self.get_spline()
         result = {
             "name": self.name,
             "n": self.n,
-            "curve": self.get_spline().as_svg_path(),
+            "curve": spline.as_svg_path(),
         }
 
-        process = subprocess.run(
-            ["node", str(ROOT / "venn_boolean.js")],
-            check=True,
-            capture_output=True,
-            input=json.dumps(result),
-            encoding="utf-8",
-        )
-
-        regions = json.loads(process.stdout)
-
-        processed_regions = [""]
-        for region in regions[1:]:
-            path = venn7.bezier.BezierPath.from_svg_path(region)
-            path = path.remove_tiny_segments(threshold=1)
-            processed_regions.append(path.as_svg_path())
-        result["regions"] = processed_regions
+        # Only one region per orbit of rotations is computed. The rest are
+        # produced by rotating its path.
+        representatives = get_necklace_representatives(self.n)
+        if backend == "python":
+            curves = [self.get_spline(i) for i in range(self.n)]
+            regions = venn7.boolean.compute_regions(curves, masks=representatives)
+            paths = [regions[mask] for mask in representatives]
+            tiny_segment_threshold = 1e-3
+        elif backend == "paperjs":
+            paths = [
+                venn7.bezier.BezierPath.from_svg_path(region)
+                for region in worker.compute_regions(result, masks=representatives)
+            ]
+            # Paper.js sometimes leaves small artifacts behind.
+            tiny_segment_threshold = 1
+        else:
+            raise ValueError(f"Unknown backend {backend!r}")
+
+        processed_regions = [venn7.bezier.BezierPath([])] * 2 ** self.n
+        for mask, path in zip(representatives, paths):
+            path = path.remove_tiny_segments(threshold=tiny_segment_threshold)
+            for steps, rotated_mask in get_region_orbit(mask, self.n):
+                matrix = venn7.bezier.get_rotation_matrix(2 * math.pi * steps / self.n)
+                processed_regions[rotated_mask] = path.transform(matrix)
+
+        if format == "binary":
+            del result["curve"]
+            result["format"] = "binary"
+            result.update(venn7.binary.encode_paths([spline] + processed_regions))
+        else:
+            result["regions"] = [path.as_svg_path() for path in processed_regions]
+
+        if hit_test:
+            result["hit_test"] = self.get_hit_test_index().to_json()
 
         return result
 
@@ -192,7 +543,7 @@ class VennDiagram:
 
         fig, ax = plt.subplots()
         polygons = [
-            matplotlib.patches.Polygon(self.get_polygon(i)) for i in range(diagram.n)
+            matplotlib.patches.Polygon(self.get_polygon(i)) for i in range(self.n)
         ]
         patches = matplotlib.collections.PatchCollection(polygons, alpha=0.2)
         ax.add_collection(patches)
@@ -201,6 +552,88 @@ class VennDiagram:
         plt.show()
 
 
+class BooleanWorker:
+    """A long-lived Node process that computes region paths with Paper.js.
+
+    Starting Node and setting up Paper.js and JSDOM is expensive, so a single
+    worker should be started once and then handed every diagram in a build. The
+    worker runs venn_boolean.js in worker mode and talks a line-delimited JSON
+    protocol over its stdin and stdout, and exits when its stdin is closed. Use
+    it as a context manager to make sure it's shut down:
+
+        with BooleanWorker() as worker:
+            for diagram in DIAGRAMS.values():
+                diagram.export_json(worker=worker)
+    """
+
+    def __init__(self):
+        self.process = None
+        self.next_id = 0
+
+    def start(self):
+        if self.process is None:
+            self.process = subprocess.Popen(
+                ["node", str(ROOT / "venn_boolean.js"), "--worker"],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                encoding="utf-8",
+            )
+
+    def compute_regions(self, diagram_json, masks=None, memoize=True):
+        """Compute region paths for a diagram given as a dict with keys "n" and
+        "curve".
+
+        If masks is None, return a list of all 2 ** n region paths indexed by
+        mask, where the empty region is an empty string. Otherwise, return a
+        list with one path per mask in masks. With memoize=False, the worker
+        computes each region from scratch instead of sharing work between them,
+        which is slower and only useful for testing.
+        """
+        self.start()
+        request = {"id": self.next_id, "diagram": diagram_json}
+        self.next_id += 1
+        if masks is not None:
+            request["masks"] = [int(mask) for mask in masks]
+        if not memoize:
+            request["memoize"] = False
+
+        self.process.stdin.write(json.dumps(request) + "\n")
+        self.process.stdin.flush()
+        line = self.process.stdout.readline()
+        if not line:
+            returncode = self.process.wait()
+            self.process = None
+            raise RuntimeError(f"Boolean worker exited with code {returncode}")
+
+        response = json.loads(line)
+        if response["id"] != request["id"]:
+            raise RuntimeError(
+                f"Expected response to request {request['id']}, got {response['id']}"
+            )
+        if "error" in response:
+            raise RuntimeError(f"Boolean worker failed: {response['error']}")
+        return response["regions"]
+
+    def close(self):
+        if self.process is None:
+            return
+        self.process.stdin.close()
+        try:
+            self.process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+        self.process.stdout.close()
+        self.process = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
 class VennDiagramRenderer:
     """A class that renders discrete Venn diagrams to splines."""
 
@@ -374,6 +807,40 @@ class VennDiagramRenderer:
         return spline
 
 
+class DiagramRegistry(collections.abc.Mapping):
+    """A read-only mapping from names to VennDiagrams that constructs each
+    diagram, which parses and validates its encoding, the first time it is
+    looked up. Importing this module then costs nothing per diagram.
+
+    Parameters
+    ----------
+
+    factories : dict
+        Maps each name to a function that returns the VennDiagram.
+    """
+
+    def __init__(self, factories):
+        self._factories = dict(factories)
+        self._diagrams = {}
+
+    def __getitem__(self, name):
+        if name not in self._diagrams:
+            self._diagrams[name] = self._factories[name]()
+        return self._diagrams[name]
+
+    def __iter__(self):
+        return iter(self._factories)
+
+    def __len__(self):
+        return len(self._factories)
+
+    def validate(self):
+        """Construct and validate every diagram now. Raises ValueError for the
+        first invalid one."""
+        for name in self:
+            self[name]
+
+
 DIAGRAMS_LIST = [
     "victoria",
     "adelaide",
@@ -384,116 +851,314 @@ DIAGRAMS_LIST = [
     "5",
 ]
 
-DIAGRAMS = {
-    "victoria": VennDiagram(
-        7,
-        """
-        010000000000
-        101000001000
-        010100010101
-        100010101010
-        000001010001
-        000000100000
-        """,
-        "Victoria",
+DIAGRAMS = DiagramRegistry(
+    {
+        "victoria": functools.partial(
+            VennDiagram,
+            7,
+            """
+            010000000000
+            101000001000
+            010100010101
+            100010101010
+            000001010001
+            000000100000
+            """,
+            "Victoria",
         ),
-    "adelaide": VennDiagram(
-        7,
-        """
-        0100000000
-        1010001000
-        0101010101
-        1010101010
-        0001010001
-        0000100000
-        """,
-        "Adelaide",
-    ),
-    "massey": VennDiagram(
-        7,
-        """
-        010000000000
-        101000000010
-        010100010101
-        101010101000
-        010101000000
-        001000000000
-        """,
-        "Massey",
-    ),
-    "manawatu": VennDiagram(
-        7,
-        """
-        00001000000000
-        10000000100100
-        01010001010001
-        00101010001010
-        00000100100100
-        01000000000000
-        """,
-        "Manawatu",
-        renderer_args={
-            "extra_outer_spacing": 2
-        },
-    ),
-    "palmerston_north": VennDiagram(
-        7,
-        """
-        10000000000000
-        00100000001010
-        01010100010100
-        10001010100010
-        00000001000101
-        00000000010000
-        """,
-        "Palmerston North",
-        renderer_args={
-            "extra_outer_spacing": 1
-        },
-    ),
-    "hamilton": VennDiagram(
-        7,
-        """
-        0010000000
-        1000100010
-        0101010101
-        1010101010
-        0101000100
-        0000000001
-        """,
-        "Hamilton",
-        renderer_args={
-            "extra_outer_spacing": 1
-        },
-    ),
-    "5": VennDiagram(
-        5,
-        """
-        1000
-        0101
-        1010
-        0001
-        """,
-        "Symmetric 5-Venn diagram",
-        renderer_args={
-            "inner_radius": 10,
-            "spacing": 8,
-            "tension_diagonal": 1,
-            "tension_default": 1,
-        },
-    ),
-}
+        "adelaide": functools.partial(
+            VennDiagram,
+            7,
+            """
+            0100000000
+            1010001000
+            0101010101
+            1010101010
+            0001010001
+            0000100000
+            """,
+            "Adelaide",
+        ),
+        "massey": functools.partial(
+            VennDiagram,
+            7,
+            """
+            010000000000
+            101000000010
+            010100010101
+            101010101000
+            010101000000
+            001000000000
+            """,
+            "Massey",
+        ),
+        "manawatu": functools.partial(
+            VennDiagram,
+            7,
+            """
+            00001000000000
+            10000000100100
+            01010001010001
+            00101010001010
+            00000100100100
+            01000000000000
+            """,
+            "Manawatu",
+            renderer_args={
+                "extra_outer_spacing": 2
+            },
+        ),
+        "palmerston_north": functools.partial(
+            VennDiagram,
+            7,
+            """
+            10000000000000
+            00100000001010
+            01010100010100
+            10001010100010
+            00000001000101
+            00000000010000
+            """,
+            "Palmerston North",
+            renderer_args={
+                "extra_outer_spacing": 1
+            },
+        ),
+        "hamilton": functools.partial(
+            VennDiagram,
+            7,
+            """
+            0010000000
+            1000100010
+            0101010101
+            1010101010
+            0101000100
+            0000000001
+            """,
+            "Hamilton",
+            renderer_args={
+                "extra_outer_spacing": 1
+            },
+        ),
+        "5": functools.partial(
+            VennDiagram,
+            5,
+            """
+            1000
+            0101
+            1010
+            0001
+            """,
+            "Symmetric 5-Venn diagram",
+            renderer_args={
+                "inner_radius": 10,
+                "spacing": 8,
+                "tension_diagonal": 1,
+                "tension_default": 1,
+            },
+        ),
+    }
+)
+
+_process_worker = None
+
+
+def _start_process_worker():
+    """Set up a Node worker for the "paperjs" backend in a build process, to be
+    used as the initializer of the pool.
+
+    Pool processes leave with os._exit, which skips atexit handlers, so the
+    worker is closed by a multiprocessing finalizer, which the pool does run
+    before the process exits.
+    """
+    global _process_worker
+    _process_worker = BooleanWorker()
+    multiprocessing.util.Finalize(None, _process_worker.close, exitpriority=10)
+
+
+def _export_diagram(
+    name,
+    backend="python",
+    cache=None,
+    force=False,
+    format="svg",
+    hit_test=False,
+    worker=None,
+):
+    """Export one diagram from DIAGRAMS. In a build process, the worker defaults
+    to the one set up by _start_process_worker."""
+    if backend == "paperjs" and worker is None:
+        worker = _process_worker
+    return DIAGRAMS[name].export_json(
+        backend=backend,
+        worker=worker,
+        cache=cache,
+        force=force,
+        format=format,
+        hit_test=hit_test,
+    )
+
+
+def export_diagrams(
+    path,
+    names=None,
+    backend="python",
+    cache=None,
+    force=False,
+    processes=None,
+    format="svg",
+    hit_test=False,
+):
+    """Export diagrams from DIAGRAMS to a JavaScript file for the web app.
+
+    The diagrams are exported in a pool of processes, and each one is written
+    out as soon as it is done rather than kept until the end. The file is
+    written under a temporary name and renamed when it is complete. A diagram
+    that fails to export is logged and left out, including from the
+    "diagrams_list" entry, and the others are still written. If every diagram
+    fails, nothing is written and the file at path is left as it was. With
+    processes=1, everything runs in this process.
+
+    Parameters
+    ----------
+
+    path : str
+        The file to write.
+
+    names : list, optional
+        Which diagrams to export, in order. Defaults to DIAGRAMS_LIST.
+
+    backend, cache, force, format, hit_test
+        Passed on to VennDiagram.export_json.
+
+    Returns a dict mapping the names of the diagrams that failed to the
+    exceptions they raised.
+    """
+    if names is None:
+        names = DIAGRAMS_LIST
+    export = functools.partial(
+        _export_diagram,
+        backend=backend,
+        cache=cache,
+        force=force,
+        format=format,
+        hit_test=hit_test,
+    )
+    exported = set()
+    failed = {}
+    temporary = f"{path}.tmp"
+    with open(temporary, "w") as f:
+        f.write("const venn_diagrams = {")
+
+        def finish(name, get_result):
+            try:
+                result = get_result()
+            except Exception as error:
+                logging.error(f"Failed to export {name}", exc_info=error)
+                failed[name] = error
+                return
+            f.write(json.dumps(name) + ": ")
+            json.dump(result, f)
+            f.write(", ")
+            f.flush()
+            exported.add(name)
+
+        if processes == 1:
+            worker = BooleanWorker() if backend == "paperjs" else None
+            try:
+                for name in names:
+                    finish(name, functools.partial(export, name, worker=worker))
+            finally:
+                if worker is not None:
+                    worker.close()
+        else:
+            initializer = _start_process_worker if backend == "paperjs" else None
+            with concurrent.futures.ProcessPoolExecutor(
+                processes, initializer=initializer
+            ) as executor:
+                futures = {executor.submit(export, name): name for name in names}
+                for future in concurrent.futures.as_completed(futures):
+                    finish(futures[future], future.result)
+
+        f.write('"diagrams_list": ')
+        json.dump([name for name in names if name in exported], f)
+        f.write("};")
+    if exported:
+        os.replace(temporary, path)
+    else:
+        os.remove(temporary)
+    return failed
+
 
 if __name__ == "__main__":
-    import json
+    import argparse
     import sys
 
-    diagrams_json = {}
-    diagrams_json["diagrams_list"] = DIAGRAMS_LIST
-    for name, diagram in DIAGRAMS.items():
-        diagrams_json[name] = diagram.export_json()
+    parser = argparse.ArgumentParser(
+        description="Export Venn diagram shape data for the web app."
+    )
+    parser.add_argument("output", help="JavaScript file to write.")
+    parser.add_argument(
+        "--backend",
+        choices=["python", "paperjs"],
+        default="python",
+        help="How to compute Boolean operations on curves (default: python).",
+    )
+    parser.add_argument(
+        "--format",
+        choices=["svg", "binary"],
+        default="svg",
+        help="How to store paths: as SVG path strings, or as quantized, "
+        "delta-encoded binary that is smaller and faster to load (default: svg).",
+    )
+    parser.add_argument(
+        "--hit-test",
+        action="store_true",
+        help="Also export an index for finding the region under the pointer, "
+        "which is larger than the binary paths.",
+    )
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=None,
+        help="Number of diagrams to export at once (default: one per core).",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=None,
+        help="Where to cache exported diagrams (default: ~/.cache/venn7).",
+    )
+    parser.add_argument(
+        "--max-cache-size",
+        type=float,
+        default=100,
+        help="Size of the cache in megabytes (default: 100).",
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true", help="Don't read or write the cache."
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Rebuild every diagram, even if it is cached.",
+    )
+    args = parser.parse_args()
+
+    cache = None
+    if not args.no_cache:
+        cache = venn7.cache.BuildCache(
+            args.cache_dir, max_size=int(args.max_cache_size * 2 ** 20)
+        )
 
-    with open(sys.argv[1], "w") as f:
-        f.write("const venn_diagrams = ")
-        json.dump(diagrams_json, f)
-        f.write(";")
+    logging.basicConfig(format="%(levelname)s: %(message)s")
+    failed = export_diagrams(
+        args.output,
+        backend=args.backend,
+        cache=cache,
+        force=args.force,
+        processes=args.processes,
+        format=args.format,
+        hit_test=args.hit_test,
+    )
+    if failed:
+        sys.exit(f"Failed to export {', '.join(sorted(failed))}")
@@ -1,4 +1,17 @@
+// Computes the region paths of a Venn diagram with Paper.js.
+//
+// Run with no arguments to read a single diagram as JSON from stdin and print
+// the region paths as JSON. Run with --worker to process many requests over a
+// line-delimited JSON protocol: each line of stdin is a request of the form
+// {"id": ..., "diagram": {...}, "masks": [...]}, and each line of stdout is the
+// matching response {"id": ..., "regions": [...]} or {"id": ..., "error": "..."}.
+// "masks" is optional. If it is given, "regions" holds one path per mask in the
+// same order; otherwise it holds all 2^n regions indexed by mask, with an empty
+// string for the empty region. With "memoize": false, every region is computed
+// from scratch, without RegionCache, which is only useful to check it.
+
 const fs = require("fs");
+const readline = require("readline");
 const { JSDOM } = require("jsdom");
 const paper = require("paper");
 
@@ -11,50 +24,134 @@ const dom = new JSDOM(`
 `);
 paper.setup(dom.window.document.body);
 
-const venn_diagram = JSON.parse(fs.readFileSync(0, "utf-8"));
-
-function make_venn_curve(i) {
+function make_venn_curve(venn_diagram, i) {
     const path = new paper.Path(venn_diagram.curve);
     path.rotate(360 / venn_diagram.n * i, new paper.Point(0, 0));
     return path;
 }
 
-function get_venn_sets(region_index, n) {
-    let tmp = region_index;
-    const result = [];
-    let i;
-    for (i = 0; i < n; i++) {
-        result.push(tmp % 2);
-        tmp = Math.floor(tmp / 2);
+// Region paths are built up one curve at a time. The "prefix region" for depth d
+// and a mask whose bits are all below d is the intersection of the curves whose
+// bits are set, minus the curves below d whose bits are clear. The prefix region
+// for depth d + 1 then takes one intersection or subtraction from the prefix
+// region for depth d, and the full region for a mask is its prefix region at
+// depth n. Prefix regions are memoized, so regions with a common prefix share
+// their boolean operations instead of each doing n of them from scratch.
+class RegionCache {
+    constructor(venn_diagram) {
+        this.n = venn_diagram.n;
+        this.curves = [];
+        let i;
+        for (i = 0; i < this.n; i++) {
+            this.curves.push(make_venn_curve(venn_diagram, i));
+        }
+        this.prefix_regions = new Map();
     }
-    return result;
-};
 
-const region_paths = [""];
+    get_prefix_region(depth, mask) {
+        // Nothing has been intersected yet, so the region is unbounded.
+        if (mask === 0) {
+            return null;
+        }
+        const key = depth * Math.pow(2, this.n) + mask;
+        if (this.prefix_regions.has(key)) {
+            return this.prefix_regions.get(key);
+        }
+        const bit = depth - 1;
+        const curve = this.curves[bit];
+        const bit_value = Math.pow(2, bit);
+        let region;
+        if (mask & bit_value) {
+            const parent = this.get_prefix_region(depth - 1, mask - bit_value);
+            if (parent === null) {
+                // First curve included: subtract all the excluded curves before it.
+                region = curve;
+                let j;
+                for (j = 0; j < bit; j++) {
+                    region = region.subtract(this.curves[j]);
+                }
+            } else {
+                region = parent.intersect(curve);
+            }
+        } else {
+            region = this.get_prefix_region(depth - 1, mask).subtract(curve);
+        }
+        this.prefix_regions.set(key, region);
+        return region;
+    }
 
-for (i = 1; i < Math.pow(2, venn_diagram.n); i++) {
-    const sets = get_venn_sets(i, venn_diagram.n);
+    get_region(mask) {
+        return this.get_prefix_region(this.n, mask);
+    }
+}
 
+// Compute a region without sharing any work: intersect the curves whose bits
+// are set, then subtract the others.
+function compute_region_directly(curves, mask) {
     let region = null;
     let j;
-    for (j = 0; j < venn_diagram.n; j++) {
-        if (sets[j]) {
-            let curve = make_venn_curve(j);
-            if (region === null) {
-                region = curve;
-            } else {
-                region = region.intersect(curve);
-            }
+    for (j = 0; j < curves.length; j++) {
+        if (mask & Math.pow(2, j)) {
+            region = region === null ? curves[j] : region.intersect(curves[j]);
         }
     }
-    for (j = 0; j < venn_diagram.n; j++) {
-        if (!sets[j]) {
-            let curve = make_venn_curve(j);
-            region = region.subtract(curve);
+    for (j = 0; j < curves.length; j++) {
+        if (!(mask & Math.pow(2, j))) {
+            region = region.subtract(curves[j]);
+        }
+    }
+    return region;
+}
+
+function compute_regions(venn_diagram, masks, memoize = true) {
+    try {
+        const cache = new RegionCache(venn_diagram);
+        const get_region = memoize
+            ? (mask) => cache.get_region(mask)
+            : (mask) => compute_region_directly(cache.curves, mask);
+        if (masks === undefined) {
+            const region_paths = [""];
+            let i;
+            for (i = 1; i < Math.pow(2, venn_diagram.n); i++) {
+                region_paths.push(get_region(i).pathData);
+            }
+            return region_paths;
         }
+        return masks.map((mask) => get_region(mask).pathData);
+    } finally {
+        // Every path created above lives in the active layer. Clear it so that
+        // a long-running worker doesn't accumulate them.
+        paper.project.activeLayer.removeChildren();
     }
+}
 
-    region_paths.push(region.pathData);
+function run_worker() {
+    const lines = readline.createInterface({ input: process.stdin });
+    lines.on("line", (line) => {
+        if (line.trim() === "") {
+            return;
+        }
+        let response;
+        let id = null;
+        try {
+            const request = JSON.parse(line);
+            id = request.id;
+            response = {
+                id: id,
+                regions: compute_regions(
+                    request.diagram, request.masks, request.memoize !== false
+                ),
+            };
+        } catch (error) {
+            response = { id: id, error: String(error.stack || error) };
+        }
+        process.stdout.write(JSON.stringify(response) + "\n");
+    });
 }
 
-console.log(JSON.stringify(region_paths));
+if (process.argv.includes("--worker")) {
+    run_worker();
+} else {
+    const venn_diagram = JSON.parse(fs.readFileSync(0, "utf-8"));
+    console.log(JSON.stringify(compute_regions(venn_diagram)));
+}
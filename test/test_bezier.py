@@ -38,6 +38,97 @@ class TestCubicBezier:
         np.testing.assert_allclose(furthest_point[0], 1.5)
 
 
+class TestBezierPath:
+    def make_path(self):
+        return venn7.bezier.MetafontSpline(
+            [
+                (0.0, 1.0),
+                (1.0, 0.0),
+                (0.0, -1.0),
+                (-1.0, 0.0),
+            ]
+        )
+
+    def test_transform_and_translate(self):
+        path = self.make_path()
+        matrix = venn7.bezier.get_rotation_matrix(0.3) * 2
+        displacement = np.array([1.0, -2.0])
+        transformed = path.transform(matrix).translate(displacement)
+        assert len(transformed) == len(path)
+        for bezier, new_bezier in zip(path, transformed):
+            expected = bezier.transform(matrix).translate(displacement)
+            np.testing.assert_allclose(
+                new_bezier.control_points, expected.control_points
+            )
+
+    def test_evaluate(self):
+        path = self.make_path()
+        t = np.linspace(0, 1, 7)
+        points = path.evaluate(t)
+        assert points.shape == (len(path), len(t), 2)
+        for i, bezier in enumerate(path.beziers):
+            np.testing.assert_allclose(points[i], bezier(t))
+
+    def test_get_furthest_point(self):
+        rng = np.random.default_rng(0)
+        path = venn7.bezier.BezierPath(rng.normal(size=(50, 4, 2)))
+        point = (0.3, -0.2)
+
+        def distance(candidate):
+            return np.hypot(candidate[0] - point[0], candidate[1] - point[1])
+
+        expected = max(
+            [bezier.get_furthest_point_from(point) for bezier in path],
+            key=distance,
+        )
+        np.testing.assert_allclose(path.get_furthest_point_from(point), expected)
+
+    def test_slicing(self):
+        path = self.make_path()
+        tail = path[1:3]
+        assert isinstance(tail, venn7.bezier.BezierPath)
+        assert len(tail) == 2
+        np.testing.assert_allclose(
+            tail[0].control_points, path.beziers[1].control_points
+        )
+        assert np.shares_memory(tail.control_points, path.control_points)
+
+    def test_flatten(self):
+        path = self.make_path().transform(np.eye(2) * 50)
+        for tolerance in [1, 0.1, 0.01]:
+            polygon = path.flatten(tolerance)
+            np.testing.assert_allclose(polygon[0], path.control_points[0, 0])
+
+            # Every point of the curve is within tolerance of the polygon.
+            points = path.evaluate(np.linspace(0, 1, 101)).reshape((-1, 2))
+            start = polygon
+            end = np.roll(polygon, -1, axis=0)
+            direction = end - start
+            t = np.einsum("pmd,md->pm", points[:, None] - start, direction)
+            t = np.clip(t / np.sum(np.square(direction), axis=1), 0, 1)
+            nearest = start + t[:, :, None] * direction
+            distances = np.linalg.norm(points[:, None] - nearest, axis=2)
+            assert np.max(np.min(distances, axis=1)) <= tolerance
+
+        # Straight segments need only one chord, and a path that isn't closed
+        # keeps its end.
+        line = venn7.bezier.BezierPath(np.array([[[0, 0], [1, 0], [2, 0], [3, 0]]]))
+        np.testing.assert_allclose(line.flatten(1e-6), [(0, 0), (3, 0)])
+
+        compound = venn7.bezier.BezierPath.from_svg_path(
+            "M0,0 h10 v10 h-10 z M2,2 v6 h6 v-6 z"
+        )
+        with pytest.raises(ValueError):
+            compound.flatten()
+        for subpath, (low, high) in zip(compound.get_subpaths(), [(0, 10), (2, 8)]):
+            polygon = subpath.flatten()
+            np.testing.assert_allclose(polygon.min(axis=0), (low, low))
+            np.testing.assert_allclose(polygon.max(axis=0), (high, high))
+            x, y = polygon.T
+            area = np.dot(x, np.roll(y, -1)) - np.dot(y, np.roll(x, -1))
+            assert abs(area / 2) == pytest.approx((high - low) ** 2)
+
+
 class TestMetafontSpline:
     def test_basic(self):
         spline = venn7.bezier.MetafontSpline(
@@ -52,6 +143,48 @@ class TestMetafontSpline:
             spline.beziers[0].control_points[0, :], spline.points[0]
         )
 
+    def test_segments_match_metafont_beziers(self):
+        points = [(0.0, 1.0), (1.0, 0.5), (1.5, -1.0), (-0.5, -1.0), (-1.0, 0.0)]
+        tensions = [1.0, 1.5, 1.0, 2.0, 1.2]
+        spline = venn7.bezier.MetafontSpline(points, tensions)
+        n = len(points)
+        for i, bezier in enumerate(spline.beziers):
+            expected = venn7.bezier.MetafontBezier(
+                *points[i],
+                *points[(i + 1) % n],
+                spline.theta[i],
+                spline.phi[(i + 1) % n],
+                tension_1=spline.tension_after[i],
+                tension_2=spline.tension_before[(i + 1) % n],
+                relative_angles=True,
+            )
+            np.testing.assert_allclose(bezier.control_points, expected.control_points)
+
+
+def test_solve_cyclic_tridiagonal():
+    rng = np.random.default_rng(0)
+    for n in [2, 3, 10, 100]:
+        lower = rng.uniform(-1, 1, n)
+        upper = rng.uniform(-1, 1, n)
+        diagonal = 4 + rng.uniform(0, 1, n)
+        rhs = rng.normal(size=n)
+        A = np.diag(diagonal)
+        for i in range(n):
+            A[i, (i - 1) % n] += lower[i]
+            A[i, (i + 1) % n] += upper[i]
+        np.testing.assert_allclose(
+            venn7.bezier.solve_cyclic_tridiagonal(lower, diagonal, upper, rhs),
+            np.linalg.solve(A, rhs),
+        )
+
+
+def test_points_in_polygon():
+    square = [(0.0, 0.0), (2.0, 0.0), (2.0, 2.0), (0.0, 2.0)]
+    points = [(1.0, 1.0), (3.0, 1.0), (-0.5, 1.5), (1.5, 0.5)]
+    np.testing.assert_array_equal(
+        venn7.bezier.points_in_polygon(points, square), [True, False, False, True]
+    )
+
 
 class TestSVGPathParser:
     def test_basic(self):
@@ -70,3 +203,51 @@ class TestSVGPathParser:
                 [4.0, 4.0],
             ])
         )
+
+    def test_commands(self):
+        relative, __ = venn7.bezier.parse_svg_path(
+            "m1 1 c1 1 2 2 3 3 s 1 1 2 0 l 1e1 0 h-2 v-1.5 q1 1 2 0 t2 0 z"
+        )
+        absolute, __ = venn7.bezier.parse_svg_path(
+            "M1,1 C2,2,3,3,4,4 S5,5,6,4 L16,4 H14 V2.5 Q15,3.5,16,2.5 T18,2.5 Z"
+        )
+        np.testing.assert_allclose(relative, absolute)
+        # S reflects the previous control point.
+        np.testing.assert_allclose(absolute[1, 1], (5, 5))
+        # Quadratics are elevated to cubics with the same shape.
+        np.testing.assert_allclose(
+            absolute[5, 1:3], [(14 + 2 / 3, 2.5 + 2 / 3), (15 + 1 / 3, 2.5 + 2 / 3)]
+        )
+        # T reflects the previous quadratic control point.
+        np.testing.assert_allclose(absolute[6, 1], (16 + 2 / 3, 2.5 - 2 / 3))
+        # Z closes the path with a line.
+        np.testing.assert_allclose(absolute[-1, [0, 3]], [(18, 2.5), (1, 1)])
+
+        with pytest.raises(ValueError):
+            venn7.bezier.parse_svg_path("M 0 0 A 1 1 0 0 0 1 1")
+        with pytest.raises(ValueError):
+            venn7.bezier.parse_svg_path("M 0 0 L 1")
+
+    def test_subpaths(self):
+        path = venn7.bezier.BezierPath.from_svg_path(
+            "M0,0 h10 v10 h-10 z M2,2 v6 h6 v-6 z m1-1 l1 0"
+        )
+        np.testing.assert_array_equal(path.subpath_starts, [0, 4, 8])
+        subpaths = path.get_subpaths()
+        assert [len(subpath) for subpath in subpaths] == [4, 4, 1]
+        # The second subpath runs clockwise, making a hole.
+        closed = venn7.bezier.BezierPath(path.control_points[:8], [0, 4])
+        assert closed.get_signed_area() == pytest.approx(100 - 36)
+        np.testing.assert_allclose(path.control_points[8, [0, 3]], [(3, 1), (4, 1)])
+
+        round_trip = venn7.bezier.BezierPath.from_svg_path(path[:8].as_svg_path())
+        assert round_trip.as_svg_path().count("M") == 1
+        path = closed
+        assert path.as_svg_path().count("M") == 2
+        round_trip = venn7.bezier.BezierPath.from_svg_path(path.as_svg_path())
+        np.testing.assert_array_equal(round_trip.subpath_starts, [0, 4])
+        np.testing.assert_allclose(round_trip.control_points, path.control_points)
+
+        trimmed = path.translate(np.array([1.0, 0])).remove_tiny_segments(7)
+        np.testing.assert_array_equal(trimmed.subpath_starts, [0])
+        assert len(trimmed) == 4
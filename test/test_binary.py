@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+import venn7.bezier
+import venn7.binary
+import venn7.venn
+
+
+def test_encode_paths():
+    rng = np.random.default_rng(0)
+    paths = [
+        venn7.bezier.BezierPath(rng.uniform(-50, 50, size=(10, 4, 2)), [0, 3]),
+        venn7.bezier.BezierPath([]),
+        venn7.bezier.BezierPath(rng.uniform(-50, 50, size=(4, 4, 2))),
+    ]
+    # Segments within a subpath are continuous, as the encoding assumes.
+    for path in paths:
+        for subpath in path.get_subpaths():
+            subpath.control_points[1:, 0] = subpath.control_points[:-1, 3]
+
+    decoded = venn7.binary.decode_paths(venn7.binary.encode_paths(paths))
+    assert len(decoded) == len(paths)
+    for path, decoded_path in zip(paths, decoded):
+        np.testing.assert_array_equal(decoded_path.subpath_starts, path.subpath_starts)
+        np.testing.assert_allclose(
+            decoded_path.control_points,
+            path.control_points,
+            atol=0.5 / venn7.binary.SCALE,
+        )
+
+    with pytest.raises(ValueError):
+        venn7.binary.encode_paths(paths, scale=1000)
+
+
+def test_export_binary():
+    diagram = venn7.venn.DIAGRAMS["5"]
+    svg = diagram.export_json()
+    binary = diagram.export_json(format="binary")
+    assert binary["format"] == "binary"
+    assert binary["name"] == svg["name"] and binary["n"] == svg["n"]
+
+    curve, *regions = venn7.binary.decode_paths(binary)
+    assert len(regions) == len(svg["regions"])
+    for path, svg_path in zip([curve] + regions, [svg["curve"]] + svg["regions"]):
+        # Drop the closing lines that Z adds to make up for rounding.
+        expected = venn7.bezier.BezierPath.from_svg_path(svg_path)
+        expected = expected.remove_tiny_segments(0.01)
+        np.testing.assert_array_equal(path.subpath_starts, expected.subpath_starts)
+        np.testing.assert_allclose(
+            path.control_points, expected.control_points, atol=0.01
+        )
+
+    size = len(binary["coordinates"]) + len(binary["structure"])
+    assert size < sum(len(path) for path in svg["regions"]) / 2
@@ -0,0 +1,69 @@
+import math
+
+import numpy as np
+import pytest
+
+import venn7.bezier
+import venn7.boolean
+
+
+def make_circle(x, y, radius):
+    angles = np.linspace(0, 2 * np.pi, 8, endpoint=False)
+    points = np.stack([x + radius * np.cos(angles), y + radius * np.sin(angles)], axis=1)
+    return venn7.bezier.MetafontSpline(points)
+
+
+def test_find_path_intersections():
+    circle_a = make_circle(0.0, 0.0, 1.0)
+    circle_b = make_circle(1.0, 0.0, 1.0)
+    u_a, u_b, points = venn7.boolean.find_path_intersections(circle_a, circle_b)
+    assert len(points) == 2
+    np.testing.assert_allclose(
+        points[np.argsort(points[:, 1])],
+        [(0.5, -math.sqrt(3) / 2), (0.5, math.sqrt(3) / 2)],
+        atol=1e-3,
+    )
+    for u, path in [(u_a, circle_a), (u_b, circle_b)]:
+        segments = np.floor(u).astype(int)
+        for segment, t, point in zip(segments, u - segments, points):
+            np.testing.assert_allclose(path[segment](t), point, atol=1e-6)
+
+
+def test_compute_regions():
+    curves = [
+        make_circle(math.cos(angle), math.sin(angle), 1.5)
+        for angle in 2 * np.pi * np.arange(3) / 3
+    ]
+    regions = venn7.boolean.compute_regions(curves)
+    assert sorted(regions.keys()) == list(range(1, 8))
+    areas = {mask: region.get_signed_area() for mask, region in regions.items()}
+    assert all(area > 0 for area in areas.values())
+    for i, curve in enumerate(curves):
+        np.testing.assert_allclose(
+            sum(area for mask, area in areas.items() if mask & (1 << i)),
+            curve.get_signed_area(),
+        )
+
+
+def test_remove_duplicate_vertices():
+    curves = [make_circle(0.0, 0.0, 1.0), make_circle(1.0, 0.0, 1.0)]
+    curves.append(make_circle(0.5, 1.0, 1.0))
+    vertex_curves = [frozenset((0, 1))] * 3 + [frozenset((0, 2))]
+
+    # Vertices 0 and 1 are the same crossing, found twice on either side of the
+    # end of curve 0, too close together to leave an edge between them.
+    vertices_on_curve = [
+        [(8 - 5e-13, 0), (1e-13, 1), (3.0, 2)],
+        [(1.0, 0), (1.0 + 1e-13, 1), (5.0, 2)],
+        [],
+    ]
+    assert venn7.boolean._remove_duplicate_vertices(
+        curves, vertices_on_curve, vertex_curves
+    ) == [[(8 - 5e-13, 0), (3.0, 2)], [(1.0, 0), (5.0, 2)], []]
+
+    # Curves 1 and 2 both cross curve 0 at the same point.
+    vertices_on_curve = [[(3.0, 2), (3.0 + 1e-13, 3)], [(5.0, 2)], [(2.0, 3)]]
+    with pytest.raises(ValueError, match="meet at a point"):
+        venn7.boolean._remove_duplicate_vertices(
+            curves, vertices_on_curve, vertex_curves
+        )
@@ -0,0 +1,76 @@
+import numpy as np
+import venn7.bezier
+import venn7.bvh
+import venn7.venn
+
+
+def get_curves():
+    diagram = venn7.venn.DIAGRAMS["5"]
+    curve = diagram.get_spline()
+    rotation = venn7.bezier.get_rotation_matrix(2 * np.pi / diagram.n)
+    return curve, curve.transform(rotation)
+
+
+def test_intersection_candidates():
+    curve_a, curve_b = get_curves()
+    candidates = curve_a.get_bvh().get_intersection_candidates(curve_b.get_bvh())
+
+    minima_a = np.min(curve_a.control_points, axis=1)[:, np.newaxis]
+    maxima_a = np.max(curve_a.control_points, axis=1)[:, np.newaxis]
+    minima_b = np.min(curve_b.control_points, axis=1)
+    maxima_b = np.max(curve_b.control_points, axis=1)
+    overlap = np.all((minima_a <= maxima_b) & (minima_b <= maxima_a), axis=2)
+    expected = set(zip(*np.nonzero(overlap)))
+    assert set(zip(*candidates)) == expected
+    assert len(expected) < overlap.size // 4
+
+
+def test_nearest_and_furthest_point():
+    curve, __ = get_curves()
+    bvh = curve.get_bvh()
+    samples = curve.evaluate(np.linspace(0, 1, 200)).reshape((-1, 2))
+    for point in [(0.0, 0.0), (10.0, -30.0), (80.0, 5.0)]:
+        distances = np.hypot(*(samples - point).T)
+        nearest = bvh.get_nearest_point(point)
+        furthest = bvh.get_furthest_point(point)
+        assert np.hypot(*(np.array(nearest) - point)) <= np.min(distances) + 1e-9
+        assert np.hypot(*(np.array(furthest) - point)) >= np.max(distances) - 1e-9
+        np.testing.assert_allclose(
+            furthest, venn7.bezier.get_furthest_point(curve.control_points, point)
+        )
+
+
+def test_contains():
+    curve, __ = get_curves()
+    bvh = curve.get_bvh()
+    polygon = curve.evaluate(np.linspace(0, 1, 50, endpoint=False)).reshape((-1, 2))
+    rng = np.random.default_rng(0)
+    points = rng.uniform(-60, 60, size=(200, 2))
+    expected = venn7.bezier.points_in_polygon(points, polygon)
+    actual = np.array([bvh.contains(point) for point in points])
+    np.testing.assert_array_equal(actual, expected)
+
+
+def test_contains_level_with_vertex():
+    # A diamond of straight segments, scaled so that its vertices are rounded.
+    corners = np.array([(0, 1), (-1, 0), (0, -1), (1, 0)]) * 0.3
+    ends = np.roll(corners, -1, axis=0)
+    t = np.linspace(0, 1, 4)[:, np.newaxis, np.newaxis]
+    diamond = venn7.bezier.BezierPath(np.moveaxis(corners + t * (ends - corners), 0, 1))
+    bvh = diamond.get_bvh()
+    assert bvh.get_winding_number((0, 0)) == 1
+    assert bvh.get_winding_number((-0.1, 0)) == 1
+    assert bvh.get_winding_number((-0.6, 0)) == 0
+    # The ray only touches the top and bottom vertices.
+    assert bvh.get_winding_number((-0.6, 0.3)) == 0
+    assert bvh.get_winding_number((-0.6, -0.3)) == 0
+
+    curve, __ = get_curves()
+    bvh = curve.get_bvh()
+    polygon = curve.evaluate(np.linspace(0, 1, 50, endpoint=False)).reshape((-1, 2))
+    y = curve.control_points[:, 0, 1]
+    for x in [-100, -20, 0, 20]:
+        points = np.stack([np.full_like(y, x), y], axis=1)
+        expected = venn7.bezier.points_in_polygon(points, polygon)
+        actual = np.array([bvh.contains(point) for point in points])
+        np.testing.assert_array_equal(actual, expected)
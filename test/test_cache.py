@@ -0,0 +1,37 @@
+import venn7.cache
+import venn7.venn
+
+
+def test_build_cache(tmp_path):
+    cache = venn7.cache.BuildCache(str(tmp_path))
+    diagram = venn7.venn.VennDiagram(5, "1000\n0101\n1010\n0001", "Five")
+    key = venn7.cache.get_export_key(diagram, "python")
+    assert cache.get(key) is None
+
+    result = diagram.export_json(cache=cache)
+    assert cache.get(key) == result
+    assert len(list(tmp_path.glob("*.json"))) == 1
+
+    # A cached result is returned as is.
+    cache.put(key, {"cached": True})
+    assert diagram.export_json(cache=cache) == {"cached": True}
+    assert diagram.export_json(cache=cache, force=True) == result
+    assert cache.get(key) == result
+
+    diagram.renderer_args["spacing"] = 6
+    assert venn7.cache.get_export_key(diagram, "python") != key
+    assert venn7.cache.get_export_key(diagram, "paperjs") != key
+    assert venn7.cache.get_export_key(diagram, "python", "binary") != key
+    assert venn7.cache.get_export_key(diagram, "python", hit_test=True) != key
+
+
+def test_build_cache_eviction(tmp_path):
+    cache = venn7.cache.BuildCache(str(tmp_path), max_size=1000)
+    for i in range(10):
+        cache.put(f"key{i}", "x" * 300)
+    assert len(list(tmp_path.glob("*.json"))) == 3
+    assert cache.get("key9") == "x" * 300
+    assert cache.get("key0") is None
+
+    cache.clear()
+    assert not list(tmp_path.glob("*"))
@@ -0,0 +1,56 @@
+import random
+
+import venn7.canonical
+import venn7.search
+import venn7.venn
+
+
+def get_encoding(n, flattened_row_swaps):
+    row_swaps = [[row] for row in flattened_row_swaps]
+    return venn7.venn.format_matrix_encoding_string(n, row_swaps)
+
+
+def test_canonical_key():
+    random.seed(0)
+    keys = set()
+    for diagram in venn7.venn.DIAGRAMS.values():
+        n = diagram.n
+        encoding = venn7.venn.format_matrix_encoding_string(n, diagram.row_swaps)
+        key = venn7.canonical.get_canonical_key(n, encoding)
+        keys.add(key)
+
+        canonical = venn7.canonical.canonicalize(n, encoding)
+        assert venn7.canonical.canonicalize(n, canonical) == canonical
+
+        for __ in range(20):
+            sequence = list(diagram.flattened_row_swaps)
+            for __ in range(50):
+                i = random.randrange(len(sequence) - 1)
+                if random.random() < 0.3:
+                    sequence = sequence[1:] + sequence[:1]
+                elif abs(sequence[i] - sequence[i + 1]) >= 2:
+                    sequence[i], sequence[i + 1] = sequence[i + 1], sequence[i]
+            if random.random() < 0.5:
+                sequence = sequence[::-1]
+            if random.random() < 0.5:
+                sequence = [n - row for row in sequence]
+            equivalent = get_encoding(n, sequence)
+            assert venn7.canonical.get_canonical_key(n, equivalent) == key
+
+    assert len(keys) == len(venn7.venn.DIAGRAMS)
+
+
+def test_encoding_index():
+    encodings = [
+        get_encoding(7, sequence) for sequence in venn7.search.search(7, processes=1)
+    ]
+    index = venn7.canonical.EncodingIndex(7, encodings)
+    assert len(index) == 23
+    assert sum(index.counts.values()) == len(encodings)
+    assert list(venn7.canonical.dedupe(7, encodings)) == list(index)
+
+    for diagram in venn7.venn.DIAGRAMS.values():
+        if diagram.n == 7:
+            encoding = venn7.venn.format_matrix_encoding_string(7, diagram.row_swaps)
+            assert encoding in index
+            assert index.get(encoding) in encodings
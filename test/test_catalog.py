@@ -0,0 +1,50 @@
+import pytest
+
+import venn7.catalog
+import venn7.search
+import venn7.venn
+
+
+def test_catalog(tmp_path):
+    path = str(tmp_path / "diagrams.venncat")
+    entries = [
+        venn7.catalog.CatalogEntry.from_diagram(diagram, metadata={"key": key})
+        for key, diagram in venn7.venn.DIAGRAMS.items()
+    ]
+    for flattened_row_swaps in venn7.search.search(7, processes=1):
+        row_swaps = venn7.venn.compact_row_swaps(flattened_row_swaps)
+        entries.append(venn7.catalog.CatalogEntry(7, row_swaps))
+    assert venn7.catalog.write_catalog(path, iter(entries)) == len(entries)
+
+    with venn7.catalog.Catalog(path) as catalog:
+        assert len(catalog) == len(entries)
+        for i in [0, 3, len(entries) - 1]:
+            entry = catalog[i]
+            assert entry.n == entries[i].n
+            assert entry.row_swaps == entries[i].row_swaps
+            assert entry.name == entries[i].name
+            assert entry.renderer_args == entries[i].renderer_args
+            assert entry.metadata == entries[i].metadata
+
+        assert list(catalog.find(n=5)) == [6]
+        assert list(catalog.find(name="Adelaide")) == [1]
+        assert len(catalog.find(name="Nowhere")) == 0
+
+        expected = [
+            i for i, e in enumerate(entries) if e.n == 7 and len(e.row_swaps) <= 12
+        ]
+        assert list(catalog.find(n=7, columns=(1, 12))) == expected
+        row_counts = [1, 3, 5, 5, 3, 1]
+        assert len(catalog.find(row_counts=row_counts)) == len(entries) - 1
+
+        diagram = catalog[int(catalog.find(name="Hamilton")[0])].get_diagram()
+        assert diagram.flattened_row_swaps == (
+            venn7.venn.DIAGRAMS["hamilton"].flattened_row_swaps
+        )
+
+
+def test_catalog_errors(tmp_path):
+    path = tmp_path / "not_a_catalog"
+    path.write_bytes(b"\0" * 100)
+    with pytest.raises(ValueError):
+        venn7.catalog.Catalog(str(path))
@@ -0,0 +1,40 @@
+import numpy as np
+
+import venn7.bezier
+import venn7.hittest
+import venn7.venn
+
+
+def test_hit_test_index():
+    diagram = venn7.venn.DIAGRAMS["5"]
+    polygons = [diagram.get_polygon(i) for i in range(diagram.n)]
+    original = diagram.get_hit_test_index()
+    index = venn7.hittest.HitTestIndex.from_json(original.to_json())
+    np.testing.assert_array_equal(index.row_starts, original.row_starts)
+    np.testing.assert_array_equal(index.crossings, original.crossings)
+    np.testing.assert_array_equal(index.masks, original.masks)
+    assert set(index.masks.tolist()) == set(range(2 ** diagram.n))
+
+    # Points on the center lines of rows only differ from the polygons where
+    # rounding the crossings moves them across a boundary.
+    rng = np.random.default_rng(0)
+    rows = rng.integers(len(index.row_starts) - 1, size=2000)
+    points = np.stack(
+        [rng.uniform(-60, 60, size=len(rows)), index.y0 + rows * index.row_height],
+        axis=1,
+    )
+    expected = sum(
+        venn7.bezier.points_in_polygon(points, polygon).astype(int) << i
+        for i, polygon in enumerate(polygons)
+    )
+    masks = np.array([index.lookup(x, y) for x, y in points])
+    assert np.mean(masks != expected) < 0.01
+    assert index.lookup(1000, 0) == 0
+    assert index.lookup(0, 1000) == 0
+
+
+def test_export_hit_test_index():
+    diagram = venn7.venn.DIAGRAMS["5"]
+    assert "hit_test" not in diagram.export_json(format="binary")
+    result = diagram.export_json(format="binary", hit_test=True)
+    assert result["hit_test"] == diagram.get_hit_test_index().to_json()
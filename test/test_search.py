@@ -0,0 +1,44 @@
+import json
+
+import pytest
+
+import venn7.search
+import venn7.venn
+
+
+def test_compact_row_swaps():
+    row_swaps = venn7.venn.compact_row_swaps([1, 3, 2, 1, 3, 4])
+    assert row_swaps == [[1, 3], [2], [1, 3], [4]]
+
+
+@pytest.mark.parametrize("n", [3, 5])
+def test_search(n):
+    results = list(venn7.search.search(n, processes=1))
+    assert results
+    for flattened_row_swaps in results:
+        venn7.venn.validate_basic(n, flattened_row_swaps)
+        venn7.venn.validate_venn(n, flattened_row_swaps)
+    parallel_results = venn7.search.search(n, split_depth=2, processes=2)
+    assert sorted(parallel_results) == sorted(results)
+
+
+def test_search_checkpoint(tmp_path):
+    checkpoint = str(tmp_path / "checkpoint.json")
+    results = list(venn7.search.search(5, split_depth=3, checkpoint=checkpoint))
+
+    # Pretend the search was interrupted after the first task.
+    with open(checkpoint) as f:
+        data = json.load(f)
+    first_results = [
+        r for r in data["results"] if r[: len(data["done"][0])] == data["done"][0]
+    ]
+    data["done"] = data["done"][:1]
+    data["results"] = first_results
+    with open(checkpoint, "w") as f:
+        json.dump(data, f)
+
+    resumed = list(venn7.search.search(5, split_depth=3, checkpoint=checkpoint))
+    assert sorted(resumed) == sorted(results)
+
+    with pytest.raises(ValueError):
+        list(venn7.search.search(5, split_depth=2, checkpoint=checkpoint))
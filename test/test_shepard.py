@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+import venn7.shepard
+import venn7.sprites
+
+
+def test_octave_gains():
+    midi_notes = np.array([30, 42, 54, 66, 78])
+    gains = venn7.shepard.get_octave_gains(midi_notes, center=54, spread=2)
+    np.testing.assert_allclose(gains, np.exp(-np.square([-1, -0.5, 0, 0.5, 1])))
+
+
+@pytest.mark.parametrize("voice", list(venn7.shepard.VOICES))
+def test_render_note(voice):
+    sample_rate = 8000
+    midi_notes, signals = venn7.shepard.render_octaves(
+        3, voice=voice, duration=1.0, sample_rate=sample_rate
+    )
+    assert signals.shape == (len(venn7.shepard.OCTAVES), sample_rate)
+    np.testing.assert_array_equal(midi_notes, 60 + 12 * np.arange(-4, 5) + 3)
+
+    # With a narrow spread, the octave nearest the center dominates.
+    samples = venn7.shepard.mix_octaves(
+        midi_notes, signals, center=63, spread=0.2, reverb=0, sample_rate=sample_rate
+    )
+    assert samples.shape == (sample_rate, 2)
+    spectrum = np.abs(np.fft.rfft(samples[:, 0]))
+    frequencies = np.fft.rfftfreq(len(samples), 1 / sample_rate)
+    assert frequencies[np.argmax(spectrum)] == pytest.approx(
+        venn7.shepard.get_frequency(63), rel=0.02
+    )
+
+    samples = venn7.shepard.mix_octaves(
+        midi_notes, signals, reverb=0.5, reverb_time=0.5, sample_rate=sample_rate
+    )
+    assert samples.shape == (sample_rate * 3 // 2 - 1, 2)
+    assert np.all(np.isfinite(samples))
+
+
+def test_render_sound_set(tmp_path):
+    paths = venn7.shepard.render_sound_set(
+        tmp_path, notes=[0, 7], processes=1, duration=0.5, sample_rate=8000
+    )
+    assert [path.name for path in paths] == ["note_0.wav", "note_7.wav"]
+    peaks = []
+    for path in paths:
+        samples, sample_rate = venn7.sprites.read_audio(path)
+        assert sample_rate == 8000
+        peaks.append(np.max(np.abs(samples)))
+    assert max(peaks) == round(10 ** (-1 / 20) * 32767)
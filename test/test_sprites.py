@@ -0,0 +1,47 @@
+import json
+
+import numpy as np
+import pytest
+
+import venn7.sprites
+
+
+def test_pack_sprite(tmp_path):
+    rng = np.random.default_rng(0)
+    notes = {}
+    for note, frames in [(10, 300), (0, 100), (2, 200)]:
+        samples = rng.integers(-1000, 1000, size=(frames, 2)).astype("<i2")
+        venn7.sprites.write_audio(tmp_path / f"note_{note}.wav", samples, 1000)
+        notes[f"note_{note}"] = samples
+    (tmp_path / "README").write_text("Not a note")
+
+    manifest = venn7.sprites.pack_sprite(tmp_path, "sprite.wav")
+    assert manifest == json.loads((tmp_path / "sprite.json").read_text())
+    assert manifest["file"] == "sprite.wav"
+    assert list(manifest["notes"]) == ["note_0", "note_2", "note_10"]
+
+    sprite, sample_rate = venn7.sprites.read_audio(tmp_path / "sprite.wav")
+    assert sample_rate == 1000
+    assert len(sprite) == 600 + 3 * 1250
+    for name, samples in notes.items():
+        start = round(manifest["notes"][name]["start"] * sample_rate)
+        duration = round(manifest["notes"][name]["duration"] * sample_rate)
+        np.testing.assert_array_equal(sprite[start : start + duration], samples)
+        gap = sprite[start + duration : start + duration + 1250]
+        np.testing.assert_array_equal(gap, 0)
+
+    # A note keeps playing while it fades out, which must end before the next
+    # note starts.
+    entries = list(manifest["notes"].values())
+    for entry, next_entry in zip(entries, entries[1:]):
+        end = entry["start"] + entry["duration"] + venn7.sprites.FADE_OUT
+        assert end <= next_entry["start"]
+    with pytest.raises(ValueError):
+        venn7.sprites.pack_sprite(tmp_path, "sprite.wav", gap=0.25)
+
+    # Packing again ignores the sprite that is already there.
+    assert venn7.sprites.pack_sprite(tmp_path, "sprite.wav") == manifest
+
+    venn7.sprites.write_audio(tmp_path / "note_3.wav", notes["note_0"][:, :1], 1000)
+    with pytest.raises(ValueError):
+        venn7.sprites.pack_sprite(tmp_path, "sprite.wav")
@@ -1,5 +1,13 @@
-import pytest
+import functools
 import json
+import math
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+import venn7.bezier
 import venn7.venn
 
 
@@ -7,3 +15,223 @@ import venn7.venn
 def test_venn_diagrams(diagram):
     diagram.check_regions()
     json.dumps(diagram.export_json())
+
+
+@pytest.mark.parametrize("n", [3, 5, 7])
+def test_region_orbits(n):
+    representatives = venn7.venn.get_necklace_representatives(n)
+    assert len(representatives) == (2 ** n - 2) // n + 1
+
+    masks = []
+    for mask in representatives:
+        for steps, rotated_mask in venn7.venn.get_region_orbit(mask, n):
+            assert rotated_mask == venn7.venn.rotate_mask(mask, steps, n)
+            masks.append(rotated_mask)
+    assert sorted(masks) == list(range(1, 2 ** n))
+
+
+def test_region_faces():
+    diagram = venn7.venn.DIAGRAMS["5"]
+    masks = sorted(mask for mask, __ in diagram.get_region_faces())
+    assert masks == list(range(1, 2 ** diagram.n))
+    diagram.check_regions(method="boolean")
+
+
+def test_validate_matrix_encodings():
+    diagrams = [d for d in venn7.venn.DIAGRAMS.values() if d.n == 7]
+    encodings = [
+        venn7.venn.format_matrix_encoding_string(d.n, d.row_swaps) for d in diagrams
+    ]
+    # Swapping two columns of Adelaide keeps the row counts but breaks the
+    # diagram.
+    broken = venn7.venn.parse_matrix_encoding_string(encodings[1])
+    broken[0], broken[1] = broken[1], broken[0]
+    encodings.append(venn7.venn.format_matrix_encoding_string(7, broken))
+    encodings.append("0101\n1010")
+
+    text = "\n\n".join(encodings) + "\n"
+    read = list(venn7.venn.read_matrix_encodings(text.splitlines()))
+    assert read == encodings
+
+    for processes in [1, 2]:
+        results = list(
+            venn7.venn.validate_matrix_encodings(7, read, processes=processes)
+        )
+        assert results[: len(diagrams)] == [None] * len(diagrams)
+        assert results[-2] is not None
+        assert results[-1].startswith("Wrong length")
+
+
+def test_lazy_import():
+    # Importing the module shouldn't import Shapely or build any diagrams.
+    code = (
+        "import sys, venn7.venn; "
+        "assert 'shapely' not in sys.modules; "
+        "assert not venn7.venn.DIAGRAMS._diagrams"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_diagram_registry():
+    registry = venn7.venn.DiagramRegistry(
+        {
+            "good": functools.partial(venn7.venn.VennDiagram, 3, "10\n01"),
+            "bad": functools.partial(venn7.venn.VennDiagram, 3, "11\n00"),
+        }
+    )
+    assert list(registry) == ["good", "bad"]
+    assert registry["good"] is registry["good"]
+    with pytest.raises(ValueError):
+        registry["bad"]
+    with pytest.raises(ValueError):
+        registry.validate()
+
+    diagram = venn7.venn.VennDiagram(3, "11\n00", validate=False)
+    with pytest.raises(ValueError):
+        diagram.validate()
+
+
+def test_geometry_cache():
+    diagram = venn7.venn.VennDiagram(5, "1000\n0101\n1010\n0001")
+    spline = diagram.get_spline()
+    assert diagram.get_spline(0) is spline
+    assert diagram.get_polygon(2) is diagram.get_polygon(2)
+    with pytest.raises(ValueError):
+        diagram.get_polygon(0)[0, 0] = 1
+
+    rotation = venn7.bezier.get_rotation_matrix(2 * math.pi * 3 / 5)
+    np.testing.assert_allclose(
+        diagram.get_spline(3).control_points, spline.control_points @ rotation.T
+    )
+
+    diagram.renderer_args["spacing"] = 8
+    assert diagram.get_spline() is not spline
+    del diagram.renderer_args["spacing"]
+    assert diagram.get_spline() is spline
+
+    for spacing in range(10):
+        diagram.renderer_args["spacing"] = spacing
+        diagram.get_polygon()
+    assert len(diagram._geometry_cache) == diagram.geometry_cache_size
+
+
+def read_exported_diagrams(path):
+    text = path.read_text()
+    prefix = "const venn_diagrams = "
+    assert text.startswith(prefix) and text.endswith(";")
+    return json.loads(text[len(prefix) : -1])
+
+
+def test_export_diagrams(tmp_path, monkeypatch):
+    path = tmp_path / "venn_diagrams.js"
+    failed = venn7.venn.export_diagrams(str(path), names=["5", "adelaide"])
+    assert failed == {}
+    diagrams = read_exported_diagrams(path)
+    assert diagrams["diagrams_list"] == ["5", "adelaide"]
+    assert diagrams["5"] == venn7.venn.DIAGRAMS["5"].export_json()
+
+    diagram = venn7.venn.DIAGRAMS["5"]
+    registry = venn7.venn.DiagramRegistry(
+        {
+            "5": lambda: diagram,
+            "broken": functools.partial(venn7.venn.VennDiagram, 3, "11\n00"),
+        }
+    )
+    monkeypatch.setattr(venn7.venn, "DIAGRAMS", registry)
+    failed = venn7.venn.export_diagrams(
+        str(path), names=["broken", "5"], processes=1
+    )
+    assert list(failed) == ["broken"]
+    assert isinstance(failed["broken"], ValueError)
+    diagrams = read_exported_diagrams(path)
+    assert diagrams["diagrams_list"] == ["5"]
+    assert "broken" not in diagrams
+
+    # When nothing could be exported, the last good file is kept.
+    contents = path.read_text()
+    failed = venn7.venn.export_diagrams(str(path), names=["broken"], processes=1)
+    assert list(failed) == ["broken"]
+    assert path.read_text() == contents
+    assert not (tmp_path / "venn_diagrams.js.tmp").exists()
+
+
+def has_paperjs():
+    try:
+        result = subprocess.run(
+            ["node", "-e", "require('paper'); require('jsdom')"],
+            cwd=venn7.venn.ROOT,
+            capture_output=True,
+        )
+    except FileNotFoundError:
+        return False
+    return result.returncode == 0
+
+
+requires_paperjs = pytest.mark.skipif(
+    not has_paperjs(), reason="needs Node with paper and jsdom"
+)
+
+
+def get_diagram_json(name="5"):
+    diagram = venn7.venn.DIAGRAMS[name]
+    return {"n": diagram.n, "curve": diagram.get_spline().as_svg_path()}
+
+
+@requires_paperjs
+def test_boolean_worker():
+    diagram_json = get_diagram_json()
+    with venn7.venn.BooleanWorker() as worker:
+        regions = worker.compute_regions(diagram_json)
+        assert len(regions) == 2 ** 5
+        assert regions[0] == ""
+        assert all(regions[1:])
+        assert worker.compute_regions(diagram_json, masks=[6, 1]) == [
+            regions[6],
+            regions[1],
+        ]
+
+        # Each reply carries the id of its request.
+        process = worker.process
+        for request in [
+            {"id": "first", "diagram": diagram_json, "masks": [3]},
+            {"id": 7, "diagram": diagram_json},
+        ]:
+            process.stdin.write(json.dumps(request) + "\n")
+        process.stdin.flush()
+        first = json.loads(process.stdout.readline())
+        second = json.loads(process.stdout.readline())
+        assert first == {"id": "first", "regions": [regions[3]]}
+        assert second == {"id": 7, "regions": regions}
+
+        # Bad requests get an error reply, and the worker keeps going.
+        process.stdin.write("not json\n")
+        process.stdin.write(json.dumps({"id": 8, "diagram": None}) + "\n")
+        process.stdin.flush()
+        response = json.loads(process.stdout.readline())
+        assert response["id"] is None and "error" in response
+        response = json.loads(process.stdout.readline())
+        assert response["id"] == 8 and "error" in response
+        with pytest.raises(RuntimeError):
+            worker.compute_regions(None)
+        assert worker.compute_regions(diagram_json, masks=[1]) == [regions[1]]
+
+    assert worker.process is None
+    assert process.poll() is not None
+
+
+@requires_paperjs
+def test_region_cache():
+    # Out of order, so that later masks reuse prefix regions from earlier ones
+    # and from ones that come after them.
+    masks = [21, 3, 30, 1, 16, 7, 22, 31]
+    diagram_json = get_diagram_json()
+    with venn7.venn.BooleanWorker() as worker:
+        memoized = worker.compute_regions(diagram_json, masks=masks)
+        direct = worker.compute_regions(diagram_json, masks=masks, memoize=False)
+    for mask, path, expected in zip(masks, memoized, direct):
+        area = venn7.bezier.BezierPath.from_svg_path(path).get_signed_area()
+        expected_area = venn7.bezier.BezierPath.from_svg_path(
+            expected
+        ).get_signed_area()
+        assert abs(area) > 0, mask
+        assert area == pytest.approx(expected_area, rel=1e-6), mask